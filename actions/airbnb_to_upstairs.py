@@ -1,11 +1,14 @@
 from dateutil import parser as dtp
-from tools.gcal_tool import get_cal_id, upsert_event
+from calendar_agent.calendar.plan import Plan
+from tools.gcal_async import AsyncCalendar, run as run_async
+from tools.gcal_tool import apply_plan, write_summary
+from calendar_agent import profiling
 
 UPSTAIRS = "Upstairs Bookings"
 TZ = "America/Detroit"
 
-def run(booking_id, guest, checkin_iso, checkout_iso):
-    up_id = get_cal_id(UPSTAIRS)
+def build_event(booking_id, guest, checkin_iso, checkout_iso):
+    """(body, key, value) for the Upstairs reservation (no buffers)."""
     ci = dtp.isoparse(checkin_iso)
     co = dtp.isoparse(checkout_iso)
 
@@ -15,11 +18,42 @@ def run(booking_id, guest, checkin_iso, checkout_iso):
         "end":   {"dateTime": co.isoformat(), "timeZone": TZ},
         "extendedProperties": {"private":{"source":"agent","type":"ab_res","booking_id":booking_id}}
     }
-    upsert_event(up_id, body, "type_booking", f"ab_res|{booking_id}")
+    return body, "type_booking", f"ab_res|{booking_id}"
+
+async def plan_booking(cal: AsyncCalendar, booking_id, guest, checkin_iso, checkout_iso):
+    up_id = await cal.get_cal_id(UPSTAIRS)
+    plan = await cal.plan_upsert_events(up_id, [build_event(booking_id, guest, checkin_iso, checkout_iso)])
+    plan.names[up_id] = UPSTAIRS
+    return plan
+
+async def plan_bookings(rows):
+    """rows = [(booking_id, guest, checkin_iso, checkout_iso), ...]: lookups run concurrently,
+    the writes for every booking end up in one plan (one batch)."""
+    async with AsyncCalendar() as cal:
+        plans = await cal.gather(*(plan_booking(cal, *r) for r in rows))
+    plan = Plan()
+    for p in plans:
+        plan.extend(p)
+    plan.optimize()
+    return plan
+
+def run(booking_id, guest, checkin_iso, checkout_iso, dry_run=False):
+    return run_many([(booking_id, guest, checkin_iso, checkout_iso)], dry_run=dry_run)
+
+def run_many(rows, dry_run=False):
+    plan = run_async(plan_bookings(rows))
+    print(plan.render())
+    if dry_run:
+        return plan
+    apply_plan(plan)
+    print(write_summary())
+    return plan
 
 if __name__ == "__main__":
+    profiling.from_argv("actions.airbnb_to_upstairs")
     import sys
-    if len(sys.argv) != 5:
-        print('Usage: python -m actions.airbnb_to_upstairs <booking_id> "<guest name>" <checkin_iso> <checkout_iso>')
+    args = [a for a in sys.argv[1:] if a != "--dry-run"]
+    if len(args) != 4:
+        print('Usage: python -m actions.airbnb_to_upstairs [--dry-run] [--profile] <booking_id> "<guest name>" <checkin_iso> <checkout_iso>')
         sys.exit(1)
-    run(sys.argv[1], sys.argv[2], sys.argv[3], sys.argv[4])
\ No newline at end of file
+    run(*args, dry_run="--dry-run" in sys.argv[1:])
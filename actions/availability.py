@@ -0,0 +1,59 @@
+"""
+actions/availability.py
+-------------------------------------------------
+Is a space free, buffers included? Answered from the availability index
+(calendar_agent/calendar/availability.py), loaded once for the range.
+
+Usage:
+    python -m actions.availability [--profile] Disco 2026-03-01T10:00 2026-03-01T14:00
+    python -m actions.availability [--profile] --free [--min-hours 4] Disco 2026-03-01 2026-03-07
+"""
+import argparse
+from datetime import datetime, time, timedelta
+from zoneinfo import ZoneInfo
+
+from calendar_agent import profiling
+from calendar_agent.calendar.availability import SPACE_CALENDARS
+from calendar_agent.config import settings
+from tools.gcal_tool import load_availability
+
+
+def _at(value: str, tz, end: bool = False) -> datetime:
+    """ISO datetime, or a date (its midnight; the next midnight for an end)."""
+    dt = datetime.fromisoformat(value)
+    if len(value) == 10:
+        dt = datetime.combine(dt.date() + timedelta(days=end), time(0, 0))
+    return dt if dt.tzinfo else dt.replace(tzinfo=tz)
+
+
+def _span(a: datetime, b: datetime) -> str:
+    return f"{a:%Y-%m-%d %H:%M} → {b:%Y-%m-%d %H:%M}"
+
+
+def run(space: str, start_iso: str, end_iso: str, free: bool = False, min_hours: float = 0.0):
+    tz = ZoneInfo(settings.timezone)
+    start, end = _at(start_iso, tz), _at(end_iso, tz, end=True)
+    avail = load_availability(start.date().isoformat(), end.date().isoformat())
+    if free:
+        slots = avail.free_slots(space, start, end, timedelta(hours=min_hours))
+        print(f"[{space}] {len(slots)} free slot(s) in {_span(start, end)}")
+        for a, b in slots:
+            print(f"  {_span(a, b)}  ({(b - a).total_seconds() / 3600:g} h)")
+        return slots
+    busy = avail.overlapping(space, start, end)
+    print(f"[{space}] {_span(start, end)}: {'free' if not busy else 'busy'}")
+    for iv in busy:
+        print(f"  {iv.kind:<16} {_span(iv.start.astimezone(tz), iv.end.astimezone(tz))}  {iv.summary}")
+    return busy
+
+
+if __name__ == "__main__":
+    profiling.from_argv("actions.availability")
+    ap = argparse.ArgumentParser(description="Check a space's availability (buffers and blocks included).")
+    ap.add_argument("space", choices=sorted(SPACE_CALENDARS))
+    ap.add_argument("start", help="YYYY-MM-DD or ISO datetime")
+    ap.add_argument("end", help="YYYY-MM-DD (inclusive) or ISO datetime")
+    ap.add_argument("--free", action="store_true", help="list free slots instead")
+    ap.add_argument("--min-hours", type=float, default=0.0, help="shortest free slot to list")
+    a = ap.parse_args()
+    run(a.space, a.start, a.end, free=a.free, min_hours=a.min_hours)
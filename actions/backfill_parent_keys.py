@@ -0,0 +1,35 @@
+"""
+actions/backfill_parent_keys.py
+-------------------------------------------------
+One-time migration: stamp ps_block_key_parent on the blocks written before
+it existed, so "every block of a booking" is one exact-match lookup.
+
+Until a calendar has been backfilled, parent lookups also match
+ps_block_key by prefix (tools/gcal_tool.py), so nothing is missed meanwhile.
+
+Usage:
+    python -m actions.backfill_parent_keys [--dry-run] [--profile] ["Block on Airbnb" ...]
+"""
+import sys
+
+from calendar_agent import profiling
+from tools.gcal_tool import apply_plan, get_cal_id, mark_backfilled, plan_backfill_parent_keys
+
+CALENDARS = ("Block on Airbnb",)
+
+def run(*names, dry_run=False):
+    for name in names or CALENDARS:
+        cal_id = get_cal_id(name)
+        p = plan_backfill_parent_keys(cal_id)
+        p.names[cal_id] = name
+        print(p.render())
+        if dry_run:
+            continue
+        apply_plan(p)
+        mark_backfilled(cal_id)
+        print(f"{name}: {len(p.writes)} event(s) stamped")
+
+if __name__ == "__main__":
+    profiling.from_argv("actions.backfill_parent_keys")
+    args = [a for a in sys.argv[1:] if a != "--dry-run"]
+    run(*args, dry_run="--dry-run" in sys.argv[1:])
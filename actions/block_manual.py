@@ -1,11 +1,13 @@
 import sys
 from datetime import datetime, timedelta
-from tools.gcal_tool import get_cal_id, upsert_event
+from tools.gcal_tool import apply_plan, get_cal_id, plan_upsert_events, write_summary
+from calendar_agent import profiling
 
 BLOCK = "Block on Airbnb"  # must match the exact calendar name in Google
 
-def run(title, *dates):
+def plan(title, *dates):
     block_id = get_cal_id(BLOCK)
+    items = []
     for d in dates:
         day = datetime.strptime(d, "%Y-%m-%d").date()
         next_day = (day + timedelta(days=1)).isoformat()
@@ -14,11 +16,27 @@ def run(title, *dates):
             "start": {"date": day.isoformat()},
             "end": {"date": next_day},
         }
-        upsert_event(block_id, body, "manual_block", f"{title}-{d}")
+        items.append((body, "manual_block", f"{title}-{d}"))
+    p = plan_upsert_events(block_id, items)
+    p.names[block_id] = BLOCK
+    p.optimize()
+    return p
+
+def run(title, *dates, dry_run=False):
+    p = plan(title, *dates)
+    print(p.render())
+    if dry_run:
+        return p
+    apply_plan(p)
+    for d in dates:
         print(f"Added all-day block on {d} ({title})")
+    print(write_summary())
+    return p
 
 if __name__ == "__main__":
-    if len(sys.argv) < 3:
-        print("Usage: python -m actions.block_manual EVENT 2025-12-27 2025-12-28")
+    profiling.from_argv("actions.block_manual")
+    args = [a for a in sys.argv[1:] if a != "--dry-run"]
+    if len(args) < 2:
+        print("Usage: python -m actions.block_manual [--dry-run] [--profile] EVENT 2025-12-27 2025-12-28")
         sys.exit(1)
-    run(sys.argv[1], *sys.argv[2:])
\ No newline at end of file
+    run(args[0], *args[1:], dry_run="--dry-run" in sys.argv[1:])
@@ -9,7 +9,10 @@ Responsibilities:
 3. Supports both Airbnb and Peerspace bookings with appropriate key types.
 
 Usage:
-    python3 -m actions.cancel <BOOKING_ID> <disco|upstairs>
+    python3 -m actions.cancel [--dry-run] <BOOKING_ID> <disco|upstairs>
+
+--dry-run prints the deletes that would be made (and their API-call count)
+without sending them.
 
 Examples:
     python3 -m actions.cancel AB-TEST-DISCO-SARAH-20251202 disco
@@ -17,7 +20,10 @@ Examples:
 """
 
 import sys
-from tools.gcal_tool import get_cal_id, delete_event_by_private
+from typing import Optional
+from calendar_agent.calendar.plan import Plan
+from tools.gcal_async import AsyncCalendar, run
+from calendar_agent import profiling
 
 # ---------------------------------------------------------------------------
 # GLOBAL CALENDAR IDENTIFIERS
@@ -27,11 +33,14 @@ CAL_DISCO = "Disco Bookings"      # Main floor space (Airbnb + Peerspace)
 CAL_UPSTAIRS = "Upstairs Bookings"  # Second-floor Airbnb listing
 CAL_BLOCK = "Block on Airbnb"     # All-day availability blocks for both listings
 
+CAL_NAMES = {"disco": (CAL_DISCO, CAL_BLOCK), "upstairs": (CAL_UPSTAIRS,)}
+
 # ---------------------------------------------------------------------------
 # CORE FUNCTION
 # ---------------------------------------------------------------------------
 
-def cancel_all_for_booking(booking_id: str, listing: str, verbose: bool = True) -> None:
+def cancel_all_for_booking(booking_id: str, listing: str, verbose: bool = True,
+                           dry_run: bool = False) -> Plan:
     """
     Deletes all events associated with a given booking ID across relevant calendars.
 
@@ -39,19 +48,43 @@ def cancel_all_for_booking(booking_id: str, listing: str, verbose: bool = True)
         booking_id: The unique booking identifier (e.g. AB-1234 or PS-TEST-20251201).
         listing: "disco" or "upstairs" to determine which calendars to clean.
         verbose: If True, prints actions taken to the console.
+        dry_run: If True, only prints the plan; nothing is deleted.
 
     Behavior:
         - For 'disco':
             Removes Airbnb reservation, buffers, turnover, and any Peerspace buffer or block events.
         - For 'upstairs':
             Removes Airbnb reservations from the Upstairs calendar only.
+
+    Sync wrapper around cancel_all_for_booking_async(); returns the plan.
+    """
+    return run(cancel_all_for_booking_async(booking_id, listing, verbose=verbose, dry_run=dry_run))
+
+
+async def cancel_all_for_booking_async(booking_id: str, listing: str, verbose: bool = True,
+                                       cal: Optional[AsyncCalendar] = None,
+                                       dry_run: bool = False) -> Plan:
+    """
+    Same as cancel_all_for_booking(), with the calendars handled concurrently:
+    name lookups run side by side, then each calendar's batched lookup runs at
+    the same time as the others'; the deletes for all of them go out as one batch.
     """
+    own = cal is None
+    cal = cal or AsyncCalendar()
+    try:
+        return await _cancel(cal, booking_id, listing, verbose, dry_run)
+    finally:
+        if own:
+            cal.close()
+
 
+async def _cancel(cal: AsyncCalendar, booking_id: str, listing: str, verbose: bool,
+                  dry_run: bool = False) -> Plan:
     # ------------------------------
     # Calendar + key selection
     # ------------------------------
     if listing.lower() == "disco":
-        cal_ids = [get_cal_id(CAL_DISCO), get_cal_id(CAL_BLOCK)]
+        cal_ids = await cal.gather(cal.get_cal_id(CAL_DISCO), cal.get_cal_id(CAL_BLOCK))
 
         # These are the known extendedProperties keys for Disco-related events
         keys = [
@@ -65,39 +98,54 @@ def cancel_all_for_booking(booking_id: str, listing: str, verbose: bool = True)
         extra_key = ("booking_id", booking_id)
 
     elif listing.lower() == "upstairs":
-        cal_ids = [get_cal_id(CAL_UPSTAIRS)]
+        cal_ids = [await cal.get_cal_id(CAL_UPSTAIRS)]
         keys = [("type_booking", f"ab_res|{booking_id}")]
         extra_key = None
 
     else:
         raise SystemExit("Error: listing must be 'disco' or 'upstairs'.")
 
+    if extra_key:
+        keys.append(extra_key)
+
     # ------------------------------
     # Deletion process
     # ------------------------------
-    for cal_id in cal_ids:
-        for key, value in keys:
-            count = delete_event_by_private(cal_id, key, value)
-            if verbose and count:
-                print(f"[{listing.upper()}] Deleted {count} events where {key}='{value}'")
-
-        if extra_key:
-            count = delete_event_by_private(cal_id, extra_key[0], extra_key[1])
-            if verbose and count:
-                print(f"[{listing.upper()}] Deleted {count} events where {extra_key[0]}='{extra_key[1]}'")
+    # Per calendar: one batched lookup for every key (calendars concurrently),
+    # then every delete goes out in one batch.
+    plans = await cal.gather(*(cal.plan_delete_by_private_keys(cal_id, keys) for cal_id in cal_ids))
+    plan = Plan()
+    for p in plans:
+        plan.extend(p)
+    plan.names.update({cid: name for cid, name in zip(cal_ids, CAL_NAMES[listing.lower()])})
+    plan.optimize()
+
+    if dry_run:
+        print(plan.render())
+        return plan
+    await cal.apply_plan(plan)
+
+    counts = {}
+    for op in plan.writes:
+        counts[op.key] = counts.get(op.key, 0) + 1
+    for (key, value), count in counts.items():
+        if verbose:
+            print(f"[{listing.upper()}] Deleted {count} events where {key}='{value}'")
 
     if verbose:
         print(f"[{listing.upper()}] Cancellation complete for booking_id={booking_id}")
+    return plan
 
 # ---------------------------------------------------------------------------
 # CLI ENTRYPOINT
 # ---------------------------------------------------------------------------
 
 if __name__ == "__main__":
-    args = sys.argv[1:]
+    profiling.from_argv("actions.cancel")
+    args = [a for a in sys.argv[1:] if a != "--dry-run"]
     if len(args) < 2:
-        print("Usage: python3 -m actions.cancel <BOOKING_ID> <disco|upstairs>")
+        print("Usage: python3 -m actions.cancel [--dry-run] [--profile] <BOOKING_ID> <disco|upstairs>")
         sys.exit(1)
 
     booking_id, listing = args[:2]
-    cancel_all_for_booking(booking_id, listing, verbose=True)
\ No newline at end of file
+    cancel_all_for_booking(booking_id, listing, verbose=True, dry_run="--dry-run" in sys.argv[1:])
\ No newline at end of file
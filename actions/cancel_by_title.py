@@ -1,38 +1,40 @@
 from datetime import datetime, timedelta
-import sys, re
-from tools.gcal_tool import get_cal_id, _svc
+import sys
+from tools.gcal_tool import apply_plan, get_cal_id, plan_delete_matching
+from calendar_agent import profiling
 
-def run(calendar_name, title_substring, start_date, end_date):
+def plan(calendar_name, title_substring, start_date, end_date):
+    """Deletes of every event on calendar_name in [start_date, end_date] whose title contains the text."""
     cal_id = get_cal_id(calendar_name)
-    s = _svc()
 
     # window: whole days [start_date, end_date]
     d0 = datetime.strptime(start_date, "%Y-%m-%d")
     d1 = datetime.strptime(end_date,   "%Y-%m-%d") + timedelta(days=1)
 
-    resp = s.events().list(
-        calendarId=cal_id,
-        timeMin=d0.astimezone().isoformat(),
-        timeMax=d1.astimezone().isoformat(),
-        singleEvents=True,
-        maxResults=2500,
-        orderBy="startTime",
-    ).execute()
-
     needle = title_substring.lower()
-    deleted = 0
-    for e in resp.get("items", []):
-        title = e.get("summary","")
-        if needle in title.lower():
-            s.events().delete(calendarId=cal_id, eventId=e["id"]).execute()
-            print(f"Deleted: {title}")
-            deleted += 1
-    if deleted == 0:
+    p = plan_delete_matching(cal_id, d0.astimezone(), d1.astimezone(),
+                             lambda e: needle in (e.get("summary") or "").lower())
+    p.names[cal_id] = calendar_name
+    return p
+
+def run(calendar_name, title_substring, start_date, end_date, dry_run=False):
+    p = plan(calendar_name, title_substring, start_date, end_date)
+    if dry_run:
+        print(p.render())
+        return p
+    if not p.writes:
         print("No matching events found.")
+        return p
+    apply_plan(p)
+    for op in p.writes:
+        print(f"Deleted: {op.current.get('summary', '')}")
+    return p
 
 if __name__ == "__main__":
+    profiling.from_argv("actions.cancel_by_title")
     # Usage: python -m actions.cancel_by_title "Upstairs Bookings" "Brandon" 2025-12-20 2025-12-23
-    if len(sys.argv) != 5:
-        print('Usage: python -m actions.cancel_by_title "<Calendar Name>" "<Title contains>" YYYY-MM-DD YYYY-MM-DD')
+    args = [a for a in sys.argv[1:] if a != "--dry-run"]
+    if len(args) != 4:
+        print('Usage: python -m actions.cancel_by_title [--dry-run] [--profile] "<Calendar Name>" "<Title contains>" YYYY-MM-DD YYYY-MM-DD')
         sys.exit(1)
-    run(sys.argv[1], sys.argv[2], sys.argv[3], sys.argv[4])
\ No newline at end of file
+    run(*args, dry_run="--dry-run" in sys.argv[1:])
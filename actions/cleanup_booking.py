@@ -1,21 +1,47 @@
 import sys
-from tools.gcal_tool import get_cal_id, delete_all_events_by_private
+from calendar_agent.calendar.plan import Plan
+from tools.gcal_async import AsyncCalendar, run as run_async
+from calendar_agent import profiling
 CAL_DISCO = "Disco Bookings"
 CAL_BLOCK = "Block on Airbnb"
 
-def run(booking_key: str):
-    did = get_cal_id(CAL_DISCO)
-    bid = get_cal_id(CAL_BLOCK)
-    n1 = delete_all_events_by_private(did, "booking_key", booking_key)
-    n2 = delete_all_events_by_private(bid, "booking_key", booking_key)
-    # also remove per-day ps_block_key entries on Block on Airbnb
-    # (they all start with booking_key + "|")
-    from tools.gcal_tool import delete_events_by_private_prefix
-    n3 = delete_events_by_private_prefix(bid, "ps_block_key", booking_key + "|")
-    print(f"Removed {n1} from Disco, {n2+n3} from Block on Airbnb")
+async def plan_cleanup(booking_key: str) -> Plan:
+    """Disco and Block on Airbnb are looked up concurrently; the deletes form one plan."""
+    async with AsyncCalendar() as cal:
+        did, bid = await cal.gather(cal.get_cal_id(CAL_DISCO), cal.get_cal_id(CAL_BLOCK))
+        # also remove per-day ps_block_key entries on Block on Airbnb
+        # (ps_block_key = booking_key + "|<date>", stamped with ps_block_key_parent = booking_key);
+        # each calendar is one batched lookup
+        disco, block = await cal.gather(
+            cal.plan_delete_by_private_keys(did, [("booking_key", booking_key)]),
+            cal.plan_delete_by_private_keys(bid, [("booking_key", booking_key),
+                                                  ("ps_block_key_parent", booking_key)]),
+        )
+    plan = disco.extend(block)
+    plan.names.update({did: CAL_DISCO, bid: CAL_BLOCK})
+    plan.optimize()
+    return plan
+
+async def cleanup(booking_key: str):
+    """Deletes everything for booking_key in one batch; returns (n_disco, n_block)."""
+    plan = await plan_cleanup(booking_key)
+    async with AsyncCalendar() as cal:
+        await cal.apply_plan(plan)
+    n1 = sum(plan.names[op.calendar_id] == CAL_DISCO for op in plan.writes)
+    return n1, len(plan.writes) - n1
+
+def run(booking_key: str, dry_run: bool = False):
+    if dry_run:
+        plan = run_async(plan_cleanup(booking_key))
+        print(plan.render())
+        return plan
+    n1, n2 = run_async(cleanup(booking_key))
+    print(f"Removed {n1} from Disco, {n2} from Block on Airbnb")
 
 if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print("Usage: python -m actions.cleanup_booking 'ps|<Guest>|<YYYY-MM-DD>'")
+    profiling.from_argv("actions.cleanup_booking")
+    args = [a for a in sys.argv[1:] if a != "--dry-run"]
+    if len(args) != 1:
+        print("Usage: python -m actions.cleanup_booking [--dry-run] [--profile] 'ps|<Guest>|<YYYY-MM-DD>'")
         sys.exit(1)
-    run(sys.argv[1])
+    run(args[0], dry_run="--dry-run" in sys.argv[1:])
@@ -1,6 +1,7 @@
 import sys
 from datetime import datetime, timedelta
 from tools.gcal_tool import get_cal_id, _svc
+from calendar_agent import profiling
 
 def iso(dt): return dt.isoformat()
 
@@ -21,8 +22,9 @@ def list_events(cal_name, start_iso, end_iso):
         print(f"  private={priv}")
 
 if __name__ == "__main__":
+    profiling.from_argv("actions.debug_list")
     if len(sys.argv) != 4:
-        print("Usage: python -m actions.debug_list '<Calendar Name>' YYYY-MM-DD YYYY-MM-DD")
+        print("Usage: python -m actions.debug_list [--profile] '<Calendar Name>' YYYY-MM-DD YYYY-MM-DD")
         sys.exit(1)
     cal_name, d1, d2 = sys.argv[1], sys.argv[2], sys.argv[3]
     # include entire end day
@@ -0,0 +1,75 @@
+"""
+actions/ical_feed.py
+-------------------------------------------------
+Publish Disco's unavailable dates (Block on Airbnb + Disco reservations) as an
+iCal feed for Airbnb's calendar import, instead of clicking each date in the
+Airbnb multicalendar (scripts/airbnb_block_dates.py).
+
+Each run reads the calendars through the availability index (mirror delta,
+else one list per calendar) and re-renders only the VEVENTs whose dates
+changed (calendar_agent/feed.py). The feed is written to
+<state dir>/availability.ics.
+
+Usage:
+    python -m actions.ical_feed [--profile]                     # regenerate once
+    python -m actions.ical_feed --serve [--port 8765] [--refresh 300]
+
+--serve answers GET/HEAD with ETag / Last-Modified (304 when unchanged) and
+regenerates the feed every --refresh seconds; point Airbnb at
+http://<host>:<port>/availability.ics.
+"""
+import argparse
+import os
+import time
+from datetime import date, datetime, timedelta
+from typing import Optional
+from zoneinfo import ZoneInfo
+
+from calendar_agent import profiling
+from calendar_agent.calendar.availability import Availability
+from calendar_agent.config import settings
+from calendar_agent.feed import AvailabilityFeed, FeedChange, feed_intervals, serve
+from tools.gcal_tool import load_availability
+
+
+def feed_path() -> str:
+    return os.path.join(settings.state_dir, "availability.ics")
+
+
+def refresh(feed: AvailabilityFeed, avail: Optional[Availability] = None) -> FeedChange:
+    """Bring the feed up to date for today … ICAL_FEED_DAYS ahead (avail is refreshed in place)."""
+    today = date.today()
+    last = (today + timedelta(days=settings.ical_feed_days)).isoformat()
+    avail = load_availability(today.isoformat(), last, availability=avail)
+    since = datetime.now(feed.tz).replace(hour=0, minute=0, second=0, microsecond=0)
+    return feed.update(feed_intervals(avail.spaces["Disco"], since))
+
+
+def run(serve_port: Optional[int] = None, every: float = 300.0) -> FeedChange:
+    feed = AvailabilityFeed(feed_path(), ZoneInfo(settings.timezone))
+    avail = Availability(settings.timezone)
+    change = refresh(feed, avail)
+    print(f"[feed] {feed.path}: {len(feed.entries)} event(s); {change}; ETag {feed.etag}")
+    if serve_port is None:
+        return change
+    server = serve(feed.path, serve_port, host="0.0.0.0")
+    print(f"[feed] serving on http://0.0.0.0:{server.server_address[1]}/availability.ics")
+    try:
+        while True:
+            time.sleep(every)
+            change = refresh(feed, avail)
+            if change:
+                print(f"[feed] {datetime.now():%H:%M:%S} {change}; ETag {feed.etag}")
+    except KeyboardInterrupt:
+        server.shutdown()
+    return change
+
+
+if __name__ == "__main__":
+    profiling.from_argv("actions.ical_feed")
+    ap = argparse.ArgumentParser(description="Write (and serve) Disco's unavailable dates as an iCal feed.")
+    ap.add_argument("--serve", action="store_true", help="serve the feed and keep it fresh")
+    ap.add_argument("--port", type=int, default=settings.ical_feed_port)
+    ap.add_argument("--refresh", type=float, default=settings.ical_feed_refresh, help="seconds between refreshes")
+    a = ap.parse_args()
+    run(a.port if a.serve else None, a.refresh)
@@ -0,0 +1,220 @@
+"""
+actions/reconcile.py
+-------------------------------------------------
+Repairs drift on Disco Bookings, Upstairs Bookings and Block on Airbnb for a
+whole date range in one run, instead of cancel / cleanup_booking /
+block_manual one booking at a time.
+
+1. Desired state is rebuilt from the known bookings (the booking repository
+   filled by the Gmail sync, plus an optional --bookings JSON file) with the
+   same rules the actions use:
+     - Airbnb Disco: reservation, CHECK-IN BUFFER, TURNOVER (type_booking keys)
+     - Airbnb Upstairs: reservation only
+     - Peerspace: EVENT / PHOTOSHOOT buffer on Disco (booking_key) and one
+       all-day block per date from tools/rules.py (plan_blocks, one pass over
+       every booking), titles merged across bookings ("EVENT + PHOTOSHOOT",
+       "2X EVENTS")
+2. Each calendar is fetched once for the range (mirror delta, else one paged
+   list), and compared with the desired events in one sorted-merge pass keyed
+   by private properties.
+3. Only the differences are written, as one batched plan.
+
+Events the agent does not manage (no agent keys) are never touched. Managed
+events whose booking is unknown are reported, and deleted only with --prune.
+Known bookings that overlap each other (buffers included) are reported too.
+
+Usage:
+    python -m actions.reconcile [--dry-run] [--profile] [--prune] [--from YYYY-MM-DD] [--to YYYY-MM-DD]
+                                [--bookings bookings.json]
+"""
+import argparse
+import json
+from datetime import date, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from actions.airbnb_to_disco import build_events as disco_events
+from actions.airbnb_to_upstairs import build_event as upstairs_event
+from calendar_agent.calendar.availability import Availability, Interval
+from calendar_agent.calendar.plan import Plan
+from calendar_agent.calendar.service import _repo
+from calendar_agent.config import settings
+from calendar_agent.models.booking import Booking
+from tools.gcal_async import AsyncCalendar, run as run_async
+from tools.gcal_tool import write_summary
+from tools.rules import format_block_label, plan_blocks
+from calendar_agent import profiling
+
+CAL_DISCO = "Disco Bookings"
+CAL_UPSTAIRS = "Upstairs Bookings"
+CAL_BLOCK = "Block on Airbnb"
+
+BLOCK_DATE_KEY = "ps_block_date"   # one managed block per date on Block on Airbnb
+
+Desired = Tuple[Dict[str, Any], str, str]  # (body, key, value)
+
+
+# ---------------- known bookings ----------------
+def known_bookings(extra_path: Optional[str] = None) -> List[Booking]:
+    """Bookings from the repository (one per source/external_id) plus a JSON list file."""
+    found: Dict[Tuple[str, str], Booking] = {}
+    for row in _repo().all():
+        if row["payload"]:
+            b = Booking.model_validate_json(row["payload"])
+            found[(b.source, b.external_id)] = b
+    if extra_path:
+        with open(extra_path) as f:
+            for item in json.load(f):
+                b = Booking.model_validate(item)
+                found[(b.source, b.external_id)] = b
+    return list(found.values())
+
+
+def adopted_reservations() -> Dict[str, Tuple[str, str]]:
+    """{event id: reservation key} for Airbnb events created by the Gmail sync (no agent keys yet)."""
+    out = {}
+    for row in _repo().all("airbnb"):
+        out[row["provider_id"]] = ("type_booking", f"ab_res|{row['external_id']}")
+    return out
+
+
+# ---------------- desired state ----------------
+def peerspace_key(b: Booking) -> str:
+    return f"ps|{b.external_id}|{b.start.date()}"
+
+
+def peerspace_label(b: Booking) -> str:
+    return "PHOTOSHOOT" if b.kind == "production" else "EVENT"
+
+
+def peerspace_buffer(b: Booking, tz: str) -> Desired:
+    """1 h before the booking to 2 h after an event / 1 h after a shoot (Disco)."""
+    after = 1 if b.kind == "production" else 2
+    bk = peerspace_key(b)
+    body = {
+        "summary": peerspace_label(b),
+        "location": "1-hr buffer",
+        "start": {"dateTime": (b.start - timedelta(hours=1)).isoformat(), "timeZone": tz},
+        "end":   {"dateTime": (b.end + timedelta(hours=after)).isoformat(), "timeZone": tz},
+        "extendedProperties": {"private": {"source": "agent", "type": "peerspace", "booking_key": bk}},
+    }
+    return body, "booking_key", bk
+
+
+def block_events(bookings: Iterable[Booking]) -> List[Desired]:
+    """One all-day block per date, its title listing every Peerspace booking on it."""
+    bookings = list(bookings)
+    out = []
+    for d, ix in plan_blocks([b.start for b in bookings], [b.end for b in bookings]).items():
+        bs = sorted((bookings[i] for i in ix), key=peerspace_key)
+        bk = peerspace_key(bs[0])
+        body = {
+            "summary": format_block_label([peerspace_label(b) for b in bs]),
+            "start": {"date": d},
+            "end":   {"date": (date.fromisoformat(d) + timedelta(days=1)).isoformat()},
+            "extendedProperties": {"private": {"source": "agent", "type": "block",
+                                               "booking_key": bk, "ps_block_key": f"{bk}|{d}"}},
+        }
+        out.append((body, BLOCK_DATE_KEY, d))
+    return out
+
+
+def desired_state(bookings: Iterable[Booking], tz: str) -> Dict[str, List[Desired]]:
+    """{calendar name: [(body, key, value), ...]} for every known booking."""
+    out: Dict[str, List[Desired]] = {CAL_DISCO: [], CAL_UPSTAIRS: [], CAL_BLOCK: []}
+    peerspace = []
+    for b in bookings:
+        guest = b.guest_name or "Airbnb guest"
+        if b.source == "airbnb" and b.space == "Disco":
+            out[CAL_DISCO].extend(disco_events(b.external_id, guest, b.start.isoformat(), b.end.isoformat()))
+        elif b.source == "airbnb":
+            out[CAL_UPSTAIRS].append(upstairs_event(b.external_id, guest, b.start.isoformat(), b.end.isoformat()))
+        elif b.source == "peerspace":
+            out[CAL_DISCO].append(peerspace_buffer(b, tz))
+            peerspace.append(b)
+    out[CAL_BLOCK].extend(block_events(peerspace))
+    return out
+
+
+def booking_conflicts(bookings: Iterable[Booking], tz: str) -> List[Tuple[Booking, List[Interval]]]:
+    """Known bookings that overlap an earlier one in the same space, buffers included."""
+    avail = Availability(tz)
+    out = []
+    for b in sorted(bookings, key=lambda b: (b.start, b.source, b.external_id)):
+        found = avail.ingest(b)
+        if found:
+            out.append((b, found))
+    return out
+
+
+# ---------------- actual state ----------------
+def managed_key(event: Dict[str, Any], adopt: Dict[str, Tuple[str, str]]) -> Optional[Tuple[str, str]]:
+    """The private key the desired state uses for this event; None = not ours, leave it alone."""
+    priv = (event.get("extendedProperties", {}) or {}).get("private", {}) or {}
+    if priv.get("type_booking"):
+        return "type_booking", priv["type_booking"]
+    day = (event.get("start", {}) or {}).get("date")
+    if day and (priv.get(BLOCK_DATE_KEY) or priv.get("ps_block_key") or priv.get("booking_key")):
+        return BLOCK_DATE_KEY, day  # an agent block, whichever booking stamped it
+    if priv.get("booking_key"):
+        return "booking_key", priv["booking_key"]
+    return adopt.get(event.get("id"))
+
+
+# ---------------- plan / apply ----------------
+async def plan_reconcile(first: str, last: str, bookings: List[Booking], prune: bool = False):
+    """(plan, {calendar name: orphans}) for [first, last]; every calendar is read concurrently."""
+    tz = ZoneInfo(settings.timezone)
+    desired = desired_state(bookings, settings.timezone)
+    adopt = adopted_reservations()
+    names = (CAL_DISCO, CAL_UPSTAIRS, CAL_BLOCK)
+    async with AsyncCalendar() as cal:
+        ids = await cal.gather(*(cal.get_cal_id(n) for n in names))
+        results = await cal.gather(*(
+            cal.plan_reconcile(cid, first, last, desired[n], lambda e: managed_key(e, adopt),
+                               prune=prune, tz=tz)
+            for cid, n in zip(ids, names)))
+    plan = Plan()
+    orphans = {}
+    for cid, n, (p, found) in zip(ids, names, results):
+        plan.extend(p)
+        plan.names[cid] = n
+        orphans[n] = found
+    plan.optimize()
+    return plan, orphans
+
+
+def run(first: str, last: str, bookings_path: Optional[str] = None, prune: bool = False,
+        dry_run: bool = False) -> Plan:
+    bookings = known_bookings(bookings_path)
+    plan, orphans = run_async(plan_reconcile(first, last, bookings, prune))
+    print(f"[reconcile] {first} → {last}: {len(bookings)} known booking(s)")
+    print(plan.render())
+    for b, found in booking_conflicts(bookings, settings.timezone):
+        print(f"! [{b.space}] {b.source} {b.external_id} {b.start:%Y-%m-%d %H:%M} overlaps "
+              + ", ".join(f"{iv.kind} of {iv.booking or iv.event_id}" for iv in found))
+    for name, events in orphans.items():
+        for e in events:
+            print(f"? [{name}] {e['id']} {e.get('summary', '')!r}: no known booking (--prune deletes it)")
+    if dry_run:
+        return plan
+    if plan.writes:
+        async def apply():
+            async with AsyncCalendar() as cal:
+                await cal.apply_plan(plan)
+        run_async(apply())
+    print(write_summary())
+    return plan
+
+
+if __name__ == "__main__":
+    profiling.from_argv("actions.reconcile")
+    today = date.today()
+    ap = argparse.ArgumentParser(description="Reconcile Disco / Upstairs / Block on Airbnb with the known bookings.")
+    ap.add_argument("--from", dest="first", default=today.isoformat())
+    ap.add_argument("--to", dest="last", default=(today + timedelta(days=365)).isoformat())
+    ap.add_argument("--bookings", help="JSON list of extra bookings (Booking fields)")
+    ap.add_argument("--prune", action="store_true", help="delete managed events with no known booking")
+    ap.add_argument("--dry-run", action="store_true", help="print the plan, write nothing")
+    a = ap.parse_args()
+    run(a.first, a.last, a.bookings, prune=a.prune, dry_run=a.dry_run)
@@ -0,0 +1,334 @@
+"""
+calendar_agent/calendar/availability.py
+-------------------------------------------------
+Availability queries for the Disco and Upstairs lofts, answered from an
+in-memory interval index instead of listing calendars.
+
+Each space has one IntervalIndex over what occupies it:
+
+- Disco: Disco Bookings (reservations, CHECK-IN BUFFER, TURNOVER, Peerspace
+  1-hr buffers) and Block on Airbnb (all-day blocks)
+- Upstairs: Upstairs Bookings (reservations)
+
+The index loads from Google event JSON (tools/gcal_tool.load_availability
+reads it from the mirror or one list per calendar) and is updated in place
+from later event JSON: a changed event replaces its old interval, a
+"cancelled" one removes it.
+
+Intervals are kept in sorted start arrays, one per length class (class c
+holds intervals shorter than 2^c minutes). An overlap query bisects each
+class for starts in [query start - 2^c min, query end) and keeps the ones
+that end after the query start: O(log n + k) per class, where the few
+false candidates are intervals of that class that ended just before the
+query. A single long reservation therefore does not widen the scan window
+for every 1-hour buffer.
+
+    avail = load_availability("2026-03-01", "2026-03-31")
+    avail.is_free("Disco", start, end)            # buffers included
+    avail.conflicts(booking)                      # before writing a new booking
+    avail.free_slots("Disco", day_start, day_end, min_length=timedelta(hours=4))
+"""
+from __future__ import annotations
+
+from bisect import bisect_left
+from dataclasses import dataclass
+from datetime import datetime, time, timedelta, tzinfo
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from zoneinfo import ZoneInfo
+
+from calendar_agent.models.booking import Booking
+
+RESERVATION = "reservation"
+CHECKIN_BUFFER = "checkin_buffer"
+TURNOVER = "turnover"
+PEERSPACE_BUFFER = "peerspace_buffer"
+BLOCK = "block"
+KINDS = (RESERVATION, CHECKIN_BUFFER, TURNOVER, PEERSPACE_BUFFER, BLOCK)
+
+SPACE_CALENDARS = {
+    "Disco": ("Disco Bookings", "Block on Airbnb"),
+    "Upstairs": ("Upstairs Bookings",),
+}
+
+# the windows actions/airbnb_to_disco.py and actions/reconcile.py write
+CHECKIN_BUFFER_HOURS = 2
+TURNOVER_HOURS = 2
+PEERSPACE_BEFORE_HOURS = 1
+PEERSPACE_AFTER_HOURS = {"event": 2, "production": 1}
+
+# Block on Airbnb dates follow from the Peerspace bookings themselves (the
+# day before / of an event), so they only stop Airbnb stays.
+CONFLICT_KINDS = {
+    "lodging": KINDS,
+    "event": (RESERVATION, CHECKIN_BUFFER, TURNOVER, PEERSPACE_BUFFER),
+    "production": (RESERVATION, CHECKIN_BUFFER, TURNOVER, PEERSPACE_BUFFER),
+}
+
+_TYPE_KINDS = {
+    "ab_res": RESERVATION,
+    "ab_checkin_buffer": CHECKIN_BUFFER,
+    "ab_turnover": TURNOVER,
+    "peerspace": PEERSPACE_BUFFER,
+    "block": BLOCK,
+}
+
+
+@dataclass(frozen=True)
+class Interval:
+    start: datetime
+    end: datetime
+    event_id: str
+    kind: str
+    summary: str = ""
+    booking: str = ""     # external id of the booking that created it, when known
+
+    def overlaps(self, start: datetime, end: datetime) -> bool:
+        return self.start < end and start < self.end
+
+
+# ---------------- event JSON → interval ----------------
+def _private(event: Dict[str, Any]) -> Dict[str, str]:
+    return (event.get("extendedProperties", {}) or {}).get("private", {}) or {}
+
+
+def event_kind(event: Dict[str, Any]) -> str:
+    """Which of KINDS an event is: agent type keys first, then its shape."""
+    priv = _private(event)
+    kind = _TYPE_KINDS.get(priv.get("type", ""))
+    if kind:
+        return kind
+    if (event.get("start", {}) or {}).get("date") or priv.get("manual_block"):
+        return BLOCK
+    if (event.get("location") or "") == "1-hr buffer" or priv.get("booking_key"):
+        return PEERSPACE_BUFFER
+    summary = (event.get("summary") or "").strip().upper()
+    if summary == "CHECK-IN BUFFER":
+        return CHECKIN_BUFFER
+    if summary == "TURNOVER":
+        return TURNOVER
+    return RESERVATION
+
+
+def event_booking(event: Dict[str, Any]) -> str:
+    """External id of the booking behind an event ('' when it cannot be told)."""
+    priv = _private(event)
+    if priv.get("booking_id"):
+        return priv["booking_id"]
+    if priv.get("booking_key", "").startswith("ps|"):
+        return priv["booking_key"].split("|")[1]
+    for part in (event.get("description") or "").split():
+        if part.startswith("external_id="):  # events written by calendar/google.py
+            return part.split("=", 1)[1]
+    return ""
+
+
+def _when(part: Dict[str, Any], tz: tzinfo) -> Optional[datetime]:
+    if part.get("dateTime"):
+        dt = datetime.fromisoformat(part["dateTime"])
+        return dt if dt.tzinfo else dt.replace(tzinfo=tz)
+    if part.get("date"):
+        return datetime.combine(datetime.fromisoformat(part["date"]).date(), time(0, 0), tzinfo=tz)
+    return None
+
+
+def event_interval(event: Dict[str, Any], tz: tzinfo) -> Optional[Interval]:
+    """The time an event occupies (all-day events: local midnight to midnight); None if cancelled."""
+    if event.get("status") == "cancelled":
+        return None
+    start = _when(event.get("start", {}) or {}, tz)
+    end = _when(event.get("end", {}) or {}, tz)
+    if start is None or end is None:
+        return None
+    return Interval(start, max(start, end), event["id"], event_kind(event),
+                    event.get("summary") or "", event_booking(event))
+
+
+# ---------------- index ----------------
+def _length_class(iv: Interval) -> int:
+    minutes = -(-int((iv.end - iv.start).total_seconds()) // 60)  # rounded up
+    return minutes.bit_length()
+
+
+class IntervalIndex:
+    def __init__(self, tz: Optional[tzinfo] = None):
+        self.tz = tz or datetime.now().astimezone().tzinfo
+        self._by_id: Dict[str, Interval] = {}
+        self._ends: Dict[str, float] = {}    # event id → end timestamp
+        # length class → sorted [(start timestamp, event id)]
+        self._classes: Dict[int, List[Tuple[float, str]]] = {}
+
+    @classmethod
+    def from_events(cls, events: Iterable[Dict[str, Any]], tz: Optional[tzinfo] = None) -> "IntervalIndex":
+        index = cls(tz)
+        index.update(events)
+        return index
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def __iter__(self) -> Iterator[Interval]:
+        return iter(sorted(self._by_id.values(), key=lambda iv: (iv.start, iv.event_id)))
+
+    def get(self, event_id: str) -> Optional[Interval]:
+        return self._by_id.get(event_id)
+
+    # ---------------- updates ----------------
+    def add(self, iv: Interval) -> None:
+        """Insert or replace (by event id) one interval."""
+        self._insert([iv])
+
+    def discard(self, event_id: str) -> Optional[Interval]:
+        iv = self._by_id.pop(event_id, None)
+        if iv is not None:
+            keys = self._classes[_length_class(iv)]
+            del keys[bisect_left(keys, (iv.start.timestamp(), event_id))]
+            del self._ends[event_id]
+        return iv
+
+    def _insert(self, ivs: List[Interval]) -> None:
+        for iv in ivs:
+            self.discard(iv.event_id)
+        touched = set()
+        for iv in ivs:
+            c = _length_class(iv)
+            self._by_id[iv.event_id] = iv
+            self._ends[iv.event_id] = iv.end.timestamp()
+            self._classes.setdefault(c, []).append((iv.start.timestamp(), iv.event_id))
+            touched.add(c)
+        for c in touched:
+            self._classes[c].sort()  # appended run + sorted run: linear for timsort
+
+    def update(self, events: Iterable[Dict[str, Any]]) -> Tuple[int, int]:
+        """Apply changed event JSON (cancelled = removed); returns (added or changed, removed)."""
+        changed: Dict[str, Interval] = {}
+        removed = 0
+        for e in events:
+            iv = event_interval(e, self.tz)
+            if iv is None:
+                changed.pop(e["id"], None)
+                removed += self.discard(e["id"]) is not None
+            elif self._by_id.get(iv.event_id) != iv:
+                changed[iv.event_id] = iv
+        self._insert(list(changed.values()))
+        return len(changed), removed
+
+    def replace(self, events: Iterable[Dict[str, Any]], start: datetime, end: datetime) -> Tuple[int, int]:
+        """
+        Make [start, end) match a fresh listing: update from `events`, and drop
+        intervals starting in the window that the listing no longer has.
+        """
+        events = list(events)
+        changed, removed = self.update(events)
+        seen = {e["id"] for e in events}
+        start, end = self._aware(start), self._aware(end)
+        for iv in list(self._by_id.values()):
+            if start <= iv.start < end and iv.event_id not in seen:
+                self.discard(iv.event_id)
+                removed += 1
+        return changed, removed
+
+    # ---------------- queries ----------------
+    def _aware(self, dt: datetime) -> datetime:
+        return dt if dt.tzinfo else dt.replace(tzinfo=self.tz)
+
+    def overlapping(self, start: datetime, end: datetime,
+                    kinds: Optional[Sequence[str]] = None) -> List[Interval]:
+        """Intervals overlapping [start, end), by start time."""
+        t0, t1 = self._aware(start).timestamp(), self._aware(end).timestamp()
+        ends, by_id = self._ends, self._by_id
+        found = []
+        for c, keys in self._classes.items():
+            lo = bisect_left(keys, (t0 - (1 << c) * 60,))
+            hi = bisect_left(keys, (t1,))
+            found.extend(k for k in keys[lo:hi] if ends[k[1]] > t0)
+        found.sort()
+        out = [by_id[event_id] for _, event_id in found]
+        if kinds is not None:
+            out = [iv for iv in out if iv.kind in kinds]
+        return out
+
+    def is_free(self, start: datetime, end: datetime, kinds: Optional[Sequence[str]] = None) -> bool:
+        return not self.overlapping(start, end, kinds)
+
+    def free_slots(self, start: datetime, end: datetime, min_length: timedelta = timedelta(0),
+                   kinds: Optional[Sequence[str]] = None) -> List[Tuple[datetime, datetime]]:
+        """Gaps of at least min_length in [start, end) between the (merged) busy intervals."""
+        start, end = self._aware(start), self._aware(end)
+        slots = []
+        cur = start
+        for iv in self.overlapping(start, end, kinds):
+            if iv.start > cur and iv.start - cur >= min_length:
+                slots.append((cur, iv.start))
+            cur = max(cur, iv.end)
+        if end > cur and end - cur >= min_length:
+            slots.append((cur, end))
+        return slots
+
+
+# ---------------- per space ----------------
+def booking_intervals(b: Booking) -> List[Interval]:
+    """What a booking will occupy once written, buffers included (ids are the agent's keys)."""
+    if b.source == "peerspace" or b.kind in ("event", "production"):
+        after = PEERSPACE_AFTER_HOURS.get(b.kind, PEERSPACE_AFTER_HOURS["event"])
+        return [Interval(b.start - timedelta(hours=PEERSPACE_BEFORE_HOURS), b.end + timedelta(hours=after),
+                         f"ps|{b.external_id}|{b.start.date()}", PEERSPACE_BUFFER, b.kind.upper(),
+                         b.external_id)]
+    guest = b.guest_name or ""
+    out = [Interval(b.start, b.end, f"ab_res|{b.external_id}", RESERVATION, guest, b.external_id)]
+    if b.space == "Disco":
+        out += [
+            Interval(b.start - timedelta(hours=CHECKIN_BUFFER_HOURS), b.start,
+                     f"ab_checkin_buffer|{b.external_id}", CHECKIN_BUFFER, "CHECK-IN BUFFER", b.external_id),
+            Interval(b.end, b.end + timedelta(hours=TURNOVER_HOURS),
+                     f"ab_turnover|{b.external_id}", TURNOVER, "TURNOVER", b.external_id),
+        ]
+    return out
+
+
+class Availability:
+    """One IntervalIndex per space (see SPACE_CALENDARS); tz places all-day events."""
+
+    def __init__(self, tz=None):
+        if isinstance(tz, str):
+            tz = ZoneInfo(tz)
+        self.tz = tz or datetime.now().astimezone().tzinfo
+        self.spaces: Dict[str, IntervalIndex] = {s: IntervalIndex(self.tz) for s in SPACE_CALENDARS}
+
+    def update(self, space: str, events: Iterable[Dict[str, Any]]) -> Tuple[int, int]:
+        return self.spaces[space].update(events)
+
+    def replace(self, space: str, events: Iterable[Dict[str, Any]], start: datetime,
+                end: datetime) -> Tuple[int, int]:
+        return self.spaces[space].replace(events, start, end)
+
+    def overlapping(self, space: str, start: datetime, end: datetime,
+                    kinds: Optional[Sequence[str]] = None) -> List[Interval]:
+        return self.spaces[space].overlapping(start, end, kinds)
+
+    def is_free(self, space: str, start: datetime, end: datetime,
+                kinds: Optional[Sequence[str]] = None) -> bool:
+        return self.spaces[space].is_free(start, end, kinds)
+
+    def free_slots(self, space: str, start: datetime, end: datetime,
+                   min_length: timedelta = timedelta(0),
+                   kinds: Optional[Sequence[str]] = None) -> List[Tuple[datetime, datetime]]:
+        return self.spaces[space].free_slots(start, end, min_length, kinds)
+
+    def conflicts(self, b: Booking) -> List[Interval]:
+        """What is already in the way of a booking (its own buffers included, its own events ignored)."""
+        index = self.spaces[b.space]
+        kinds = CONFLICT_KINDS.get(b.kind, KINDS)
+        found: Dict[str, Interval] = {}
+        for want in booking_intervals(b):
+            for iv in index.overlapping(want.start, want.end, kinds):
+                if iv.booking != b.external_id and iv.event_id not in found:
+                    found[iv.event_id] = iv
+        return sorted(found.values(), key=lambda iv: (iv.start, iv.event_id))
+
+    def ingest(self, b: Booking) -> List[Interval]:
+        """conflicts(b), then add the booking's intervals so later bookings see them."""
+        found = self.conflicts(b)
+        index = self.spaces[b.space]
+        for iv in booking_intervals(b):
+            index.add(iv)
+        return found
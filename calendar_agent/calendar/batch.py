@@ -0,0 +1,205 @@
+"""
+calendar_agent/calendar/batch.py
+-------------------------------------------------
+Collects Calendar requests and sends them as Google batch HTTP requests.
+
+One batch carries up to BATCH_SIZE calls (Google's recommended ceiling for
+Calendar), so deleting 40 events is one round trip instead of 40. Every
+operation gets its own BatchResult; only sub-requests that failed with a
+retryable status are sent again, with exponential backoff.
+
+Inserts get a client-generated event id, so an insert that was applied but
+whose response was lost comes back as 409 on retry and counts as done
+instead of creating a duplicate.
+
+Each round trip takes one token per sub-request from the Calendar limiter
+(calendar_agent/ratelimit.py), and throttled sub-requests shrink it, so
+batches and single calls share one quota budget. With --profile on, each
+round trip is recorded as "calendar.batch" plus one
+"calendar.events.<kind>.subrequest" per operation.
+"""
+from __future__ import annotations
+
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+from calendar_agent.profiling import PROFILER, count_items
+from calendar_agent.ratelimit import (  # noqa: F401  (re-exported)
+    RATE_LIMIT_REASONS, RETRYABLE_STATUS, backoff_delay, http_status, is_retryable, is_throttle,
+    limiter,
+)
+
+BATCH_SIZE = 50
+MAX_RETRIES = 4
+
+
+@dataclass
+class BatchResult:
+    kind: str                      # "insert" | "patch" | "delete" | "list" | ...
+    calendar_id: str
+    event_id: Optional[str] = None
+    ok: bool = False
+    response: Optional[Dict[str, Any]] = None
+    error: Optional[Exception] = None
+    attempts: int = 0
+    note: str = ""
+
+
+class BatchFailed(RuntimeError):
+    """Raised by raise_for_errors() when some operations could not be completed."""
+
+    def __init__(self, failed: List[BatchResult]):
+        self.failed = failed
+        first = failed[0]
+        super().__init__(f"{len(failed)} batched operation(s) failed; first: "
+                         f"{first.kind} {first.event_id or ''} on {first.calendar_id}: {first.error}")
+
+
+@dataclass
+class _Op:
+    result: BatchResult
+    make: Callable[[], Any]        # builds a fresh HttpRequest for each attempt
+
+
+class CalendarBatch:
+    """
+    Queue Calendar calls, then execute() them in batches of BATCH_SIZE.
+
+        batch = CalendarBatch(svc)
+        batch.delete(cal_id, event_id)
+        batch.insert(cal_id, body)
+        results = batch.execute()
+    """
+
+    def __init__(self, service, batch_size: int = BATCH_SIZE, max_retries: int = MAX_RETRIES,
+                 on_done: Optional[Callable[[List["BatchResult"]], None]] = None):
+        self.service = service
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.on_done = on_done  # called with the results after every execute()
+        self._ops: List[_Op] = []
+        self.round_trips = 0
+
+    def __len__(self) -> int:
+        return len(self._ops)
+
+    # ---------------- queueing ----------------
+    def add(self, kind: str, cal_id: str, make: Callable[[], Any],
+            event_id: Optional[str] = None) -> BatchResult:
+        """Queue any request factory; returns the result slot filled in by execute()."""
+        res = BatchResult(kind=kind, calendar_id=cal_id, event_id=event_id)
+        self._ops.append(_Op(res, make))
+        return res
+
+    def insert(self, cal_id: str, body: Dict[str, Any]) -> BatchResult:
+        body.setdefault("id", uuid.uuid4().hex)  # makes retries idempotent (409 = already there)
+        events = self.service.events()
+        return self.add("insert", cal_id, lambda: events.insert(calendarId=cal_id, body=body),
+                        event_id=body["id"])
+
+    def patch(self, cal_id: str, event_id: str, body: Dict[str, Any]) -> BatchResult:
+        events = self.service.events()
+        return self.add("patch", cal_id,
+                        lambda: events.patch(calendarId=cal_id, eventId=event_id, body=body),
+                        event_id=event_id)
+
+    def delete(self, cal_id: str, event_id: str) -> BatchResult:
+        events = self.service.events()
+        return self.add("delete", cal_id,
+                        lambda: events.delete(calendarId=cal_id, eventId=event_id),
+                        event_id=event_id)
+
+    def list(self, cal_id: str, **params) -> BatchResult:
+        events = self.service.events()
+        return self.add("list", cal_id, lambda: events.list(calendarId=cal_id, **params))
+
+    # ---------------- execution ----------------
+    def _settle(self, op: _Op, response, exc) -> bool:
+        """Record one sub-response; returns True if it should be retried."""
+        res = op.result
+        res.attempts += 1
+        if exc is None:
+            res.ok, res.response, res.error = True, response, None
+            return False
+        st = http_status(exc)
+        if res.kind == "delete" and st in (404, 410):
+            res.ok, res.error, res.note = True, None, "already deleted"
+            return False
+        if res.kind == "insert" and st == 409 and res.attempts > 1:
+            res.ok, res.error, res.note = True, None, "inserted by an earlier attempt"
+            return False
+        res.ok, res.error = False, exc
+        return is_retryable(exc) and res.attempts <= self.max_retries
+
+    def _send(self, chunk: List[_Op]) -> List[_Op]:
+        retry: List[_Op] = []
+        fired = set()
+        replies: List[tuple] = []
+
+        def callback(request_id, response, exception):
+            fired.add(int(request_id))
+            op = chunk[int(request_id)]
+            replies.append((op.result.kind, response, exception is None))
+            if self._settle(op, response, exception):
+                retry.append(op)
+
+        batch = self.service.new_batch_http_request(callback=callback)
+        sent = 0
+        for i, op in enumerate(chunk):
+            req = op.make()
+            sent += len(getattr(req, "body", None) or "")
+            batch.add(req, request_id=str(i))
+        self.round_trips += 1
+        lim = limiter("calendar")
+        t0 = time.perf_counter()
+        ok = True
+        try:
+            with lim.slot(cost=len(chunk)):
+                batch.execute()
+        except Exception as e:  # the envelope failed: settle whatever got no reply
+            ok = False
+            for i, op in enumerate(chunk):
+                if i not in fired and self._settle(op, None, e):
+                    retry.append(op)
+        if PROFILER.enabled:
+            self._profile(time.perf_counter() - t0, sent, replies, ok)
+        throttled = sum(1 for op in retry if op.result.error is not None and is_throttle(op.result.error))
+        if throttled:
+            lim.throttled()
+        else:
+            lim.succeeded()
+        return retry
+
+    @staticmethod
+    def _profile(seconds: float, sent: int, replies: List[tuple], ok: bool) -> None:
+        """One calendar.batch envelope, plus its sub-requests (which share its latency)."""
+        PROFILER.record("calendar.batch", seconds, sent=sent, ok=ok)
+        for kind, response, sub_ok in replies:
+            PROFILER.record(f"calendar.events.{kind}.subrequest", seconds,
+                            items=count_items(response) if sub_ok and response else 0, ok=sub_ok)
+
+    def execute(self) -> List[BatchResult]:
+        """Send everything queued; returns one BatchResult per operation, in queue order."""
+        ops, self._ops = self._ops, []
+        pending = list(ops)
+        rnd = 0
+        while pending:
+            if rnd:
+                time.sleep(backoff_delay(rnd))
+            retry: List[_Op] = []
+            for i in range(0, len(pending), self.batch_size):
+                retry.extend(self._send(pending[i:i + self.batch_size]))
+            pending, rnd = retry, rnd + 1
+        results = [op.result for op in ops]
+        if self.on_done:
+            self.on_done(results)
+        return results
+
+
+def raise_for_errors(results: List[BatchResult]) -> List[BatchResult]:
+    failed = [r for r in results if not r.ok]
+    if failed:
+        raise BatchFailed(failed)
+    return results
@@ -1,30 +1,16 @@
 from __future__ import annotations
-from googleapiclient.discovery import build
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from google.auth.transport.requests import Request
-import os, pathlib
 from calendar_agent.models.event import CalendarEvent
 from calendar_agent.config import settings
 
 SCOPES = ["https://www.googleapis.com/auth/calendar"]
-
-def _creds():
-    token_path = pathlib.Path("token_gcal.json")
-    creds = None
-    if token_path.exists():
-        creds = Credentials.from_authorized_user_file(str(token_path), SCOPES)
-    if not creds or not creds.valid:
-        if creds and creds.expired and creds.refresh_token:
-            creds.refresh(Request())
-        else:
-            flow = InstalledAppFlow.from_client_secrets_file(settings.google_credentials_path, SCOPES)
-            creds = flow.run_local_server(port=0)
-        token_path.write_text(creds.to_json())
-    return creds
+TOKEN_PATH = "token_gcal.json"
 
 def _service():
-    return build("calendar", "v3", credentials=_creds())
+    from calendar_agent.google_api import get_service, shared_local_service
+    if settings.calendar_api_endpoint:
+        return shared_local_service("calendar", "v3", settings.calendar_api_endpoint)
+    return get_service("calendar", "v3", scopes=SCOPES, token_path=TOKEN_PATH,
+                       credentials_path=settings.google_credentials_path)
 
 def create(event: CalendarEvent) -> str:
     body = {
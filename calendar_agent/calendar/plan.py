@@ -0,0 +1,333 @@
+"""
+calendar_agent/calendar/plan.py
+-------------------------------------------------
+Mutation plans: the complete list of writes a run will make, built before
+anything is sent.
+
+Planning only reads (lookups, the local mirror). The resulting Plan can be
+printed as a dry-run diff, optimised, and then applied as batched requests:
+
+    plan = Plan()
+    plan.delete(cal_id, old_event)            # e.g. from a cancellation
+    plan.insert(cal_id, new_body, key=pair)   # e.g. from the re-booking
+    plan.optimize()                           # → one patch of old_event
+    print(plan.render())
+    plan.apply(batch)
+
+optimize() drops redundant work: repeated deletes of one event, patches of
+an event that is deleted anyway, several patches of one event (merged),
+duplicate inserts of one key, and a delete + insert of the same event on
+one calendar (same private key), which becomes a minimal patch or nothing
+at all. Events that only share a summary and start are left alone: a patch
+merges private properties, so the survivor would keep the other booking's keys.
+
+diff_sorted() plans a whole calendar at once: desired vs actual events,
+matched by private key in one sorted-merge pass (actions/reconcile.py).
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from calendar_agent.calendar.batch import BATCH_SIZE, CalendarBatch, raise_for_errors
+from calendar_agent.store.hashing import CONTENT_HASH_KEY
+
+Pair = Tuple[str, str]  # (private key, value)
+
+WRITE_KINDS = ("insert", "patch", "delete")
+
+
+def _same_time(have: Optional[Dict[str, Any]], want: Dict[str, Any]) -> bool:
+    """Same all-day date, or same instant (and timeZone, when we set one)."""
+    have, want = have or {}, want or {}
+    if have.get("date") or want.get("date"):
+        return have.get("date") == want.get("date")
+    try:
+        same = datetime.fromisoformat(have["dateTime"]) == datetime.fromisoformat(want["dateTime"])
+    except (KeyError, TypeError, ValueError):
+        return False
+    return same and (not want.get("timeZone") or have.get("timeZone") == want.get("timeZone"))
+
+
+def minimal_patch(existing: Dict[str, Any], body: Dict[str, Any],
+                  trust_hash: bool = True) -> Optional[Dict[str, Any]]:
+    """
+    Fields of `body` that differ from `existing` (None = nothing to write).
+    trust_hash=False compares every field even when the content hashes agree,
+    which catches edits made by hand after our last write.
+    """
+    have_priv = (existing.get("extendedProperties", {}) or {}).get("private", {}) or {}
+    want_priv = (body.get("extendedProperties", {}) or {}).get("private", {}) or {}
+    if trust_hash and have_priv.get(CONTENT_HASH_KEY) and \
+            have_priv.get(CONTENT_HASH_KEY) == want_priv.get(CONTENT_HASH_KEY):
+        return None
+    patch: Dict[str, Any] = {}
+    for field, want in body.items():
+        if field in ("id", "extendedProperties", "start", "end"):
+            continue
+        if (existing.get(field) or None) != (want or None):
+            patch[field] = want
+    if not (_same_time(existing.get("start"), body.get("start", {})) and
+            _same_time(existing.get("end"), body.get("end", {}))):
+        patch.update({k: body[k] for k in ("start", "end") if k in body})
+    changed = {k: v for k, v in want_priv.items() if k != CONTENT_HASH_KEY and have_priv.get(k) != v}
+    if not patch and not changed:
+        return None
+    if CONTENT_HASH_KEY in want_priv:
+        changed[CONTENT_HASH_KEY] = want_priv[CONTENT_HASH_KEY]
+    patch["extendedProperties"] = {"private": changed}  # patch merges private keys
+    return patch
+
+
+@dataclass
+class Op:
+    kind: str                               # "insert" | "patch" | "delete" | "keep"
+    calendar_id: str
+    event_id: Optional[str] = None
+    body: Optional[Dict[str, Any]] = None   # insert: full body, patch: changed fields
+    current: Optional[Dict[str, Any]] = None  # the event as it is now (patch / delete / keep)
+    key: Optional[Pair] = None              # private key the op was planned for
+    result: Any = None                      # BatchResult once applied
+
+    def event(self) -> Optional[Dict[str, Any]]:
+        """The event after apply (or as it is, for keep)."""
+        if self.kind == "keep":
+            return self.current
+        return self.result.response if self.result is not None else None
+
+
+def _private(event: Optional[Dict[str, Any]]) -> Dict[str, str]:
+    return ((event or {}).get("extendedProperties", {}) or {}).get("private", {}) or {}
+
+
+def _when(part: Optional[Dict[str, Any]]) -> str:
+    part = part or {}
+    return part.get("date") or (part.get("dateTime") or "")[:16]
+
+
+def _merge_patch(a: Dict[str, Any], b: Dict[str, Any]) -> Dict[str, Any]:
+    out = dict(a, **{k: v for k, v in b.items() if k != "extendedProperties"})
+    priv = dict(_private(a), **_private(b))
+    if priv:
+        out["extendedProperties"] = {"private": priv}
+    return out
+
+
+class Plan:
+    def __init__(self):
+        self.ops: List[Op] = []
+        self.read_calls = 0   # API requests spent building the plan
+        self.names: Dict[str, str] = {}  # calendar id → display name for render()
+
+    # ---------------- building ----------------
+    def insert(self, cal_id: str, body: Dict[str, Any], key: Optional[Pair] = None) -> Op:
+        return self._add(Op("insert", cal_id, body=body, key=key))
+
+    def patch(self, cal_id: str, current: Dict[str, Any], fields: Dict[str, Any],
+              key: Optional[Pair] = None) -> Op:
+        return self._add(Op("patch", cal_id, current["id"], fields, current, key))
+
+    def delete(self, cal_id: str, current: Dict[str, Any], key: Optional[Pair] = None) -> Op:
+        return self._add(Op("delete", cal_id, current["id"], current=current, key=key))
+
+    def keep(self, cal_id: str, current: Dict[str, Any], key: Optional[Pair] = None) -> Op:
+        return self._add(Op("keep", cal_id, current["id"], current=current, key=key))
+
+    def _add(self, op: Op) -> Op:
+        self.ops.append(op)
+        return op
+
+    def extend(self, other: "Plan") -> "Plan":
+        self.ops.extend(other.ops)
+        self.read_calls += other.read_calls
+        self.names.update(other.names)
+        return self
+
+    # ---------------- cost ----------------
+    @property
+    def writes(self) -> List[Op]:
+        return [op for op in self.ops if op.kind in WRITE_KINDS]
+
+    @property
+    def write_calls(self) -> int:
+        """Batched HTTP requests apply() will send (before retries)."""
+        n = len(self.writes)
+        return (n + BATCH_SIZE - 1) // BATCH_SIZE
+
+    @property
+    def api_calls(self) -> int:
+        return self.read_calls + self.write_calls
+
+    def counts(self) -> Dict[str, int]:
+        out = {k: 0 for k in (*WRITE_KINDS, "keep")}
+        for op in self.ops:
+            out[op.kind] += 1
+        return out
+
+    def summary(self) -> str:
+        c = self.counts()
+        return (f"plan: {c['insert']} insert, {c['patch']} patch, {c['delete']} delete, "
+                f"{c['keep']} unchanged; API calls: {self.read_calls} read + "
+                f"{self.write_calls} write = {self.api_calls}")
+
+    # ---------------- optimisation ----------------
+    def optimize(self, diff: Callable[[Dict[str, Any], Dict[str, Any]], Optional[Dict[str, Any]]] = minimal_patch
+                 ) -> int:
+        """Remove redundant operations in place; returns how many writes were saved."""
+        before = len(self.writes)
+
+        # 1. per existing event: a delete wins; patches merge; keep only if nothing else
+        by_event: Dict[Tuple[str, str], List[Op]] = {}
+        inserts: List[Op] = []
+        for op in self.ops:
+            if op.kind == "insert":
+                inserts.append(op)
+            else:
+                by_event.setdefault((op.calendar_id, op.event_id), []).append(op)
+        merged: Dict[Tuple[str, str], Op] = {}
+        for ek, ops in by_event.items():
+            deletes = [o for o in ops if o.kind == "delete"]
+            patches = [o for o in ops if o.kind == "patch"]
+            if deletes:
+                merged[ek] = deletes[0]
+            elif patches:
+                fields: Dict[str, Any] = {}
+                for p in patches:
+                    fields = _merge_patch(fields, p.body or {})
+                merged[ek] = Op("patch", ek[0], ek[1], fields, patches[0].current, patches[0].key)
+            else:
+                merged[ek] = ops[0]
+
+        # 2. duplicate inserts of one (calendar, key): the last one wins
+        last: Dict[Tuple[str, Pair], Op] = {}
+        kept_inserts: List[Op] = []
+        for op in inserts:
+            if op.key is not None:
+                prev = last.get((op.calendar_id, op.key))
+                if prev is not None:
+                    kept_inserts.remove(prev)
+                last[(op.calendar_id, op.key)] = op
+            kept_inserts.append(op)
+
+        # 3. delete + insert of the same event → patch (or nothing)
+        deletes = [op for op in merged.values() if op.kind == "delete"]
+        final_inserts: List[Op] = []
+        for ins in kept_inserts:
+            match = None
+            for d in deletes:
+                if d.calendar_id != ins.calendar_id:
+                    continue
+                if ins.key is not None and _private(d.current).get(ins.key[0]) == ins.key[1]:
+                    match = d
+                    break
+            if match is None:
+                final_inserts.append(ins)
+                continue
+            deletes.remove(match)
+            fields = diff(match.current, ins.body)
+            ek = (match.calendar_id, match.event_id)
+            merged[ek] = (Op("keep", ek[0], ek[1], current=match.current, key=ins.key) if fields is None
+                          else Op("patch", ek[0], ek[1], fields, match.current, ins.key))
+
+        self.ops = list(merged.values()) + final_inserts
+        return before - len(self.writes)
+
+    # ---------------- output ----------------
+    def _cal(self, cal_id: str) -> str:
+        return self.names.get(cal_id, cal_id)
+
+    def render(self, show_unchanged: bool = False) -> str:
+        """Dry-run diff, one line per operation (+ insert, ~ patch, - delete, = unchanged)."""
+        lines = []
+        for op in self.ops:
+            cal = self._cal(op.calendar_id)
+            cur = op.current or {}
+            if op.kind == "insert":
+                b = op.body or {}
+                lines.append(f"+ [{cal}] {b.get('summary', '')!r} "
+                             f"{_when(b.get('start'))} → {_when(b.get('end'))}"
+                             + (f"  ({op.key[0]}={op.key[1]})" if op.key else ""))
+            elif op.kind == "patch":
+                changes = []
+                for k, v in (op.body or {}).items():
+                    if k == "extendedProperties":
+                        keys = [p for p in _private(op.body) if p != CONTENT_HASH_KEY]
+                        if keys:
+                            changes.append("private " + ", ".join(keys))
+                    elif k in ("start", "end"):
+                        if _same_time(cur.get(k), v):
+                            continue
+                        changes.append(f"{k} {_when(cur.get(k))} → {_when(v)}")
+                    else:
+                        changes.append(f"{k} {cur.get(k)!r} → {v!r}")
+                lines.append(f"~ [{cal}] {op.event_id} {cur.get('summary', '')!r}: "
+                             + ("; ".join(changes) or "content hash only"))
+            elif op.kind == "delete":
+                lines.append(f"- [{cal}] {op.event_id} {cur.get('summary', '')!r} "
+                             f"{_when(cur.get('start'))} → {_when(cur.get('end'))}")
+            elif show_unchanged:
+                lines.append(f"= [{cal}] {op.event_id} {cur.get('summary', '')!r}")
+        lines.append(self.summary())
+        return "\n".join(lines)
+
+    # ---------------- apply ----------------
+    def apply(self, batch: CalendarBatch) -> List[Op]:
+        """Send every write through `batch` (one execute); raises BatchFailed on errors."""
+        for op in self.writes:
+            if op.kind == "insert":
+                op.result = batch.insert(op.calendar_id, op.body)
+            elif op.kind == "patch":
+                op.result = batch.patch(op.calendar_id, op.event_id, op.body)
+            else:
+                op.result = batch.delete(op.calendar_id, op.event_id)
+        if len(batch):
+            raise_for_errors(batch.execute())
+        return self.ops
+
+
+# ---------------- reconciliation ----------------
+def diff_sorted(plan: Plan, cal_id: str, desired: List[Tuple[Pair, Dict[str, Any]]],
+                actual: List[Tuple[Pair, Dict[str, Any]]], prune: bool = False
+                ) -> List[Dict[str, Any]]:
+    """
+    Add the writes that turn `actual` into `desired` to `plan`, in one sorted-merge pass.
+
+    Both sides are [(key, body/event)], keyed by the private property that
+    identifies the event. Matching keys become a minimal patch (or nothing);
+    desired-only keys are inserted; extra events under one key are deleted.
+    Actual-only events are deleted when prune=True and returned as orphans
+    otherwise (their booking may simply not be known here).
+    """
+    desired = sorted(desired, key=lambda kv: kv[0])
+    actual = sorted(actual, key=lambda kv: (kv[0], kv[1].get("id", "")))
+    orphans: List[Dict[str, Any]] = []
+    i = j = 0
+    while i < len(desired) or j < len(actual):
+        if j == len(actual) or (i < len(desired) and desired[i][0] < actual[j][0]):
+            key, body = desired[i]
+            plan.insert(cal_id, body, key=key)
+            i += 1
+        elif i == len(desired) or actual[j][0] < desired[i][0]:
+            key, event = actual[j]
+            if prune:
+                plan.delete(cal_id, event, key=key)
+            else:
+                orphans.append(event)
+            j += 1
+        else:
+            key, body = desired[i]
+            event = actual[j][1]
+            fields = minimal_patch(event, body, trust_hash=False)
+            if fields is None:
+                plan.keep(cal_id, event, key=key)
+            else:
+                plan.patch(cal_id, event, fields, key=key)
+            i += 1
+            j += 1
+            while i < len(desired) and desired[i][0] == key:  # same key asked twice: first wins
+                i += 1
+            while j < len(actual) and actual[j][0] == key:    # duplicates of one event
+                plan.delete(cal_id, actual[j][1], key=key)
+                j += 1
+    return orphans
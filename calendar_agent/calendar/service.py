@@ -1,30 +1,74 @@
+import os
+from typing import Iterable, List, Optional
+
+from calendar_agent.config import settings
 from calendar_agent.models.booking import Booking
-from calendar_agent.calendar.mapping import booking_to_event
+from calendar_agent.calendar.mapping import booking_to_event, calendar_for_space
 from calendar_agent.store.hashing import event_hash
+from calendar_agent.store.repo import BookingRepo
+
+_REPO: Optional[BookingRepo] = None
 
-class _Repo:
-    _by_key = {}
-    def find(self, s, x, c): return self._by_key.get((s,x,c))
-    def insert(self, s, x, c, h, pid): self._by_key[(s,x,c)]={"hash":h,"provider_id":pid}
-    def update(self, s, x, c, h): self._by_key[(s,x,c)]["hash"]=h
+def _repo() -> BookingRepo:
+    global _REPO
+    if _REPO is None:
+        _REPO = BookingRepo(os.path.join(settings.state_dir, "bookings.sqlite3"))
+    return _REPO
 
-def upsert_booking(b: Booking, create_fn, update_fn) -> str:
-    ev = booking_to_event(b)
-    h = event_hash({
+def booking_hash(b: Booking) -> str:
+    return event_hash({
         "source": b.source, "external_id": b.external_id, "space": b.space,
         "kind": b.kind, "start": b.start.isoformat(), "end": b.end.isoformat()
     })
-    ev.uid = f"{b.source}:{b.external_id}:{h}"
-    repo = _Repo()
-    existing = repo.find(b.source, b.external_id, ev.calendar_id)
-    if not existing:
-        provider_id = create_fn(ev)
-        repo.insert(b.source, b.external_id, ev.calendar_id, h, provider_id)
-        return provider_id
-    if existing["hash"] != h:
-        update_fn(existing["provider_id"], ev)
-        repo.update(b.source, b.external_id, ev.calendar_id, h)
-    return existing["provider_id"]
-
-def cancel_by_source_id(source: str, external_id: str, space: str, delete_fn) -> None:
-    pass
+
+def upsert_booking(b: Booking, create_fn, update_fn, repo: Optional[BookingRepo] = None) -> str:
+    return upsert_bookings([b], create_fn, update_fn, repo=repo)[0]
+
+def upsert_bookings(bookings: Iterable[Booking], create_fn, update_fn,
+                    repo: Optional[BookingRepo] = None) -> List[str]:
+    """
+    Create or update the calendar event for each booking; returns provider ids in order.
+    One repository read for the whole batch, one transaction for the writes;
+    bookings whose hash is unchanged since the last run make no API call.
+    """
+    repo = repo or _repo()
+    prepared = []
+    for b in bookings:
+        ev = booking_to_event(b)
+        h = booking_hash(b)
+        ev.uid = f"{b.source}:{b.external_id}:{h}"
+        prepared.append((b, ev, h))
+    existing = repo.find_many((b.source, b.external_id, ev.calendar_id) for b, ev, _ in prepared)
+
+    ids, rows = [], []
+    try:
+        for b, ev, h in prepared:
+            key = (b.source, b.external_id, ev.calendar_id)
+            row = existing.get(key)
+            if not row:
+                provider_id = create_fn(ev)
+            else:
+                provider_id = row["provider_id"]
+                if row["hash"] == h:
+                    ids.append(provider_id)
+                    continue
+                update_fn(provider_id, ev)
+            rows.append((*key, h, provider_id, b.model_dump_json()))
+            existing[key] = {"hash": h, "provider_id": provider_id}
+            ids.append(provider_id)
+    finally:
+        # record whatever reached the calendar, even if a later booking failed
+        if rows:
+            repo.upsert_many(rows)
+    return ids
+
+def cancel_by_source_id(source: str, external_id: str, space: str, delete_fn,
+                        repo: Optional[BookingRepo] = None) -> int:
+    """Delete the events recorded for a booking in `space`'s calendar; returns the count."""
+    repo = repo or _repo()
+    cal_id = calendar_for_space(space)
+    rows = [r for r in repo.find_by_source_id(source, external_id) if r["calendar_id"] == cal_id]
+    for r in rows:
+        delete_fn(r["calendar_id"], r["provider_id"])
+    repo.delete_many((r["source"], r["external_id"], r["calendar_id"]) for r in rows)
+    return len(rows)
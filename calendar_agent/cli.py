@@ -1,20 +1,34 @@
+from typing import Optional
+
 import typer
-from calendar_agent.sync.run_airbnb import main as airbnb_main
-from calendar_agent.sync.run_peerspace import main as peerspace_main
-from calendar_agent.sync.run_gmail import main as gmail_main
+
+# Command modules (and through them googleapiclient, google-auth, pydantic
+# settings) are imported inside each command, so `--help` and argument errors
+# return without loading them.
 
 app = typer.Typer(help="Calendar Agent CLI")
 
+@app.callback()
+def main(ctx: typer.Context,
+         profile: bool = typer.Option(False, "--profile", help="Write a JSON API performance report on exit."),
+         profile_path: Optional[str] = typer.Option(None, "--profile-path", help="Where to write the --profile report.")):
+    if profile or profile_path:
+        from calendar_agent import profiling
+        profiling.start(f"cli.{ctx.invoked_subcommand}", profile_path)
+
 @app.command()
 def airbnb():
+    from calendar_agent.sync.run_airbnb import main as airbnb_main
     airbnb_main()
 
 @app.command()
 def peerspace():
+    from calendar_agent.sync.run_peerspace import main as peerspace_main
     peerspace_main()
 
 @app.command()
 def gmail():
+    from calendar_agent.sync.run_gmail import main as gmail_main
     gmail_main()
 
 if __name__ == "__main__":
@@ -6,12 +6,62 @@ class Settings(BaseSettings):
     google_credentials_path: str = Field(default="credentials_gmail.json", alias="GOOGLE_CREDENTIALS_PATH")
     google_calendar_disco_id: Optional[str] = Field(default=None, alias="GOOGLE_CALENDAR_DISCO_ID")
     google_calendar_upstairs_id: Optional[str] = Field(default=None, alias="GOOGLE_CALENDAR_UPSTAIRS_ID")
+    google_calendar_block_id: Optional[str] = Field(default=None, alias="GOOGLE_CALENDAR_BLOCK_ID")
+
+    # wall-clock times in booking emails are local to the lofts
+    timezone: str = Field(default="America/Detroit", alias="CALENDAR_AGENT_TZ")
+
+    # local state (caches, databases) lives here
+    state_dir: str = Field(default=".calendar_agent", alias="CALENDAR_AGENT_STATE_DIR")
+    calendar_id_cache_ttl: int = Field(default=7 * 24 * 3600, alias="CALENDAR_ID_CACHE_TTL")
+    event_mirror: bool = Field(default=True, alias="CALENDAR_AGENT_MIRROR")
+    event_mirror_max_age: float = Field(default=15.0, alias="CALENDAR_MIRROR_MAX_AGE")
+
+    # request pacing for every Google API call (calendar_agent/ratelimit.py)
+    calendar_api_qps: float = Field(default=10.0, alias="CALENDAR_API_QPS")
+    calendar_api_burst: int = Field(default=20, alias="CALENDAR_API_BURST")
+    google_api_concurrency: int = Field(default=8, alias="GOOGLE_API_CONCURRENCY")
+    google_api_max_retries: int = Field(default=6, alias="GOOGLE_API_MAX_RETRIES")
+    calendar_api_endpoint: Optional[str] = Field(default=None, alias="CALENDAR_API_ENDPOINT")  # fake server, tests only
+
+    # Gmail ingestion (calendar_agent/sync/run_gmail.py)
+    gmail_token_path: str = Field(default="token_gmail.json", alias="GMAIL_TOKEN_PATH")
+    gmail_state_path: str = Field(default="gmail_state.json", alias="GMAIL_STATE_PATH")  # legacy, imported once
+    gmail_seen_retention_days: float = Field(default=180, alias="GMAIL_SEEN_RETENTION_DAYS")
+    gmail_api_endpoint: Optional[str] = Field(default=None, alias="GMAIL_API_ENDPOINT")  # fake server, tests only
+    gmail_full_scan_days: int = Field(default=30, alias="GMAIL_FULL_SCAN_DAYS")
+    gmail_full_scan_limit: int = Field(default=500, alias="GMAIL_FULL_SCAN_LIMIT")
+
+    # exported Airbnb listing calendars (calendar_agent/sync/airbnb_ical.py)
+    airbnb_ical_disco_url: Optional[str] = Field(default=None, alias="AIRBNB_ICAL_DISCO_URL")
+    airbnb_ical_upstairs_url: Optional[str] = Field(default=None, alias="AIRBNB_ICAL_UPSTAIRS_URL")
+
+    # iCal availability feed for Airbnb's calendar import (actions/ical_feed.py)
+    ical_feed_port: int = Field(default=8765, alias="ICAL_FEED_PORT")
+    ical_feed_days: int = Field(default=365, alias="ICAL_FEED_DAYS")
+    ical_feed_refresh: float = Field(default=300.0, alias="ICAL_FEED_REFRESH")
 
     class Config:
         env_file = ".env"
         case_sensitive = False
 
-settings = Settings()
+_settings: Optional[Settings] = None
+
+def __getattr__(name: str):
+    # `settings` is built (and .env read) on first use, not when config is imported
+    global _settings
+    if name == "settings":
+        if _settings is None:
+            _settings = Settings()
+        return _settings
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# Calendar names used throughout actions/ → the setting that pins their ID.
+CALENDAR_ID_SETTINGS = {
+    "Disco Bookings": "google_calendar_disco_id",
+    "Upstairs Bookings": "google_calendar_upstairs_id",
+    "Block on Airbnb": "google_calendar_block_id",
+}
 
 def require(name: str, value: Optional[str]) -> str:
     if not value:
@@ -20,3 +70,8 @@ def require(name: str, value: Optional[str]) -> str:
             f"Set it in .env (see .env.example) or export it in your shell."
         )
     return value
+
+def pinned_calendar_id(name: str) -> Optional[str]:
+    """Calendar ID pinned in settings for a calendar name, if any."""
+    attr = CALENDAR_ID_SETTINGS.get(name)
+    return getattr(__getattr__("settings"), attr) if attr else None
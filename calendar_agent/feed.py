@@ -0,0 +1,219 @@
+"""
+calendar_agent/feed.py
+-------------------------------------------------
+iCal feed of the dates Disco cannot be sold on Airbnb, for Airbnb's calendar
+import ("Import calendar" on the listing) to pull.
+
+One all-day VEVENT per source event, from the availability index
+(calendar_agent/calendar/availability.py):
+
+- every Block on Airbnb block: its dates
+- every Disco reservation: check-in date to check-out date (the check-out
+  day itself stays open for the next check-in)
+
+update() compares each event with what it rendered last time and re-renders
+only the VEVENTs that changed; the rest of the file is joined from the
+cached text. Unchanged input leaves the file, its ETag and Last-Modified
+alone, so Airbnb's polls get 304s. The cache lives next to the .ics as
+<path>.json, so later runs stay incremental too.
+
+serve() publishes the file over HTTP with ETag / Last-Modified and answers
+If-None-Match / If-Modified-Since with 304. It re-reads the file only when
+its mtime changes, so another process (cron, actions.ical_feed) can
+regenerate it underneath a running server.
+
+Titles are generic ("Blocked", "Reserved"): the feed is fetched without
+authentication, so guest names stay out of it.
+"""
+import hashlib
+import json
+import os
+import threading
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from calendar_agent import ical
+from calendar_agent.calendar.availability import BLOCK, RESERVATION, Interval
+
+FEED_KINDS = (BLOCK, RESERVATION)
+FEED_NAME = "Disco (calendar-agent)"
+TITLES = {BLOCK: "Blocked", RESERVATION: "Reserved"}
+UID_DOMAIN = "calendar-agent"
+
+
+def feed_dates(iv: Interval, tz) -> Tuple[date, date]:
+    """(first date, end date exclusive) an interval makes unavailable."""
+    first = iv.start.astimezone(tz).date()
+    end = iv.end.astimezone(tz).date()
+    return first, max(end, first + timedelta(days=1))
+
+
+@dataclass
+class FeedChange:
+    added: int = 0
+    changed: int = 0
+    removed: int = 0
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.changed or self.removed)
+
+    def __str__(self) -> str:
+        return f"{self.added} added, {self.changed} changed, {self.removed} removed"
+
+
+class AvailabilityFeed:
+    def __init__(self, path: str, tz):
+        self.path = path
+        self.tz = tz
+        self.entries: Dict[str, Tuple[str, str, str]] = {}  # event id → (signature, sort key, VEVENT)
+        self.etag = ""
+        self.modified = 0.0
+        self._load()
+
+    # ---------------- persistence ----------------
+    def _load(self) -> None:
+        try:
+            with open(self.path + ".json") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if not os.path.exists(self.path):
+            return  # the .ics went away: render everything again
+        self.entries = {k: tuple(v) for k, v in data.get("entries", {}).items()}
+        self.etag = data.get("etag", "")
+        self.modified = float(data.get("modified", 0))
+
+    def _write(self, path: str, text: str) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", newline="") as f:
+            f.write(text)
+        os.replace(tmp, path)
+
+    def _save(self) -> None:
+        body = ical.calendar((v for _, _, v in sorted(self.entries.values(), key=lambda e: e[1])),
+                             name=FEED_NAME)
+        self.etag = '"' + hashlib.sha1(body.encode()).hexdigest()[:20] + '"'
+        self._write(self.path, body)
+        self.modified = os.stat(self.path).st_mtime
+        self._write(self.path + ".json", json.dumps(
+            {"etag": self.etag, "modified": self.modified, "entries": self.entries}))
+
+    # ---------------- updates ----------------
+    def update(self, intervals: Iterable[Interval], now: Optional[datetime] = None) -> FeedChange:
+        """Make the feed list exactly `intervals` (FEED_KINDS only); returns what changed."""
+        now = now or datetime.now(timezone.utc)
+        change = FeedChange()
+        seen = set()
+        for iv in intervals:
+            if iv.kind not in FEED_KINDS:
+                continue
+            first, end = feed_dates(iv, self.tz)
+            title = TITLES[iv.kind]
+            sig = f"{first}|{end}|{title}"
+            seen.add(iv.event_id)
+            old = self.entries.get(iv.event_id)
+            if old is not None and old[0] == sig:
+                continue
+            uid = f"{iv.event_id}@{UID_DOMAIN}"
+            self.entries[iv.event_id] = (sig, f"{first}|{uid}", ical.vevent(uid, first, end, title, now))
+            if old is None:
+                change.added += 1
+            else:
+                change.changed += 1
+        for event_id in [k for k in self.entries if k not in seen]:
+            del self.entries[event_id]
+            change.removed += 1
+        if change or not os.path.exists(self.path):
+            self._save()
+        return change
+
+
+# ---------------- HTTP ----------------
+class _Cached:
+    """The feed file's bytes, ETag and mtime, re-read only when the file changes."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._key: Optional[Tuple[int, int]] = None
+        self.body = b""
+        self.etag = ""
+        self.modified = datetime.fromtimestamp(0, timezone.utc)
+
+    def get(self) -> "_Cached":
+        st = os.stat(self.path)
+        with self._lock:
+            if self._key != (st.st_mtime_ns, st.st_size):
+                with open(self.path, "rb") as f:
+                    self.body = f.read()
+                self.etag = '"' + hashlib.sha1(self.body).hexdigest()[:20] + '"'
+                self.modified = datetime.fromtimestamp(int(st.st_mtime), timezone.utc)
+                self._key = (st.st_mtime_ns, st.st_size)
+        return self
+
+
+def _not_modified(headers, etag: str, modified: datetime) -> bool:
+    inm = headers.get("If-None-Match")
+    if inm is not None:  # takes precedence over If-Modified-Since (RFC 9110 13.2.2)
+        tags = [t.strip().removeprefix("W/") for t in inm.split(",")]
+        return "*" in tags or etag in tags
+    ims = headers.get("If-Modified-Since")
+    if ims:
+        try:
+            return modified <= parsedate_to_datetime(ims)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def serve(path: str, port: int = 0, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """Serve the feed at any URL path on a background thread; returns the server."""
+    cached = _Cached(path)
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def log_message(self, *args):
+            pass
+
+        def _answer(self, with_body: bool) -> None:
+            try:
+                feed = cached.get()
+            except OSError:
+                self.send_response(404)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            fresh = _not_modified(self.headers, feed.etag, feed.modified)
+            self.send_response(304 if fresh else 200)
+            self.send_header("ETag", feed.etag)
+            self.send_header("Last-Modified", format_datetime(feed.modified, usegmt=True))
+            self.send_header("Cache-Control", "no-cache")
+            if fresh:
+                self.end_headers()
+                return
+            self.send_header("Content-Type", "text/calendar; charset=utf-8")
+            self.send_header("Content-Length", str(len(feed.body)))
+            self.end_headers()
+            if with_body:
+                self.wfile.write(feed.body)
+
+        def do_GET(self):
+            self._answer(True)
+
+        def do_HEAD(self):
+            self._answer(False)
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def feed_intervals(intervals: Iterable[Interval], since: datetime) -> List[Interval]:
+    """The intervals the feed should list: FEED_KINDS ending after `since`."""
+    return [iv for iv in intervals if iv.kind in FEED_KINDS and iv.end > since]
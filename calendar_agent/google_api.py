@@ -0,0 +1,282 @@
+"""
+calendar_agent/google_api.py
+-------------------------------------------------
+Process-wide registry of authorized Google API clients.
+
+Every helper used to re-read its token file, maybe refresh it, and call
+`build()` again, which also meant a fresh TLS handshake per helper call.
+The registry builds each client once per process and keeps it on one
+keep-alive httplib2 connection pool:
+
+- One entry per (api, version, token file, scopes); credentials are shared.
+- One `Resource` per thread (httplib2 is not thread-safe), so worker threads
+  get their own pool while the main thread keeps reusing its connections.
+- Expired credentials are refreshed under a lock and written back to the token
+  file; a revoked refresh token falls back to the interactive OAuth flow.
+
+Clients are built from discovery documents read once per process: Calendar
+v3 from the copy shipped in calendar_agent/discovery/, anything else from
+googleapiclient's bundled static documents.
+
+The OAuth flow and the token-refresh transport (requests) are imported only
+when a token actually has to be obtained or refreshed.
+
+Set CALENDAR_AGENT_HTTP_STATS=1 to print the connection-reuse rate at exit.
+"""
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import sys
+import threading
+from typing import Dict, Iterable, Optional, Tuple
+
+import httplib2
+from google.auth.exceptions import RefreshError
+from google.oauth2.credentials import Credentials
+from google_auth_httplib2 import AuthorizedHttp
+from googleapiclient.discovery import build_from_document
+from googleapiclient.discovery_cache import get_static_doc
+
+from calendar_agent.quota_request import request_class
+
+HTTP_TIMEOUT = 60  # seconds per request
+DISCOVERY_DIR = os.path.join(os.path.dirname(__file__), "discovery")
+
+
+# ---------------------------------------------------------------------------
+# CONNECTION STATS
+# ---------------------------------------------------------------------------
+
+class HttpStats:
+    """Counts requests and how many of them had to open a new connection."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.requests = 0
+        self.new_connections = 0
+
+    def record(self, reused: bool) -> None:
+        self._local.requests = self.thread_requests() + 1
+        with self._lock:
+            self.requests += 1
+            if not reused:
+                self.new_connections += 1
+
+    def thread_requests(self) -> int:
+        """Requests made so far on the calling thread (each thread has its own client)."""
+        return getattr(self._local, "requests", 0)
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            reused = self.requests - self.new_connections
+            rate = (reused / self.requests) if self.requests else 0.0
+            return {
+                "requests": self.requests,
+                "new_connections": self.new_connections,
+                "reused_connections": reused,
+                "reuse_rate": round(rate, 4),
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self.requests = 0
+            self.new_connections = 0
+
+
+STATS = HttpStats()
+
+
+class PooledHttp(httplib2.Http):
+    """httplib2.Http that records whether each request rode an open keep-alive socket."""
+
+    def _conn_request(self, conn, request_uri, method, body, headers):
+        STATS.record(reused=getattr(conn, "sock", None) is not None)
+        return super()._conn_request(conn, request_uri, method, body, headers)
+
+
+def http_stats() -> Dict[str, float]:
+    """Return request / new-connection counts and the keep-alive reuse rate."""
+    return STATS.snapshot()
+
+
+def format_http_stats() -> str:
+    st = http_stats()
+    return (f"[http] {st['requests']} requests, {st['new_connections']} new connections, "
+            f"reuse rate {st['reuse_rate']:.1%}")
+
+
+def _report_at_exit() -> None:
+    if os.environ.get("CALENDAR_AGENT_HTTP_STATS") and STATS.requests:
+        print(format_http_stats(), file=sys.stderr)
+
+
+atexit.register(_report_at_exit)
+
+
+# ---------------------------------------------------------------------------
+# CREDENTIALS
+# ---------------------------------------------------------------------------
+
+def _refresh(creds: Credentials) -> None:
+    from google.auth.transport.requests import Request
+    creds.refresh(Request())
+
+
+def _run_flow(credentials_path: str, scopes: Iterable[str]) -> Credentials:
+    from google_auth_oauthlib.flow import InstalledAppFlow
+    flow = InstalledAppFlow.from_client_secrets_file(credentials_path, list(scopes))
+    return flow.run_local_server(port=0)
+
+
+def _save(creds: Credentials, token_path: str) -> None:
+    with open(token_path, "w") as f:
+        f.write(creds.to_json())
+
+
+def load_credentials(token_path: str, credentials_path: str, scopes: Iterable[str]) -> Credentials:
+    """Load the token file, refreshing or re-running the OAuth flow when needed."""
+    scopes = list(scopes)
+    creds = None
+    if os.path.exists(token_path):
+        creds = Credentials.from_authorized_user_file(token_path, scopes)
+    if not creds or not creds.valid:
+        if creds and creds.expired and creds.refresh_token:
+            try:
+                _refresh(creds)
+            except RefreshError:
+                creds = _run_flow(credentials_path, scopes)
+        else:
+            creds = _run_flow(credentials_path, scopes)
+        _save(creds, token_path)
+    return creds
+
+
+# ---------------------------------------------------------------------------
+# DISCOVERY DOCUMENTS
+# ---------------------------------------------------------------------------
+
+_DOCS: Dict[Tuple[str, str], str] = {}
+
+
+def discovery_doc(api: str, version: str) -> dict:
+    """
+    Discovery document for (api, version): the copy shipped in calendar_agent/discovery/
+    if there is one, else googleapiclient's. Read from disk once per process; each call
+    returns a fresh parse, since googleapiclient fixes up the method descriptions of the
+    document a client was built from as they are first used.
+    """
+    text = _DOCS.get((api, version))
+    if text is None:
+        path = os.path.join(DISCOVERY_DIR, f"{api}.{version}.json")
+        if os.path.exists(path):
+            with open(path) as f:
+                text = f.read()
+        else:
+            text = get_static_doc(api, version)
+        text = _DOCS.setdefault((api, version), text)
+    return json.loads(text)
+
+
+# ---------------------------------------------------------------------------
+# REGISTRY
+# ---------------------------------------------------------------------------
+
+class _ClientEntry:
+    """Credentials for one token file plus a per-thread built client."""
+
+    def __init__(self, api: str, version: str, token_path: str,
+                 credentials_path: str, scopes: Tuple[str, ...]):
+        self.api = api
+        self.version = version
+        self.token_path = token_path
+        self.credentials_path = credentials_path
+        self.scopes = scopes
+        self.lock = threading.Lock()
+        self.creds = load_credentials(token_path, credentials_path, scopes)
+        self.saved_token = self.creds.token
+        self.local = threading.local()
+
+    def _ensure_valid(self) -> None:
+        with self.lock:
+            if not self.creds.valid:
+                try:
+                    _refresh(self.creds)
+                except RefreshError:
+                    # refresh token revoked/expired: start over and drop every
+                    # thread's client, they all hold the dead credentials
+                    self.creds = _run_flow(self.credentials_path, self.scopes)
+                    self.local = threading.local()
+            if self.creds.token != self.saved_token:
+                # persist refreshes (including ones AuthorizedHttp did on a 401)
+                _save(self.creds, self.token_path)
+                self.saved_token = self.creds.token
+
+    def service(self):
+        self._ensure_valid()
+        svc = getattr(self.local, "service", None)
+        if svc is None or getattr(self.local, "creds", None) is not self.creds:
+            http = AuthorizedHttp(self.creds, http=PooledHttp(timeout=HTTP_TIMEOUT))
+            svc = build_from_document(discovery_doc(self.api, self.version), http=http,
+                                      requestBuilder=request_class(self.api))
+            self.local.service = svc
+            self.local.creds = self.creds
+        return svc
+
+
+_REGISTRY: Dict[Tuple[str, str, str, Tuple[str, ...]], _ClientEntry] = {}
+_REGISTRY_LOCK = threading.Lock()
+
+
+def get_service(api: str, version: str, *, scopes: Iterable[str],
+                token_path: str, credentials_path: str):
+    """
+    Return the shared client for (api, version, token_path, scopes).
+
+    The first call per process loads credentials and builds the client;
+    later calls return the same object (per thread) without touching disk.
+    """
+    key = (api, version, os.path.abspath(token_path), tuple(scopes))
+    entry: Optional[_ClientEntry] = _REGISTRY.get(key)
+    if entry is None:
+        with _REGISTRY_LOCK:
+            entry = _REGISTRY.get(key)
+            if entry is None:
+                entry = _ClientEntry(api, version, token_path, credentials_path, key[3])
+                _REGISTRY[key] = entry
+    return entry.service()
+
+
+def local_service(api: str, version: str, endpoint: str):
+    """
+    Unauthenticated client whose every URL (batch included) points at `endpoint`,
+    e.g. "http://127.0.0.1:8085/" - for local fake Google servers in tests/benchmarks.
+    """
+    doc = discovery_doc(api, version)
+    root = endpoint.rstrip("/") + "/"
+    doc["rootUrl"] = doc["mtlsRootUrl"] = root
+    doc["baseUrl"] = root + doc.get("servicePath", "")
+    return build_from_document(doc, http=PooledHttp(timeout=HTTP_TIMEOUT),
+                               requestBuilder=request_class(api))
+
+
+_LOCAL_CLIENTS = threading.local()
+
+
+def shared_local_service(api: str, version: str, endpoint: str):
+    """local_service() built once per thread, like get_service() for real clients."""
+    cache = getattr(_LOCAL_CLIENTS, "clients", None)
+    if cache is None:
+        cache = _LOCAL_CLIENTS.clients = {}
+    key = (api, version, endpoint)
+    if key not in cache:
+        cache[key] = local_service(api, version, endpoint)
+    return cache[key]
+
+
+def reset() -> None:
+    """Forget every cached client (next get_service() rebuilds)."""
+    with _REGISTRY_LOCK:
+        _REGISTRY.clear()
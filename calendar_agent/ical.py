@@ -0,0 +1,144 @@
+"""
+calendar_agent/ical.py
+-------------------------------------------------
+The small part of iCalendar (RFC 5545) the agent reads and writes: all-day
+VEVENTs with a UID, DTSTART/DTEND and SUMMARY.
+
+Lines end in CRLF and are folded at 75 octets; text values are escaped.
+
+Reading is streaming: iter_vevents() takes any iterable of lines (an HTTP
+response, an open file) and yields one VEVENT at a time, so a feed is never
+held in memory whole.
+"""
+import re
+from datetime import date, datetime, timezone
+from typing import Dict, Iterable, Iterator, Optional, Tuple, Union
+from zoneinfo import ZoneInfo
+
+CRLF = "\r\n"
+PRODID = "-//calendar-agent//availability//EN"
+
+
+def escape(text: str) -> str:
+    return (text.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+            .replace("\r\n", "\\n").replace("\n", "\\n"))
+
+
+def fold(line: str) -> str:
+    """One content line, folded into 75-octet pieces (continuations start with a space)."""
+    data = line.encode()
+    if len(data) <= 75:
+        return line + CRLF
+    out, limit = [], 75
+    while data:
+        cut = min(limit, len(data))
+        while cut < len(data) and (data[cut] & 0xC0) == 0x80:  # never split a UTF-8 sequence
+            cut -= 1
+        out.append(data[:cut].decode())
+        data = data[cut:]
+        limit = 74  # the leading space counts
+    return (CRLF + " ").join(out) + CRLF
+
+
+def stamp(dt: datetime) -> str:
+    return dt.astimezone(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def vevent(uid: str, first: date, end: date, summary: str, dtstamp: datetime,
+           description: Optional[str] = None) -> str:
+    """An all-day VEVENT from `first` to `end` (exclusive)."""
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:{uid}",
+        f"DTSTAMP:{stamp(dtstamp)}",
+        f"DTSTART;VALUE=DATE:{first:%Y%m%d}",
+        f"DTEND;VALUE=DATE:{end:%Y%m%d}",
+        f"SUMMARY:{escape(summary)}",
+    ]
+    if description:
+        lines.append(f"DESCRIPTION:{escape(description)}")
+    lines.append("END:VEVENT")
+    return "".join(fold(line) for line in lines)
+
+
+def calendar(vevents: Iterable[str], name: str = "") -> str:
+    head = ["BEGIN:VCALENDAR", "VERSION:2.0", f"PRODID:{PRODID}", "CALSCALE:GREGORIAN", "METHOD:PUBLISH"]
+    if name:
+        head.append(f"X-WR-CALNAME:{escape(name)}")
+    return "".join(fold(line) for line in head) + "".join(vevents) + "END:VCALENDAR" + CRLF
+
+
+# ---------------- reading ----------------
+Property = Tuple[Dict[str, str], str]  # (parameters, value)
+
+_UNESCAPE = re.compile(r"\\([\\;,nN])")
+
+
+def unescape(text: str) -> str:
+    return _UNESCAPE.sub(lambda m: "\n" if m.group(1) in "nN" else m.group(1), text)
+
+
+def unfold(lines: Iterable[Union[bytes, str]]) -> Iterator[str]:
+    """Content lines from raw lines (CRLF or LF endings), continuation lines joined."""
+    cur: Optional[bytes] = None
+    for raw in lines:
+        if isinstance(raw, str):
+            raw = raw.encode()
+        raw = raw.rstrip(b"\r\n")
+        if raw[:1] in (b" ", b"\t") and cur is not None:
+            cur += raw[1:]  # joined as bytes: a fold may split a UTF-8 sequence
+            continue
+        if cur is not None:
+            yield cur.decode("utf-8", "replace")
+        cur = raw if raw else None
+    if cur is not None:
+        yield cur.decode("utf-8", "replace")
+
+
+def parse_line(line: str) -> Tuple[str, Dict[str, str], str]:
+    """'DTSTART;VALUE=DATE:20260302' -> ('DTSTART', {'VALUE': 'DATE'}, '20260302')."""
+    head, _, value = line.partition(":")
+    while head.count('"') % 2:  # a ':' inside a quoted parameter value
+        more, _, value = value.partition(":")
+        head += ":" + more
+    name, *params = head.split(";")
+    return name.upper(), dict(p.split("=", 1) if "=" in p else (p, "") for p in params), value
+
+
+def iter_vevents(lines: Iterable[Union[bytes, str]]) -> Iterator[Dict[str, Property]]:
+    """Each VEVENT as {NAME: (params, value)} (first occurrence of a name wins)."""
+    event: Optional[Dict[str, Property]] = None
+    depth = 0  # nested components (VALARM) inside the VEVENT
+    for line in unfold(lines):
+        name, params, value = parse_line(line)
+        if name == "BEGIN":
+            if value.upper() == "VEVENT" and event is None:
+                event = {}
+            elif event is not None:
+                depth += 1
+        elif name == "END" and event is not None:
+            if depth:
+                depth -= 1
+            elif value.upper() == "VEVENT":
+                yield event
+                event = None
+        elif event is not None and not depth:
+            event.setdefault(name, (params, value))
+
+
+def parse_when(prop: Property, tz) -> Union[date, datetime]:
+    """DTSTART/DTEND value: a date, or an aware datetime (floating times in tz)."""
+    params, value = prop
+    value = value.strip()
+    if params.get("VALUE", "").upper() == "DATE" or len(value) == 8:
+        return datetime.strptime(value, "%Y%m%d").date()
+    utc = value.endswith("Z")
+    dt = datetime.strptime(value.rstrip("Z"), "%Y%m%dT%H%M%S")
+    if utc:
+        return dt.replace(tzinfo=timezone.utc)
+    if params.get("TZID"):
+        try:
+            return dt.replace(tzinfo=ZoneInfo(params["TZID"].strip('"')))
+        except (KeyError, ValueError):
+            pass
+    return dt.replace(tzinfo=tz)
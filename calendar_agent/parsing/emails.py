@@ -0,0 +1,237 @@
+"""
+Booking email parser: Peerspace / Airbnb notification → Booking.
+
+Every pattern is compiled once at import. Per message the engine makes:
+
+- one match of the subject against the source's combined subject rule
+  (an alternation of named groups; `lastgroup` says which rule hit and
+  therefore whether it is a confirmation, update or cancellation),
+- one `finditer` pass over the body against the source's combined field
+  pattern, keeping the first value seen for each field.
+
+Dates are assembled from the captured pieces with a month lookup instead of
+a general-purpose date parser.
+"""
+from __future__ import annotations
+
+import base64
+import re
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from calendar_agent.models.booking import Booking
+
+CONFIRM, UPDATE, CANCEL = "confirm", "update", "cancel"
+
+MONTHS = {m: i for i, m in enumerate(
+    ("jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"), 1)}
+
+_DATE = r"(?:[A-Z][a-z]+,?\s+)?[A-Z][a-z]+\.?\s+\d{1,2},?\s+\d{4}"
+_TIME = r"\d{1,2}(?::\d{2})?\s*[AaPp]\.?[Mm]\.?"
+
+
+def _alternation(rules: Iterable[Tuple[str, str]], flags=0) -> re.Pattern:
+    return re.compile("|".join(f"(?P<{name}>{pat})" for name, pat in rules), flags)
+
+
+# ---------------- subject rules: group name = <action>[_n] ----------------
+SUBJECT_RULES = {
+    "airbnb": _alternation([
+        ("cancel", r"^(?:Reservation\s+)?cancell?ed\b"),
+        ("cancel_1", r"\bhas\s+cancell?ed\b"),
+        ("update", r"^(?:Reservation\s+(?:altered|updated|change[sd]?(?:\s+confirmed)?)|Alteration\s+(?:confirmed|accepted))\b"),
+        ("confirm", r"^(?:Reservation\s+confirmed|Instant\s+booking\s+confirmed|New\s+booking\s+confirmed)\b"),
+    ], re.I),
+    "peerspace": _alternation([
+        ("cancel", r"\bbooking\s+(?:has\s+been\s+)?cancell?ed\b|\bcancell?ed\s+(?:their|the|a)\s+booking\b"),
+        ("update", r"\bbooking\s+(?:has\s+been\s+)?(?:updated|modified|changed)\b|\bchanges?\s+to\s+(?:your|a)\s+booking\b"),
+        ("confirm", r"\bbooking\s+(?:is\s+)?confirmed\b|\bnew\s+booking\b|\byou\s+have\s+a\s+new\s+booking\b"),
+    ], re.I),
+}
+
+# guest name carried in the subject line
+SUBJECT_GUEST = {
+    "airbnb": re.compile(r"[-–:]\s*(?P<guest>[^-–:]+?)\s+(?:arrives|is\s+arriving|has\s+cancell?ed)\b", re.I),
+    "peerspace": re.compile(r"\bfrom\s+(?P<guest>[A-Z][\w.'-]*(?:\s+[A-Z][\w.'-]*)*)", 0),
+}
+
+# ---------------- body fields: one combined pattern per source ----------------
+def _any_of(patterns: Iterable[str], flags=0) -> re.Pattern:
+    return re.compile("|".join(f"(?:{p})" for p in patterns), flags)
+
+
+BODY_FIELDS = {
+    "airbnb": _any_of([
+        r"\b(?P<code>HM[A-Z0-9]{8})\b",
+        rf"Check-?\s?in\s*:?\s*\n?\s*(?P<ci_date>{_DATE})\s*(?:\n|,|at)?\s*(?P<ci_time>{_TIME})?",
+        rf"Check-?\s?out\s*:?\s*\n?\s*(?P<co_date>{_DATE})\s*(?:\n|,|at)?\s*(?P<co_time>{_TIME})?",
+        r"\b(?P<space>Disco|Upstairs)\s+Loft\b",
+        r"^Guest\s*:\s*(?P<guest>[^\n]+)$",
+    ], re.M),
+    "peerspace": _any_of([
+        r"Booking\s*(?:ID|#)\s*:?\s*#?(?P<booking_id>\d{5,})",
+        r"^(?:Guest|Renter|Booked by)\s*:\s*(?P<guest>[^\n]+)$",
+        rf"^Date\s*:\s*(?P<date>{_DATE})",
+        rf"^Time\s*:\s*(?P<t0>{_TIME})\s*(?:-|–|to)\s*(?P<t1>{_TIME})",
+        r"^(?:Activity|Type|Booking type)\s*:\s*(?P<activity>[^\n]+)$",
+        r"\b(?P<space>Disco|Upstairs)\s+Loft\b",
+    ], re.M),
+}
+
+PRODUCTION_WORDS = re.compile(r"photo|shoot|film|video|production", re.I)
+_BREAKS = re.compile(r"<(?:br\s*/?|/p|/div|/tr|/li|/h\d)\s*>", re.I)
+_TAGS = re.compile(r"<[^>]+>")
+
+DEFAULT_CHECKIN = time(16, 0)   # Airbnb defaults (docs/02_functional_spec.md §2.1)
+DEFAULT_CHECKOUT = time(11, 0)
+
+
+@dataclass
+class ParsedEmail:
+    source: str                       # "airbnb" | "peerspace"
+    action: str                       # CONFIRM | UPDATE | CANCEL
+    external_id: Optional[str] = None
+    booking: Optional[Booking] = None  # None when the email lacks dates/space
+    fields: Dict[str, str] = field(default_factory=dict)
+
+
+# ---------------- message → text ----------------
+def _b64(data: str) -> str:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4)).decode("utf-8", "replace")
+
+
+def _html_text(html: str) -> str:
+    text = _TAGS.sub("", _BREAKS.sub("\n", html))
+    return text.replace("&nbsp;", " ").replace("&amp;", "&")
+
+
+def message_text(msg: Dict[str, Any]) -> Tuple[str, str, str]:
+    """(subject, sender, plain-text body) of a Gmail users.messages.get resource."""
+    payload = msg.get("payload", {}) or {}
+    subject = sender = ""
+    for h in payload.get("headers", []) or []:
+        name = h.get("name", "").lower()
+        if name == "subject":
+            subject = h.get("value", "")
+        elif name == "from":
+            sender = h.get("value", "")
+    plain, html, stack = [], [], [payload]
+    while stack:
+        part = stack.pop()
+        stack.extend(reversed(part.get("parts", []) or []))
+        data = (part.get("body", {}) or {}).get("data")
+        if not data:
+            continue
+        mime = part.get("mimeType", "")
+        if mime == "text/plain":
+            plain.append(_b64(data))
+        elif mime == "text/html":
+            html.append(_b64(data))
+    body = "\n".join(plain) if plain else _html_text("\n".join(html))
+    return subject, sender, body or msg.get("snippet", "")
+
+
+# ---------------- dates ----------------
+def _date(s: str) -> date:
+    parts = s.replace(",", " ").replace(".", " ").split()
+    # [weekday] month day year
+    mon, day, year = parts[-3], parts[-2], parts[-1]
+    return date(int(year), MONTHS[mon[:3].lower()], int(day))
+
+
+def _time(s: Optional[str], default: time) -> time:
+    if not s:
+        return default
+    s = s.lower().replace(".", "").replace(" ", "")
+    pm = s.endswith("pm")
+    hh, _, mm = s[:-2].partition(":")
+    h = int(hh) % 12 + (12 if pm else 0)
+    return time(h, int(mm or 0))
+
+
+# ---------------- engine ----------------
+class EmailParser:
+    def __init__(self, tz: str = "America/Detroit"):
+        self.tz = ZoneInfo(tz)
+
+    def _at(self, d: date, t: time) -> datetime:
+        return datetime.combine(d, t, tzinfo=self.tz)
+
+    @staticmethod
+    def source_of(sender: str, labels: Iterable[str] = ()) -> Optional[str]:
+        for label in labels:
+            head = label.split("/", 1)[0].lower()
+            if head in SUBJECT_RULES:
+                return head
+        s = sender.lower()
+        if "airbnb" in s:
+            return "airbnb"
+        if "peerspace" in s:
+            return "peerspace"
+        return None
+
+    @staticmethod
+    def _fields(source: str, body: str) -> Dict[str, str]:
+        found: Dict[str, str] = {}
+        for m in BODY_FIELDS[source].finditer(body):
+            for k, v in m.groupdict().items():
+                if v is not None and k not in found:
+                    found[k] = v.strip()
+        return found
+
+    def parse(self, subject: str, body: str, sender: str = "",
+              labels: Iterable[str] = ()) -> Optional[ParsedEmail]:
+        """Parse one email; None when it is not a booking notification we understand."""
+        labels = list(labels)
+        source = self.source_of(sender, labels)
+        if source is None:
+            return None
+        hit = SUBJECT_RULES[source].search(subject)
+        if not hit:
+            return None
+        action = hit.lastgroup.split("_", 1)[0]
+        f = self._fields(source, body)
+        g = SUBJECT_GUEST[source].search(subject)
+        if g and "guest" not in f:
+            f["guest"] = g.group("guest").strip()
+        label_space = next((s for s in ("Disco", "Upstairs") for l in labels if s in l), None)
+        if label_space:
+            f.setdefault("space", label_space)
+        if source == "airbnb":
+            return self._airbnb(action, f)
+        return self._peerspace(action, f)
+
+    def _airbnb(self, action: str, f: Dict[str, str]) -> ParsedEmail:
+        out = ParsedEmail("airbnb", action, f.get("code"), fields=f)
+        if out.external_id and "ci_date" in f and "co_date" in f and "space" in f:
+            out.booking = Booking(
+                source="airbnb", external_id=out.external_id, space=f["space"], kind="lodging",
+                start=self._at(_date(f["ci_date"]), _time(f.get("ci_time"), DEFAULT_CHECKIN)),
+                end=self._at(_date(f["co_date"]), _time(f.get("co_time"), DEFAULT_CHECKOUT)),
+                guest_name=f.get("guest"), raw={"action": action, **f})
+        return out
+
+    def _peerspace(self, action: str, f: Dict[str, str]) -> ParsedEmail:
+        out = ParsedEmail("peerspace", action, f.get("booking_id"), fields=f)
+        if out.external_id and "date" in f and "t0" in f:
+            d = _date(f["date"])
+            start = self._at(d, _time(f["t0"], time(0, 0)))
+            end = self._at(d, _time(f["t1"], time(0, 0)))
+            if end <= start:  # runs past midnight
+                end += timedelta(days=1)
+            kind = "production" if PRODUCTION_WORDS.search(f.get("activity", "")) else "event"
+            out.booking = Booking(
+                source="peerspace", external_id=out.external_id, space=f.get("space", "Disco"),
+                kind=kind, start=start, end=end, guest_name=f.get("guest"),
+                raw={"action": action, **f})
+        return out
+
+    def parse_message(self, msg: Dict[str, Any], labels: Iterable[str] = ()) -> Optional[ParsedEmail]:
+        subject, sender, body = message_text(msg)
+        return self.parse(subject, body, sender, labels)
+
+    def parse_many(self, items: Iterable[Tuple[str, str, str, List[str]]]) -> List[Optional[ParsedEmail]]:
+        """items = [(subject, body, sender, labels), ...]"""
+        return [self.parse(s, b, snd, lbl) for s, b, snd, lbl in items]
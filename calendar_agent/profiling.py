@@ -0,0 +1,219 @@
+"""
+calendar_agent/profiling.py
+-------------------------------------------------
+Per-command API instrumentation.
+
+When profiling is on, every Google API request (QuotaRequest in
+calendar_agent/quota_request.py) and every CalendarBatch round trip records:
+
+- method ("calendar.events.list", "calendar.batch", "gmail.users.messages.get", ...)
+- latency (histogram + percentiles), bytes sent / received, items returned
+- the helper it ran under: the outermost gcal_tool helper on the calling
+  thread (find_event_by_private, upsert_events, ...), or "-" outside one
+
+Helpers themselves record call counts and wall time. Actions take `--profile`
+(or `--profile=PATH`), the CLI `--profile` (or `--profile-path PATH`); the
+JSON report is written at exit, by default to
+.calendar_agent/profiles/<command>-<timestamp>.json:
+
+    python -m actions.airbnb_to_disco --profile AB-1 "Sarah" 2025-12-02T16:00 2025-12-04T11:00
+    calendar-agent --profile gmail
+
+Off by default; when off the hooks cost one attribute check per request.
+"""
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from datetime import datetime
+from functools import wraps
+from typing import Any, Dict, List, Optional
+
+from calendar_agent import config
+
+BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)  # upper bounds; last bucket is "more"
+NO_HELPER = "-"
+
+
+def count_items(result: Any) -> int:
+    if isinstance(result, dict):
+        for key in ("items", "messages", "history", "labels"):
+            if isinstance(result.get(key), list):
+                return len(result[key])
+        return 1
+    return 0
+
+
+class _Stat:
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.seconds = 0.0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.items = 0
+        self.histogram = [0] * (len(BUCKETS_MS) + 1)
+        self.samples: List[float] = []
+
+    def add(self, seconds: float, sent: int, received: int, items: int, ok: bool) -> None:
+        self.calls += 1
+        self.errors += 0 if ok else 1
+        self.seconds += seconds
+        self.bytes_sent += sent
+        self.bytes_received += received
+        self.items += items
+        ms = seconds * 1000
+        self.histogram[bisect_left(BUCKETS_MS, ms)] += 1
+        self.samples.append(ms)
+
+    def report(self) -> Dict[str, Any]:
+        s = sorted(self.samples)
+
+        def pct(p):
+            return round(s[min(len(s) - 1, int(p * len(s)))], 2) if s else 0.0
+
+        labels = [f"<={b}ms" for b in BUCKETS_MS] + [f">{BUCKETS_MS[-1]}ms"]
+        return {
+            "calls": self.calls, "errors": self.errors,
+            "seconds": round(self.seconds, 4),
+            "p50_ms": pct(0.50), "p95_ms": pct(0.95), "max_ms": round(s[-1], 2) if s else 0.0,
+            "bytes_sent": self.bytes_sent, "bytes_received": self.bytes_received,
+            "items": self.items,
+            "histogram": {k: v for k, v in zip(labels, self.histogram) if v},
+        }
+
+
+class Profiler:
+    def __init__(self):
+        self.enabled = False
+        self.started = time.perf_counter()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.methods: Dict[str, _Stat] = {}
+        self.helpers: Dict[str, _Stat] = {}
+        self.helper_methods: Dict[str, Dict[str, int]] = {}
+
+    def reset(self) -> None:
+        with self._lock:
+            self.started = time.perf_counter()
+            self.methods, self.helpers, self.helper_methods = {}, {}, {}
+
+    # ---------------- helper attribution ----------------
+    def current_helper(self) -> str:
+        stack = getattr(self._local, "stack", None)
+        return stack[0] if stack else NO_HELPER
+
+    @contextmanager
+    def helper(self, name: str):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        stack.append(name)
+        t0 = time.perf_counter()
+        ok = False
+        try:
+            yield
+            ok = True
+        finally:
+            stack.pop()
+            if not stack:  # nested helpers are part of the outer helper's calls and time
+                with self._lock:
+                    self.helpers.setdefault(name, _Stat()).add(time.perf_counter() - t0, 0, 0, 0, ok)
+
+    # ---------------- requests ----------------
+    def record(self, method: str, seconds: float, sent: int = 0, received: int = 0,
+               items: int = 0, ok: bool = True) -> None:
+        helper = self.current_helper()
+        with self._lock:
+            self.methods.setdefault(method, _Stat()).add(seconds, sent, received, items, ok)
+            per = self.helper_methods.setdefault(helper, {})
+            per[method] = per.get(method, 0) + 1
+
+    # ---------------- report ----------------
+    def report(self, command: str = "") -> Dict[str, Any]:
+        from calendar_agent.google_api import http_stats
+        from calendar_agent.ratelimit import _LIMITERS
+        with self._lock:
+            methods = {m: st.report() for m, st in sorted(self.methods.items())}
+            helpers = {}
+            for name in sorted(set(self.helpers) | set(self.helper_methods)):
+                st = self.helpers.get(name)
+                entry = {"calls": st.calls, "seconds": round(st.seconds, 4)} if st else {}
+                entry["requests"] = dict(sorted(self.helper_methods.get(name, {}).items()))
+                helpers[name] = entry
+            totals = {
+                "requests": sum(st.calls for m, st in self.methods.items() if not m.endswith(".subrequest")),
+                "subrequests": sum(st.calls for m, st in self.methods.items() if m.endswith(".subrequest")),
+                "seconds_in_api": round(sum(st.seconds for m, st in self.methods.items()
+                                            if not m.endswith(".subrequest")), 4),
+                "bytes_sent": sum(st.bytes_sent for st in self.methods.values()),
+                "bytes_received": sum(st.bytes_received for st in self.methods.values()),
+                "items": sum(st.items for st in self.methods.values()),
+            }
+        return {
+            "command": command,
+            "finished_at": datetime.now().isoformat(timespec="seconds"),
+            "wall_seconds": round(time.perf_counter() - self.started, 4),
+            "totals": totals,
+            "methods": methods,
+            "helpers": helpers,
+            "limiters": {api: lim.snapshot() for api, lim in _LIMITERS.items()},
+            "http": http_stats(),
+        }
+
+    def write(self, path: str, command: str = "") -> str:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(self.report(command), f, indent=2)
+        return path
+
+
+PROFILER = Profiler()
+
+
+def instrument(fn):
+    """Attribute the API requests made inside fn to it (no-op unless profiling)."""
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        if not PROFILER.enabled:
+            return fn(*args, **kwargs)
+        with PROFILER.helper(fn.__name__):
+            return fn(*args, **kwargs)
+    return wrapper
+
+
+def default_path(command: str) -> str:
+    name = command.replace(".", "_").replace("/", "_") or "command"
+    return os.path.join(config.settings.state_dir, "profiles", f"{name}-{datetime.now():%Y%m%d-%H%M%S}.json")
+
+
+def start(command: str, path: Optional[str] = None) -> str:
+    """Turn profiling on for the rest of the process; the report is written at exit."""
+    path = path or default_path(command)
+    PROFILER.enabled = True
+    PROFILER.reset()
+
+    def _write():
+        print(f"[profile] report written to {PROFILER.write(path, command)}", file=sys.stderr)
+
+    atexit.register(_write)
+    return path
+
+
+def from_argv(command: str, argv: Optional[List[str]] = None) -> Optional[str]:
+    """Strip --profile / --profile=PATH from argv (sys.argv by default) and start profiling."""
+    argv = sys.argv if argv is None else argv
+    path = None
+    found = False
+    for a in list(argv[1:]):
+        if a == "--profile" or a.startswith("--profile="):
+            found = True
+            path = a.split("=", 1)[1] if "=" in a else path
+            argv.remove(a)
+    return start(command, path) if found else None
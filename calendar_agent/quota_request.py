@@ -0,0 +1,126 @@
+"""
+calendar_agent/quota_request.py
+-------------------------------------------------
+QuotaRequest: the HttpRequest class every Google client is built with
+(calendar_agent/google_api.py), so each `.execute()` is paced by the per-API
+limiter and retried as described in calendar_agent/ratelimit.py.
+
+Kept apart from ratelimit.py because it needs googleapiclient.http and
+httplib2, which are only worth importing once a client is actually built.
+"""
+from __future__ import annotations
+
+import json
+import threading
+import time
+import uuid
+from typing import Any, Dict
+from urllib.parse import urlsplit, urlunsplit
+
+import httplib2
+from googleapiclient.errors import HttpError
+from googleapiclient.http import HttpRequest
+
+from calendar_agent.config import settings
+from calendar_agent.profiling import PROFILER, count_items
+from calendar_agent.ratelimit import (
+    IDEMPOTENT_METHODS, AdaptiveLimiter, backoff_delay, http_status, is_retryable, is_throttle,
+    limiter, retry_after,
+)
+
+
+class QuotaRequest(HttpRequest):
+    """HttpRequest whose execute() is rate limited and retried (see calendar_agent/ratelimit.py)."""
+
+    limiter: AdaptiveLimiter
+
+    def _make_idempotent(self) -> None:
+        if self.methodId != "calendar.events.insert" or not self.body:
+            return
+        body = json.loads(self.body)
+        if "id" in body:
+            return
+        body["id"] = uuid.uuid4().hex  # base32hex-safe client id
+        self.body = json.dumps(body)
+        self.body_size = len(self.body)
+        if "content-length" in self.headers:
+            self.headers["content-length"] = str(self.body_size)
+
+    def _safe_to_repeat(self) -> bool:
+        return self.method in IDEMPOTENT_METHODS or self.methodId == "calendar.events.insert"
+
+    def _already_applied(self, err: Exception, attempt: int):
+        """(True, result) when a repeat failed only because the first attempt landed."""
+        if attempt == 1:
+            return False, None
+        st = http_status(err)
+        if self.methodId == "calendar.events.delete" and st in (404, 410):
+            return True, ""
+        if self.methodId == "calendar.events.insert" and st == 409:
+            event_id = json.loads(self.body)["id"]
+            u = urlsplit(self.uri)
+            uri = urlunsplit((u.scheme, u.netloc, f"{u.path}/{event_id}", u.query, ""))
+            get = type(self)(self.http, self.postproc, uri, methodId="calendar.events.get")
+            return True, get.execute()
+        return False, None
+
+    def _send(self, http=None) -> Any:
+        if not PROFILER.enabled:
+            return super().execute(http=http)
+        received = [0]
+        postproc = self.postproc
+
+        def counting(resp, content):
+            received[0] = len(content or b"")
+            return postproc(resp, content)
+
+        self.postproc = counting
+        t0 = time.perf_counter()
+        ok = False
+        result = None
+        try:
+            result = super().execute(http=http)
+            ok = True
+            return result
+        finally:
+            self.postproc = postproc
+            PROFILER.record(self.methodId or self.method, time.perf_counter() - t0,
+                            sent=len(self.body or ""), received=received[0],
+                            items=count_items(result) if ok else 0, ok=ok)
+
+    def execute(self, http=None, num_retries: int = 0) -> Any:
+        self._make_idempotent()
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                with self.limiter.slot():
+                    result = self._send(http)
+                self.limiter.succeeded()
+                return result
+            except (HttpError, httplib2.HttpLib2Error, OSError) as e:
+                done, result = self._already_applied(e, attempt)
+                if done:
+                    self.limiter.succeeded()
+                    return result
+                throttle = isinstance(e, HttpError) and is_throttle(e)
+                if throttle:
+                    self.limiter.throttled()
+                if (attempt > settings.google_api_max_retries or not is_retryable(e)
+                        or not (throttle or self._safe_to_repeat())):
+                    raise
+                self.limiter.retried()
+                time.sleep(backoff_delay(attempt, retry_after(e)))
+
+
+_CLASSES: Dict[str, type] = {}
+_CLASSES_LOCK = threading.Lock()
+
+
+def request_class(api: str) -> type:
+    """QuotaRequest bound to `api`'s limiter, for build(requestBuilder=...)."""
+    with _CLASSES_LOCK:
+        cls = _CLASSES.get(api)
+        if cls is None:
+            cls = _CLASSES[api] = type(f"{api.title()}Request", (QuotaRequest,), {"limiter": limiter(api)})
+    return cls
@@ -0,0 +1,219 @@
+"""
+calendar_agent/ratelimit.py
+-------------------------------------------------
+One execution layer for every Google API request the agent makes.
+
+Clients built by calendar_agent.google_api use QuotaRequest
+(calendar_agent/quota_request.py) as their request class, so each `.execute()`
+(gcal_tool, calendar/google.py, the Gmail sync, scripts) goes through the same
+per-API limiter:
+
+- a token bucket sized to the API's per-user quota (CALENDAR_API_QPS /
+  CALENDAR_API_BURST for Calendar);
+- an adaptive concurrency window (AIMD): halved when Google throttles us,
+  grown back by one slot per window of successes, so bulk jobs settle at the
+  highest rate the quota sustains instead of failing partway;
+- retries with exponential backoff and full jitter (Retry-After honoured) on
+  429, 403 rateLimitExceeded/userRateLimitExceeded, 5xx and transport errors.
+
+Retries are idempotency-aware. Throttling responses are always retried, since
+the request was rejected before it was applied. 5xx and timeouts are retried
+only for requests that are safe to repeat. Calendar inserts are made safe by
+giving them a client-side event id: a repeat that answers 409 means the first
+attempt landed, so the event is fetched instead of being inserted twice. A
+repeated delete that answers 404/410 counts as done.
+
+CalendarBatch (calendar/batch.py) draws from the same limiter, one token per
+sub-request. With --profile on, each attempt is also recorded by
+calendar_agent/profiling.py.
+
+This module stays free of googleapiclient.http / httplib2 so that importing
+the batch and plan code (and everything above them) is cheap; the request
+class that needs them lives in quota_request.py.
+"""
+from __future__ import annotations
+
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+from googleapiclient.errors import HttpError
+
+from calendar_agent import config
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+RATE_LIMIT_REASONS = {"rateLimitExceeded", "userRateLimitExceeded"}
+
+BACKOFF_BASE = 0.5    # seconds; doubled per attempt, full jitter
+BACKOFF_CAP = 32.0
+COOLDOWN = 1.0        # at most one multiplicative decrease per second
+MIN_RATE = 0.5        # requests/second floor while throttled
+
+# (requests/second, burst) per API when no setting overrides it
+DEFAULT_LIMITS = {"gmail": (40.0, 100)}
+DEFAULT_LIMIT = (10.0, 20)
+
+# safe to send twice: the second attempt leaves the same state as the first
+IDEMPOTENT_METHODS = {"GET", "PUT", "PATCH", "DELETE"}
+
+
+# ---------------- error classification ----------------
+def http_status(err: Exception) -> Optional[int]:
+    resp = getattr(err, "resp", None)
+    return int(resp.status) if resp is not None and getattr(resp, "status", None) else None
+
+
+def _reason(err: Exception) -> str:
+    try:
+        return err.error_details[0].get("reason", "")  # type: ignore[attr-defined]
+    except Exception:
+        return ""
+
+
+def is_throttle(err: Exception) -> bool:
+    """Google refused the request for quota reasons (nothing was applied)."""
+    st = http_status(err)
+    return st == 429 or (st == 403 and _reason(err) in RATE_LIMIT_REASONS)
+
+
+def is_retryable(err: Exception) -> bool:
+    """429, 5xx and 403 rate-limit errors are worth another attempt."""
+    if not isinstance(err, HttpError):
+        return True  # transport error: the whole sub-request never completed
+    return http_status(err) in RETRYABLE_STATUS or is_throttle(err)
+
+
+def retry_after(err: Exception) -> Optional[float]:
+    resp = getattr(err, "resp", None)
+    try:
+        return float(resp.get("retry-after")) if resp is not None and resp.get("retry-after") else None
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt: int, hint: Optional[float] = None) -> float:
+    """Full-jitter exponential backoff for retry number `attempt` (1-based)."""
+    delay = random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+    return max(delay, hint or 0.0)
+
+
+# ---------------- limiter ----------------
+class TokenBucket:
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.stamp = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.stamp) * self.rate)
+        self.stamp = now
+
+    def set_rate(self, rate: float) -> None:
+        with self._lock:
+            self._refill()
+            self.rate = rate
+
+    def acquire(self, n: int = 1) -> float:
+        """
+        Take n tokens, sleeping until they are there; returns the seconds waited.
+
+        A cost above `burst` (a full batch) waits for a full bucket and then
+        leaves it in debt, so the requests after it pay the difference.
+        """
+        need = min(n, self.burst)
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self.tokens >= need:
+                    self.tokens -= n
+                    return waited
+                wait = (need - self.tokens) / self.rate
+            time.sleep(wait)
+            waited += wait
+
+
+class AdaptiveLimiter:
+    """Token bucket plus an AIMD concurrency window shared by every thread."""
+
+    def __init__(self, rate: float, burst: int, max_concurrency: int):
+        self.bucket = TokenBucket(rate, burst)
+        self.max_rate = rate
+        self.max_concurrency = max_concurrency
+        self.window = float(max_concurrency)
+        self.in_flight = 0
+        self.throttles = 0
+        self.retries = 0
+        self.waited = 0.0
+        self._last_cut = 0.0
+        self._cond = threading.Condition()
+
+    @contextmanager
+    def slot(self, cost: int = 1):
+        """Hold one in-flight slot and `cost` quota tokens for the duration of a request."""
+        with self._cond:
+            while self.in_flight >= max(1, int(self.window)):
+                self._cond.wait()
+            self.in_flight += 1
+        try:
+            waited = self.bucket.acquire(cost)
+            if waited:
+                with self._cond:
+                    self.waited += waited
+            yield
+        finally:
+            with self._cond:
+                self.in_flight -= 1
+                self._cond.notify()
+
+    def throttled(self) -> None:
+        """Multiplicative decrease of window and rate (once per COOLDOWN)."""
+        with self._cond:
+            self.throttles += 1
+            now = time.monotonic()
+            if now - self._last_cut < COOLDOWN:
+                return
+            self._last_cut = now
+            self.window = max(1.0, self.window / 2)
+            self.bucket.set_rate(max(MIN_RATE, self.bucket.rate / 2))
+
+    def succeeded(self, n: int = 1) -> None:
+        """Additive increase: +1 slot per window of successes, rate back towards the quota."""
+        with self._cond:
+            if self.window < self.max_concurrency:
+                self.window = min(float(self.max_concurrency), self.window + n / self.window)
+                self._cond.notify_all()
+            if self.bucket.rate < self.max_rate:
+                self.bucket.set_rate(min(self.max_rate, self.bucket.rate + n * self.max_rate / 50))
+
+    def retried(self) -> None:
+        with self._cond:
+            self.retries += 1
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._cond:
+            return {"rate": round(self.bucket.rate, 2), "window": round(self.window, 2),
+                    "throttles": self.throttles, "retries": self.retries,
+                    "waited": round(self.waited, 3)}
+
+
+_LIMITERS: Dict[str, AdaptiveLimiter] = {}
+_LIMITERS_LOCK = threading.Lock()
+
+
+def limiter(api: str) -> AdaptiveLimiter:
+    """The process-wide limiter for one API ("calendar", "gmail", ...)."""
+    with _LIMITERS_LOCK:
+        lim = _LIMITERS.get(api)
+        if lim is None:
+            if api == "calendar":
+                rate, burst = config.settings.calendar_api_qps, config.settings.calendar_api_burst
+            else:
+                rate, burst = DEFAULT_LIMITS.get(api, DEFAULT_LIMIT)
+            lim = _LIMITERS[api] = AdaptiveLimiter(rate, burst, config.settings.google_api_concurrency)
+        return lim
@@ -0,0 +1,78 @@
+"""
+Calendar name → ID resolution cache.
+
+Names are resolved from a single full `calendarList` fetch, kept in memory
+and in a small JSON file so later processes skip the lookup entirely until
+the TTL runs out. A name that is not in the cache triggers one refetch
+(the calendar may have been created or renamed since) before giving up.
+"""
+import json
+import os
+import threading
+import time
+from typing import Callable, Dict
+
+
+class CalendarIdCache:
+    def __init__(self, path: str, ttl: float):
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._ids: Dict[str, str] = {}
+        self._fetched_at = 0.0
+        self._loaded = False
+
+    # ---------------- persistence ----------------
+    def _load(self) -> None:
+        self._loaded = True
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+            self._ids = dict(data.get("ids", {}))
+            self._fetched_at = float(data.get("fetched_at", 0))
+        except (OSError, ValueError):
+            self._ids, self._fetched_at = {}, 0.0
+
+    def _save(self) -> None:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump({"fetched_at": self._fetched_at, "ids": self._ids}, f, indent=2)
+        os.replace(tmp, self.path)
+
+    # ---------------- lookups ----------------
+    def _fresh(self) -> bool:
+        return (time.time() - self._fetched_at) < self.ttl
+
+    def _refresh(self, fetch: Callable[[], Dict[str, str]]) -> None:
+        self._ids = fetch()
+        self._fetched_at = time.time()
+        self._save()
+
+    def resolve(self, name: str, fetch: Callable[[], Dict[str, str]]) -> str:
+        """
+        Return the ID for calendar `name`.
+
+        `fetch` must return the full {summary: id} map (one paged calendarList).
+        It is called when the cache is stale, or once when `name` misses.
+        """
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            if not self._fresh():
+                self._refresh(fetch)
+            elif name not in self._ids:
+                self._refresh(fetch)  # miss: invalidate and refetch once
+            try:
+                return self._ids[name]
+            except KeyError:
+                raise RuntimeError(f"Calendar '{name}' not found") from None
+
+    def invalidate(self) -> None:
+        """Drop everything; the next resolve() refetches."""
+        with self._lock:
+            self._ids, self._fetched_at, self._loaded = {}, 0.0, True
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
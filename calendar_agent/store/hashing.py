@@ -7,3 +7,16 @@ def event_hash(payload: dict) -> str:
     canon = {k: payload[k] for k in FIELDS}
     s = json.dumps(canon, sort_keys=True, separators=(",", ":"))
     return hashlib.sha256(s.encode()).hexdigest()[:16]
+
+# Google event bodies (tools/gcal_tool.upsert_event): the hash of the desired body
+# is stored in its private properties so an unchanged re-run can skip the write.
+BODY_FIELDS = ["summary", "description", "location", "start", "end", "colorId", "transparency"]
+CONTENT_HASH_KEY = "content_hash"
+
+def body_hash(body: dict) -> str:
+    canon = {k: body[k] for k in BODY_FIELDS if body.get(k) is not None}
+    priv = dict(((body.get("extendedProperties") or {}).get("private") or {}))
+    priv.pop(CONTENT_HASH_KEY, None)
+    canon["private"] = priv
+    s = json.dumps(canon, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(s.encode()).hexdigest()[:16]
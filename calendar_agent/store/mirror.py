@@ -0,0 +1,223 @@
+"""
+Local SQLite mirror of Google Calendar events, kept current with syncTokens.
+
+The first sync of a calendar pages through every event and stores the
+returned `nextSyncToken`; later syncs send only that token and get back the
+changes since (deleted events arrive with status "cancelled"). A 410 "sync
+token expired" wipes the calendar's rows and does a full resync.
+
+Lookups the helpers used to make with `events().list` run against indexes:
+event id, every extendedProperties.private key/value, all-day date, and
+(day, summary, location).
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from calendar_agent.calendar.batch import http_status
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    cal_id        TEXT NOT NULL,
+    event_id      TEXT NOT NULL,
+    day           TEXT,             -- local start date (YYYY-MM-DD)
+    all_day_start TEXT,             -- start.date for all-day events
+    all_day_end   TEXT,             -- end.date (exclusive)
+    summary_norm  TEXT,             -- upper-cased, stripped summary
+    location      TEXT,
+    body          TEXT NOT NULL,    -- full event JSON
+    PRIMARY KEY (cal_id, event_id)
+);
+CREATE INDEX IF NOT EXISTS events_all_day ON events (cal_id, all_day_start);
+CREATE INDEX IF NOT EXISTS events_day_summary ON events (cal_id, day, summary_norm, location);
+
+CREATE TABLE IF NOT EXISTS private_props (
+    cal_id   TEXT NOT NULL,
+    event_id TEXT NOT NULL,
+    key      TEXT NOT NULL,
+    value    TEXT,
+    PRIMARY KEY (cal_id, event_id, key)
+);
+CREATE INDEX IF NOT EXISTS private_kv ON private_props (cal_id, key, value);
+
+CREATE TABLE IF NOT EXISTS sync_state (
+    cal_id     TEXT PRIMARY KEY,
+    sync_token TEXT,
+    synced_at  REAL
+);
+"""
+
+FULL_SYNC_PARAMS = {"singleEvents": True, "maxResults": 2500}
+# events.list rejects these together with a syncToken; everything else must repeat the full sync's value
+NOT_WITH_SYNC_TOKEN = ("timeMin", "timeMax", "q", "privateExtendedProperty", "sharedExtendedProperty",
+                       "iCalUID", "orderBy", "updatedMin")
+
+# fetch(params) -> one events().list response page for a calendar
+Fetch = Callable[[Dict[str, Any]], Dict[str, Any]]
+
+
+def _row(cal_id: str, e: Dict[str, Any]):
+    st, en = e.get("start", {}) or {}, e.get("end", {}) or {}
+    all_day_start = st.get("date")
+    day = all_day_start or (st.get("dateTime") or "")[:10] or None
+    return (cal_id, e["id"], day, all_day_start, en.get("date") if all_day_start else None,
+            (e.get("summary") or "").strip().upper(), e.get("location") or "",
+            json.dumps(e, separators=(",", ":")))
+
+
+class EventMirror:
+    def __init__(self, path: str, max_age: float = 15.0):
+        self.path = path
+        self.max_age = max_age  # seconds a sync stays fresh before the next delta call
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._conn() as db:
+            db.executescript(SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=30)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+        return db
+
+    # ---------------- writes ----------------
+    def _put(self, db, cal_id: str, e: Dict[str, Any]) -> None:
+        db.execute("INSERT OR REPLACE INTO events VALUES (?,?,?,?,?,?,?,?)", _row(cal_id, e))
+        db.execute("DELETE FROM private_props WHERE cal_id=? AND event_id=?", (cal_id, e["id"]))
+        priv = (e.get("extendedProperties", {}) or {}).get("private", {}) or {}
+        db.executemany("INSERT INTO private_props VALUES (?,?,?,?)",
+                       [(cal_id, e["id"], k, v) for k, v in priv.items()])
+
+    def _drop(self, db, cal_id: str, event_id: str) -> None:
+        db.execute("DELETE FROM events WHERE cal_id=? AND event_id=?", (cal_id, event_id))
+        db.execute("DELETE FROM private_props WHERE cal_id=? AND event_id=?", (cal_id, event_id))
+
+    def _apply(self, db, cal_id: str, items: Iterable[Dict[str, Any]]) -> None:
+        for e in items:
+            if e.get("status") == "cancelled":
+                self._drop(db, cal_id, e["id"])
+            else:
+                self._put(db, cal_id, e)
+
+    def remember(self, cal_id: str, events: Iterable[Dict[str, Any]]) -> None:
+        """Write-through for events we just inserted/patched."""
+        with self._conn() as db:
+            self._apply(db, cal_id, [e for e in events if e and e.get("id")])
+
+    def forget(self, cal_id: str, event_ids: Iterable[str]) -> None:
+        """Write-through for events we just deleted."""
+        with self._conn() as db:
+            for eid in event_ids:
+                self._drop(db, cal_id, eid)
+
+    def clear(self, cal_id: str) -> None:
+        with self._conn() as db:
+            db.execute("DELETE FROM events WHERE cal_id=?", (cal_id,))
+            db.execute("DELETE FROM private_props WHERE cal_id=?", (cal_id,))
+            db.execute("DELETE FROM sync_state WHERE cal_id=?", (cal_id,))
+
+    # ---------------- sync ----------------
+    def _state(self, cal_id: str):
+        return self._conn().execute(
+            "SELECT sync_token, synced_at FROM sync_state WHERE cal_id=?", (cal_id,)).fetchone()
+
+    def sync(self, cal_id: str, fetch: Fetch, force: bool = False) -> int:
+        """
+        Bring `cal_id` up to date. Returns the number of changed events received
+        (0 when the last sync is younger than max_age and force is False).
+        """
+        state = self._state(cal_id)
+        if state and not force and (time.time() - (state[1] or 0)) < self.max_age:
+            return 0
+        token = state[0] if state else None
+        try:
+            return self._pull(cal_id, fetch, token)
+        except Exception as e:
+            if token and http_status(e) == 410:  # sync token expired: start over
+                self.clear(cal_id)
+                return self._pull(cal_id, fetch, None)
+            raise
+
+    def _pull(self, cal_id: str, fetch: Fetch, token: Optional[str]) -> int:
+        base = dict(FULL_SYNC_PARAMS)
+        if token:
+            for name in NOT_WITH_SYNC_TOKEN:
+                base.pop(name, None)
+            base["syncToken"] = token
+        page, changed, pages = None, 0, []
+        while True:
+            params = dict(base, pageToken=page) if page else dict(base)
+            resp = fetch(params)
+            items = resp.get("items", []) or []
+            pages.append(items)
+            changed += len(items)
+            page = resp.get("nextPageToken")
+            if not page:
+                break
+        # apply everything plus the new token in one transaction
+        with self._conn() as db:
+            if not token:
+                db.execute("DELETE FROM events WHERE cal_id=?", (cal_id,))
+                db.execute("DELETE FROM private_props WHERE cal_id=?", (cal_id,))
+            for items in pages:
+                self._apply(db, cal_id, items)
+            db.execute("INSERT OR REPLACE INTO sync_state VALUES (?,?,?)",
+                       (cal_id, resp.get("nextSyncToken") or token, time.time()))
+        return changed
+
+    # ---------------- queries ----------------
+    def _bodies(self, sql: str, args) -> List[Dict[str, Any]]:
+        return [json.loads(r[0]) for r in self._conn().execute(sql, args)]
+
+    def get(self, cal_id: str, event_id: str) -> Optional[Dict[str, Any]]:
+        rows = self._bodies("SELECT body FROM events WHERE cal_id=? AND event_id=?", (cal_id, event_id))
+        return rows[0] if rows else None
+
+    def by_private(self, cal_id: str, key: str, value: str) -> List[Dict[str, Any]]:
+        return self._bodies(
+            "SELECT e.body FROM private_props p JOIN events e "
+            "ON e.cal_id = p.cal_id AND e.event_id = p.event_id "
+            "WHERE p.cal_id=? AND p.key=? AND p.value=? ORDER BY e.day, e.event_id",
+            (cal_id, key, value))
+
+    def with_private(self, cal_id: str, key: str) -> List[Dict[str, Any]]:
+        """Every event that has extendedProperties.private[key], whatever its value."""
+        return self._bodies(
+            "SELECT e.body FROM private_props p JOIN events e "
+            "ON e.cal_id = p.cal_id AND e.event_id = p.event_id "
+            "WHERE p.cal_id=? AND p.key=? ORDER BY e.day, e.event_id",
+            (cal_id, key))
+
+    def all_day_on(self, cal_id: str, date_str: str) -> List[Dict[str, Any]]:
+        """All-day events covering date_str (multi-day events included)."""
+        return self._bodies(
+            "SELECT body FROM events WHERE cal_id=? AND all_day_start<=? AND all_day_end>? "
+            "ORDER BY all_day_start, event_id", (cal_id, date_str, date_str))
+
+    def between(self, cal_id: str, first: str, last: str) -> List[Dict[str, Any]]:
+        """All-day events overlapping [first, last] plus events starting on those days."""
+        return self._bodies(
+            "SELECT body FROM events WHERE cal_id=? AND ("
+            " (all_day_start IS NOT NULL AND all_day_start<=? AND all_day_end>?)"
+            " OR (all_day_start IS NULL AND day BETWEEN ? AND ?)"
+            ") ORDER BY day, event_id", (cal_id, last, first, first, last))
+
+    def on_day(self, cal_id: str, date_str: str) -> List[Dict[str, Any]]:
+        """Every event starting on date_str (local start date)."""
+        return self._bodies("SELECT body FROM events WHERE cal_id=? AND day=? ORDER BY event_id",
+                            (cal_id, date_str))
+
+    def same_day(self, cal_id: str, date_str: str, summary: str,
+                 location: Optional[str] = None) -> List[Dict[str, Any]]:
+        sql = "SELECT body FROM events WHERE cal_id=? AND day=? AND summary_norm=?"
+        args = [cal_id, date_str, summary.strip().upper()]
+        if location:
+            sql += " AND location=?"
+            args.append(location)
+        return self._bodies(sql + " ORDER BY event_id", args)
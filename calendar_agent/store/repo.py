@@ -0,0 +1,124 @@
+"""
+Durable booking → calendar event repository (SQLite, WAL mode).
+
+One row per (source, external_id, calendar_id) holding the event_hash of the
+last write and the provider (Google) event id, so unchanged bookings are
+skipped across runs without any API traffic. The booking itself is kept as
+JSON for tools that need to rebuild desired state.
+"""
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Tuple
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS bookings (
+    source      TEXT NOT NULL,
+    external_id TEXT NOT NULL,
+    calendar_id TEXT NOT NULL,
+    event_hash  TEXT NOT NULL,
+    provider_id TEXT NOT NULL,
+    payload     TEXT,
+    updated_at  REAL NOT NULL,
+    PRIMARY KEY (source, external_id, calendar_id)
+);
+"""
+
+Key = Tuple[str, str, str]  # (source, external_id, calendar_id)
+
+
+def _as_dict(row) -> Dict[str, str]:
+    return {"source": row[0], "external_id": row[1], "calendar_id": row[2],
+            "hash": row[3], "provider_id": row[4], "payload": row[5]}
+
+
+class BookingRepo:
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn().executescript(SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+            self._local.depth = 0
+        return db
+
+    @contextmanager
+    def transaction(self):
+        """Group writes into one transaction (nested calls join the outer one)."""
+        db = self._conn()
+        outer = self._local.depth == 0
+        if outer:
+            db.execute("BEGIN IMMEDIATE")
+        self._local.depth += 1
+        try:
+            yield db
+        except BaseException:
+            self._local.depth -= 1
+            if outer:
+                db.execute("ROLLBACK")
+            raise
+        self._local.depth -= 1
+        if outer:
+            db.execute("COMMIT")
+
+    # ---------------- reads ----------------
+    def find(self, s: str, x: str, c: str) -> Optional[Dict[str, str]]:
+        row = self._conn().execute(
+            "SELECT * FROM bookings WHERE source=? AND external_id=? AND calendar_id=?",
+            (s, x, c)).fetchone()
+        return _as_dict(row) if row else None
+
+    def find_many(self, keys: Iterable[Key]) -> Dict[Key, Dict[str, str]]:
+        """Rows for many keys in one query; missing keys are absent from the result."""
+        keys = list(dict.fromkeys(keys))
+        found: Dict[Key, Dict[str, str]] = {}
+        db = self._conn()
+        for i in range(0, len(keys), 300):  # stay under SQLite's bound-parameter limit
+            chunk = keys[i:i + 300]
+            where = " OR ".join(["(source=? AND external_id=? AND calendar_id=?)"] * len(chunk))
+            args = [v for k in chunk for v in k]
+            for row in db.execute(f"SELECT * FROM bookings WHERE {where}", args):
+                found[(row[0], row[1], row[2])] = _as_dict(row)
+        return found
+
+    def find_by_source_id(self, s: str, x: str) -> List[Dict[str, str]]:
+        return [_as_dict(r) for r in self._conn().execute(
+            "SELECT * FROM bookings WHERE source=? AND external_id=?", (s, x))]
+
+    def all(self, source: Optional[str] = None) -> List[Dict[str, str]]:
+        if source:
+            rows = self._conn().execute("SELECT * FROM bookings WHERE source=?", (source,))
+        else:
+            rows = self._conn().execute("SELECT * FROM bookings")
+        return [_as_dict(r) for r in rows]
+
+    # ---------------- writes ----------------
+    def insert(self, s: str, x: str, c: str, h: str, pid: str, payload: Optional[str] = None) -> None:
+        self.upsert_many([(s, x, c, h, pid, payload)])
+
+    def update(self, s: str, x: str, c: str, h: str, payload: Optional[str] = None) -> None:
+        with self.transaction() as db:
+            db.execute("UPDATE bookings SET event_hash=?, payload=COALESCE(?, payload), updated_at=? "
+                       "WHERE source=? AND external_id=? AND calendar_id=?",
+                       (h, payload, time.time(), s, x, c))
+
+    def upsert_many(self, rows: Iterable[Tuple[str, str, str, str, str, Optional[str]]]) -> None:
+        """rows = [(source, external_id, calendar_id, hash, provider_id, payload), ...]"""
+        now = time.time()
+        with self.transaction() as db:
+            db.executemany("INSERT OR REPLACE INTO bookings VALUES (?,?,?,?,?,?,?)",
+                           [(*r, now) for r in rows])
+
+    def delete_many(self, keys: Iterable[Key]) -> None:
+        with self.transaction() as db:
+            db.executemany("DELETE FROM bookings WHERE source=? AND external_id=? AND calendar_id=?",
+                           list(keys))
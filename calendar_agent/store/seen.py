@@ -0,0 +1,138 @@
+"""
+Processed-message ledger for Gmail ingestion (SQLite, WAL mode).
+
+Replaces the flat `gmail_state.json` list: membership is a primary-key
+lookup, marking a message is one small insert, and nothing is ever
+rewritten wholesale.
+
+Each message is claimed ("pending") and committed *before* it is handled
+and marked "done" afterwards, so a process that dies mid-batch never hands
+the same message to the handler twice; whatever it was working on is left
+pending and reported by `pending()` for a look by hand.
+
+Entries older than the retention window are dropped by `compact()`, which
+runs on its own every COMPACT_EVERY marks and at most once a day on open.
+The first open imports the legacy `gmail_state.json` ids.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Iterable, List, Optional
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS seen (
+    message_id TEXT PRIMARY KEY,
+    state      TEXT NOT NULL,       -- 'pending' | 'done'
+    seen_at    REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS seen_age ON seen (seen_at);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+COMPACT_EVERY = 500            # marks between automatic compactions
+COMPACT_INTERVAL = 24 * 3600   # seconds; compaction on open at most this often
+
+
+class SeenStore:
+    def __init__(self, path: str, retention_days: float = 180,
+                 legacy_path: Optional[str] = None):
+        self.path = path
+        self.retention = retention_days * 24 * 3600
+        self._local = threading.local()
+        self._marks = 0
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn().executescript(SCHEMA)
+        if legacy_path:
+            self._import_legacy(legacy_path)
+        if time.time() - float(self._meta("compacted_at") or 0) > COMPACT_INTERVAL:
+            self.compact()
+
+    def _conn(self) -> sqlite3.Connection:
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=FULL")  # a claim must survive a crash
+            self._local.db = db
+        return db
+
+    def _meta(self, key: str) -> Optional[str]:
+        row = self._conn().execute("SELECT value FROM meta WHERE key=?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, db, key: str, value: str) -> None:
+        db.execute("INSERT OR REPLACE INTO meta VALUES (?,?)", (key, value))
+
+    def _import_legacy(self, legacy_path: str) -> None:
+        if self._meta("legacy_imported") or not os.path.exists(legacy_path):
+            return
+        try:
+            with open(legacy_path) as f:
+                ids = list(json.load(f).get("seen", []))
+        except (OSError, ValueError):
+            return
+        db, now = self._conn(), time.time()
+        db.execute("BEGIN IMMEDIATE")
+        db.executemany("INSERT OR IGNORE INTO seen VALUES (?, 'done', ?)", [(i, now) for i in ids])
+        self._set_meta(db, "legacy_imported", legacy_path)
+        db.execute("COMMIT")
+
+    # ---------------- lookups ----------------
+    def __contains__(self, message_id: str) -> bool:
+        return self._conn().execute(
+            "SELECT 1 FROM seen WHERE message_id=?", (message_id,)).fetchone() is not None
+
+    def __len__(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM seen").fetchone()[0]
+
+    def unseen(self, message_ids: Iterable[str]) -> List[str]:
+        """The ids (in order) that were never claimed; one query per 500 ids."""
+        ids = list(dict.fromkeys(message_ids))
+        known = set()
+        db = self._conn()
+        for i in range(0, len(ids), 500):
+            chunk = ids[i:i + 500]
+            known.update(r[0] for r in db.execute(
+                f"SELECT message_id FROM seen WHERE message_id IN ({','.join('?' * len(chunk))})", chunk))
+        return [i for i in ids if i not in known]
+
+    def pending(self) -> List[str]:
+        """Messages claimed by a run that never finished handling them."""
+        return [r[0] for r in self._conn().execute(
+            "SELECT message_id FROM seen WHERE state='pending' ORDER BY seen_at")]
+
+    # ---------------- writes ----------------
+    def claim(self, message_id: str) -> bool:
+        """Durably mark `message_id` as being handled; False if it was already seen."""
+        cur = self._conn().execute(
+            "INSERT OR IGNORE INTO seen VALUES (?, 'pending', ?)", (message_id, time.time()))
+        return cur.rowcount == 1
+
+    def done(self, message_id: str) -> None:
+        self._conn().execute("UPDATE seen SET state='done' WHERE message_id=?", (message_id,))
+        self._marks += 1
+        if self._marks >= COMPACT_EVERY:
+            self.compact()
+
+    def release(self, message_id: str) -> None:
+        """Forget a claim whose handler failed cleanly, so the next run retries it."""
+        self._conn().execute("DELETE FROM seen WHERE message_id=? AND state='pending'", (message_id,))
+
+    def compact(self) -> int:
+        """Drop finished entries older than the retention window; returns how many."""
+        db = self._conn()
+        db.execute("BEGIN IMMEDIATE")
+        cur = db.execute("DELETE FROM seen WHERE state='done' AND seen_at<?",
+                         (time.time() - self.retention,))
+        self._set_meta(db, "compacted_at", str(time.time()))
+        db.execute("COMMIT")
+        self._marks = 0
+        if cur.rowcount:
+            db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        return cur.rowcount
@@ -0,0 +1,237 @@
+"""
+calendar_agent/sync/airbnb_ical.py
+-------------------------------------------------
+Airbnb reservations from each listing's exported iCal feed
+(Listing → Availability → "Export calendar"), alongside the emails.
+
+Polling is cheap when nothing changed: every fetch sends the ETag and
+Last-Modified of the last feed that was fully applied (If-None-Match /
+If-Modified-Since), and a 304 ends the poll without reading anything or
+touching the calendar. A 200 is parsed as a stream (calendar_agent/ical.py),
+one VEVENT at a time, and bookings are handed to
+calendar.service.upsert_bookings in small chunks. Bookings whose hash did
+not change cost no API call there. The validators are saved only after the
+whole feed was applied, so a failed run fetches again next time.
+
+Airbnb exports two kinds of VEVENT:
+- "Reserved": a reservation. Its code (HM…) is in the reservation URL in
+  DESCRIPTION, and it becomes a lodging Booking from check-in 16:00 to
+  check-out 11:00.
+- "Airbnb (Not available)": dates blocked on Airbnb, including the ones
+  imported from our own feed (actions/ical_feed.py). These are skipped.
+
+A reservation the Gmail sync already recorded with the same dates is left as
+is: the email carries the guest name and exact times, the feed only dates.
+A "Reserved" event without a confirmation code is skipped rather than keyed
+by its UID, which the email path would not match.
+
+A reservation this importer created (its payload carries the ical_uid) that
+a complete 200 no longer lists is cancelled through
+calendar.service.cancel_by_source_id, provided its check-in falls between
+the first and last date the feed covers: older stays simply age out of
+Airbnb's export. Reservations recorded from emails are left to the
+cancellation emails.
+
+A feed that cannot be fetched or parsed is reported in its FeedResult and
+left for the next poll (validators unsaved); the other feeds still run.
+"""
+import http.client
+import json
+import os
+import re
+import urllib.error
+import urllib.request
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from zoneinfo import ZoneInfo
+
+from calendar_agent import ical
+from calendar_agent.calendar.mapping import calendar_for_space
+from calendar_agent.calendar.service import _repo, cancel_by_source_id, upsert_bookings
+from calendar_agent.config import settings
+from calendar_agent.models.booking import Booking
+from calendar_agent.parsing.emails import DEFAULT_CHECKIN, DEFAULT_CHECKOUT
+
+TIMEOUT = 30          # seconds per fetch
+CHUNK = 50            # bookings per upsert_bookings call
+RESERVATION_CODE = re.compile(r"\b(HM[A-Z0-9]{6,})\b")
+
+
+@dataclass
+class FeedResult:
+    space: str
+    status: int = 0          # 200, or 304 when nothing changed
+    events: int = 0          # VEVENTs read
+    bookings: int = 0        # reservations passed to upsert_bookings
+    skipped: int = 0         # blocked dates, events without a code, reservations already known
+    cancelled: int = 0       # reservations the feed no longer lists
+    window: Optional[Tuple[date, date]] = None  # first and last date of any VEVENT read
+    error: str = ""          # why the feed could not be read; nothing was saved for it
+
+    def __str__(self) -> str:
+        if self.error:
+            return f"{self.space}: failed ({self.error}), {self.bookings} reservation(s) applied"
+        if self.status == 304:
+            return f"{self.space}: not modified"
+        return (f"{self.space}: {self.events} event(s), {self.bookings} reservation(s) applied, "
+                f"{self.cancelled} cancelled, {self.skipped} skipped")
+
+
+# ---------------- validators ----------------
+class FeedState:
+    """{url: {"etag": ..., "last_modified": ...}} of the last fully applied fetch."""
+
+    def __init__(self, path: str):
+        self.path = path
+        try:
+            with open(path) as f:
+                self.feeds: Dict[str, Dict[str, str]] = json.load(f)
+        except (OSError, ValueError):
+            self.feeds = {}
+
+    def headers(self, url: str) -> Dict[str, str]:
+        v = self.feeds.get(url, {})
+        out = {}
+        if v.get("etag"):
+            out["If-None-Match"] = v["etag"]
+        if v.get("last_modified"):
+            out["If-Modified-Since"] = v["last_modified"]
+        return out
+
+    def save(self, url: str, etag: Optional[str], last_modified: Optional[str]) -> None:
+        self.feeds[url] = {k: v for k, v in (("etag", etag), ("last_modified", last_modified)) if v}
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.feeds, f, indent=2)
+        os.replace(tmp, self.path)
+
+
+# ---------------- VEVENT → Booking ----------------
+def reservation_code(event: Dict[str, ical.Property]) -> Optional[str]:
+    """The HM… confirmation code the emails key the reservation by (None if absent)."""
+    for name in ("DESCRIPTION", "SUMMARY", "URL"):
+        m = RESERVATION_CODE.search(event.get(name, ({}, ""))[1])
+        if m:
+            return m.group(1)
+    return None
+
+
+def vevent_booking(event: Dict[str, ical.Property], space: str, tz) -> Optional[Booking]:
+    """The reservation a VEVENT describes; None for blocked dates and unusable events."""
+    summary = ical.unescape(event.get("SUMMARY", ({}, ""))[1])
+    if "not available" in summary.lower() or "DTSTART" not in event or "DTEND" not in event:
+        return None
+    code = reservation_code(event)
+    if not code:
+        return None
+    start, end = ical.parse_when(event["DTSTART"], tz), ical.parse_when(event["DTEND"], tz)
+    if not isinstance(start, datetime):  # all-day: Airbnb's default check-in / check-out times
+        start = datetime.combine(start, DEFAULT_CHECKIN, tzinfo=tz)
+    if not isinstance(end, datetime):
+        end = datetime.combine(end, DEFAULT_CHECKOUT, tzinfo=tz)
+    return Booking(source="airbnb", external_id=code, space=space, kind="lodging", start=start,
+                   end=end, raw={"ical_uid": event.get("UID", ({}, ""))[1]})
+
+
+def _extend_window(result: FeedResult, event: Dict[str, ical.Property], tz) -> None:
+    for name in ("DTSTART", "DTEND"):
+        if name in event:
+            when = ical.parse_when(event[name], tz)
+            d = when.date() if isinstance(when, datetime) else when
+            lo, hi = result.window or (d, d)
+            result.window = (min(lo, d), max(hi, d))
+
+
+def iter_bookings(lines: Iterable[bytes], space: str, tz, result: FeedResult) -> Iterator[Booking]:
+    for event in ical.iter_vevents(lines):
+        result.events += 1
+        _extend_window(result, event, tz)
+        b = vevent_booking(event, space, tz)
+        if b is None:
+            result.skipped += 1
+        else:
+            yield b
+
+
+# ---------------- fetch + apply ----------------
+def _known_dates(repo, b: Booking) -> bool:
+    """The repository already has this reservation with the same check-in/out dates."""
+    for row in repo.find_by_source_id(b.source, b.external_id):
+        if row.get("payload"):
+            have = Booking.model_validate_json(row["payload"])
+            if have.start.date() == b.start.date() and have.end.date() == b.end.date():
+                return True
+    return False
+
+
+def _vanished(repo, space: str, listed: Set[str], window: Optional[Tuple[date, date]]) -> List[str]:
+    """Codes of feed-imported reservations in `space` checking in within `window` but not listed."""
+    if window is None:  # an empty feed says nothing about which dates it covers
+        return []
+    cal_id = calendar_for_space(space)
+    gone = []
+    for row in repo.all("airbnb"):
+        if row["calendar_id"] != cal_id or row["external_id"] in listed or not row.get("payload"):
+            continue
+        have = Booking.model_validate_json(row["payload"])
+        if "ical_uid" in have.raw and window[0] <= have.start.date() <= window[1]:
+            gone.append(row["external_id"])
+    return gone
+
+
+def ingest_feed(space: str, url: str, state: FeedState, create, update, delete, repo=None,
+                tz: Optional[str] = None) -> FeedResult:
+    """
+    Conditional GET of one listing feed; a 200 is streamed into upsert_bookings.
+    Fetch and parse failures end up in result.error instead of raising.
+    """
+    repo = repo or _repo()
+    zone = ZoneInfo(tz or settings.timezone)
+    result = FeedResult(space)
+    req = urllib.request.Request(url, headers={"Accept": "text/calendar", **state.headers(url)})
+    try:
+        _apply(req, url, space, state, create, update, delete, repo, zone, result)
+    except urllib.error.HTTPError as e:
+        if e.code == 304:
+            result.status = 304
+        else:
+            result.status, result.error = e.code, f"HTTP {e.code}"
+    except (OSError, http.client.HTTPException, ValueError) as e:  # URLError, timeouts, bad feed
+        result.error = str(e) or type(e).__name__
+    return result
+
+
+def _apply(req, url: str, space: str, state: FeedState, create, update, delete, repo, zone,
+           result: FeedResult) -> None:
+    """Fetch and apply a 200; validators are saved only once every booking went through."""
+    with urllib.request.urlopen(req, timeout=TIMEOUT) as resp:
+        result.status = resp.status
+        chunk: List[Booking] = []
+        listed: Set[str] = set()
+        for b in iter_bookings(resp, space, zone, result):
+            listed.add(b.external_id)
+            if _known_dates(repo, b):
+                result.skipped += 1
+                continue
+            chunk.append(b)
+            if len(chunk) >= CHUNK:
+                upsert_bookings(chunk, create, update, repo=repo)
+                result.bookings += len(chunk)
+                chunk = []
+        if chunk:
+            upsert_bookings(chunk, create, update, repo=repo)
+            result.bookings += len(chunk)
+        for code in _vanished(repo, space, listed, result.window):
+            cancel_by_source_id("airbnb", code, space, delete, repo=repo)
+            result.cancelled += 1
+        state.save(url, resp.headers.get("ETag"), resp.headers.get("Last-Modified"))
+
+
+def ingest_ical(feeds: Dict[str, str], create, update, delete, state_path: str, repo=None,
+                tz: Optional[str] = None) -> List[FeedResult]:
+    """ingest_feed for every {space: url} with a URL set."""
+    state = FeedState(state_path)
+    return [ingest_feed(space, url, state, create, update, delete, repo=repo, tz=tz)
+            for space, url in feeds.items() if url]
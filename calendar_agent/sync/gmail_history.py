@@ -0,0 +1,254 @@
+"""
+Incremental Gmail ingestion driven by historyId.
+
+The mailbox is never re-listed on a normal poll. The last processed
+`historyId` is checkpointed in a small JSON file, and each poll asks
+`users.history.list` for what changed since then: one call (plus pages)
+when there is new mail, one call with an empty answer when there isn't.
+Only messages that were added to, or newly labeled with, one of the watched
+labels (docs/02_functional_spec.md §3) are fetched, in batches. Each batch
+takes one token per message from the shared Gmail limiter
+(calendar_agent/ratelimit.py); throttled (429 / 403 rateLimitExceeded) and
+5xx sub-requests are fetched again with backoff, and only messages that
+still fail are reported in PollResult.failed.
+
+Gmail keeps history for about a week. When the checkpoint is older than
+that, history.list returns 404 and the poll falls back to a bounded full
+scan: the newest `full_scan_limit` messages per watched label from the last
+`full_scan_days` days, anchored to the profile's current historyId.
+
+The checkpoint only moves after the handler has processed every message of
+a poll, so a crash re-delivers the same messages on the next run; callers
+dedupe by message id (see run_gmail). Messages that could not be fetched are
+kept with the checkpoint and tried again on the next poll.
+"""
+from __future__ import annotations
+
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from calendar_agent.ratelimit import backoff_delay, http_status, is_retryable, is_throttle, limiter, retry_after
+
+WATCH_LABELS = (
+    "Peerspace/Event Bookings",
+    "Peerspace/Photo Bookings",
+    "Peerspace/Booking Updates",
+    "Peerspace/Cancellations",
+    "Airbnb/Disco Bookings",
+    "Airbnb/Upstairs Bookings",
+    "Airbnb/Cancellations",
+)
+
+HISTORY_TYPES = ["messageAdded", "labelAdded"]
+PAGE_SIZE = 500
+FETCH_BATCH = 50  # Gmail's recommended batch ceiling
+MAX_RETRIES = 4   # fetch rounds after the first for throttled / 5xx messages
+
+# handler(message, label_names) -> None; message is a users.messages.get resource
+Handler = Callable[[Dict[str, Any], List[str]], None]
+
+
+@dataclass
+class PollResult:
+    mode: str                       # "history" | "full_scan"
+    history_id: Optional[str] = None
+    api_calls: int = 0
+    messages: List[str] = field(default_factory=list)  # ids handed to the handler
+    missing: int = 0                # ids gone by the time we fetched them
+    failed: Dict[str, str] = field(default_factory=dict)  # id → error, after retries
+
+
+class GmailSync:
+    def __init__(self, service, state_path: str, labels: Iterable[str] = WATCH_LABELS,
+                 full_scan_days: int = 30, full_scan_limit: int = 500):
+        self.service = service
+        self.state_path = state_path
+        self.labels = tuple(labels)
+        self.full_scan_days = full_scan_days
+        self.full_scan_limit = full_scan_limit
+        self.calls = 0
+        self.failed: Dict[str, Exception] = {}
+        self._state = self._load()
+
+    # ---------------- checkpoint ----------------
+    def _load(self) -> Dict[str, Any]:
+        try:
+            with open(self.state_path) as f:
+                return dict(json.load(f))
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self) -> None:
+        os.makedirs(os.path.dirname(self.state_path) or ".", exist_ok=True)
+        tmp = f"{self.state_path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(self._state, f, indent=2)
+        os.replace(tmp, self.state_path)
+
+    @property
+    def history_id(self) -> Optional[str]:
+        return self._state.get("history_id")
+
+    def commit(self, history_id: str, failed: Iterable[str] = ()) -> None:
+        """Move the checkpoint; `failed` ids are fetched again on the next poll."""
+        self._state["history_id"] = history_id
+        self._state["failed"] = list(failed)
+        self._save()
+
+    # ---------------- labels ----------------
+    def _execute(self, request):
+        self.calls += 1
+        return request.execute()
+
+    def label_ids(self) -> Dict[str, str]:
+        """{label id: label name} for the watched labels (cached in the checkpoint file)."""
+        cached = self._state.get("labels") or {}
+        if set(cached.values()) >= set(self.labels):
+            return {i: n for i, n in cached.items() if n in self.labels}
+        resp = self._execute(self.service.users().labels().list(userId="me"))
+        found = {l["id"]: l["name"] for l in resp.get("labels", []) if l.get("name") in self.labels}
+        self._state["labels"] = found
+        self._save()
+        return found
+
+    # ---------------- change discovery ----------------
+    def _history(self, start: str, watched: Dict[str, str]) -> tuple:
+        """Message ids touched on watched labels since `start`, and the new historyId."""
+        ids: Dict[str, None] = {}
+        page, latest = None, start
+        while True:
+            params = dict(userId="me", startHistoryId=start,
+                          historyTypes=HISTORY_TYPES, maxResults=PAGE_SIZE)
+            if page:
+                params["pageToken"] = page
+            resp = self._execute(self.service.users().history().list(**params))
+            for h in resp.get("history", []) or []:
+                for added in h.get("messagesAdded", []) or []:
+                    msg = added.get("message", {})
+                    if watched.keys() & set(msg.get("labelIds", []) or []):
+                        ids[msg["id"]] = None
+                for added in h.get("labelsAdded", []) or []:
+                    if watched.keys() & set(added.get("labelIds", []) or []):
+                        ids[added["message"]["id"]] = None
+            latest = resp.get("historyId") or latest
+            page = resp.get("nextPageToken")
+            if not page:
+                return list(ids), latest
+
+    def _full_scan(self, watched: Dict[str, str]) -> tuple:
+        """Newest messages per watched label within the scan window."""
+        # anchor first: anything that arrives while we list shows up in the next history poll
+        anchor = self._execute(self.service.users().getProfile(userId="me"))["historyId"]
+        ids: Dict[str, None] = {}
+        for label_id in watched:
+            page, taken = None, 0
+            while taken < self.full_scan_limit:
+                params = dict(userId="me", labelIds=[label_id], q=f"newer_than:{self.full_scan_days}d",
+                              maxResults=min(PAGE_SIZE, self.full_scan_limit - taken))
+                if page:
+                    params["pageToken"] = page
+                resp = self._execute(self.service.users().messages().list(**params))
+                batch = resp.get("messages", []) or []
+                for m in batch:
+                    ids[m["id"]] = None
+                taken += len(batch)
+                page = resp.get("nextPageToken")
+                if not page or not batch:
+                    break
+        return list(ids), anchor
+
+    def changes(self) -> PollResult:
+        """Work out which messages to process; nothing is fetched or committed yet."""
+        watched = self.label_ids()
+        start = self.history_id
+        if start:
+            try:
+                ids, latest = self._history(start, watched)
+                return PollResult("history", latest, messages=ids)
+            except Exception as e:
+                if http_status(e) != 404:  # 404 = history id too old
+                    raise
+        ids, anchor = self._full_scan(watched)
+        return PollResult("full_scan", anchor, messages=ids)
+
+    # ---------------- fetch ----------------
+    def fetch(self, ids: List[str], fmt: str = "full") -> Dict[str, Dict[str, Any]]:
+        """
+        users.messages.get for many ids, FETCH_BATCH per batch request.
+        Messages that failed for good (not 404) are left in self.failed.
+        """
+        got: Dict[str, Dict[str, Any]] = {}
+        self.failed = {}
+        pending, attempt = list(ids), 0
+        while pending:
+            retry: List[str] = []
+            hint = 0.0
+            for i in range(0, len(pending), FETCH_BATCH):
+                errors = self._fetch_chunk(pending[i:i + FETCH_BATCH], fmt, got)
+                for mid, e in errors.items():
+                    if is_retryable(e) and attempt < MAX_RETRIES:
+                        retry.append(mid)
+                        hint = max(hint, retry_after(e) or 0.0)
+                    else:
+                        self.failed[mid] = e
+            pending, attempt = retry, attempt + 1
+            if pending:
+                for _ in pending:
+                    limiter("gmail").retried()
+                time.sleep(backoff_delay(attempt, hint))
+        return got
+
+    def _fetch_chunk(self, ids: List[str], fmt: str, got: Dict[str, Dict[str, Any]]) -> Dict[str, Exception]:
+        """One batch request under the Gmail limiter; returns {id: error} (404s dropped)."""
+        errors: Dict[str, Exception] = {}
+
+        def done(request_id, response, exception):
+            if exception is None:
+                got[response["id"]] = response
+            elif http_status(exception) != 404:  # 404: deleted since it was listed
+                errors[request_id] = exception
+
+        messages = self.service.users().messages()
+        batch = self.service.new_batch_http_request(callback=done)
+        for mid in ids:
+            batch.add(messages.get(userId="me", id=mid, format=fmt), request_id=mid)
+        lim = limiter("gmail")
+        with lim.slot(cost=len(ids)):
+            self._execute(batch)
+        if any(is_throttle(e) for e in errors.values()):
+            lim.throttled()
+        else:
+            lim.succeeded()
+        return errors
+
+    # ---------------- poll ----------------
+    def poll(self, handler: Handler,
+             unseen: Optional[Callable[[List[str]], List[str]]] = None) -> PollResult:
+        """
+        One incremental pass: discover, fetch, hand every message to `handler`
+        (oldest first), then checkpoint. The checkpoint is not moved if the
+        handler raises. `unseen(ids)` filters out already-processed ids
+        before anything is fetched.
+        """
+        self.calls = 0
+        result = self.changes()
+        earlier = [m for m in self._state.get("failed", []) if m not in result.messages]
+        result.messages = earlier + result.messages
+        watched = self.label_ids()
+        if unseen is not None:
+            result.messages = unseen(result.messages)
+        fetched = self.fetch(result.messages)
+        ordered = sorted(fetched.values(), key=lambda m: int(m.get("internalDate") or 0))
+        for msg in ordered:
+            names = [watched[l] for l in msg.get("labelIds", []) or [] if l in watched]
+            handler(msg, names)
+        result.failed = {mid: str(e) for mid, e in self.failed.items()}
+        result.missing = len(result.messages) - len(fetched) - len(result.failed)
+        result.messages = [m["id"] for m in ordered]
+        if result.history_id:
+            self.commit(result.history_id, result.failed)
+        result.api_calls = self.calls
+        return result
@@ -1,9 +1,31 @@
+import os
+
 from calendar_agent.models.booking import Booking
 from calendar_agent.calendar.service import upsert_booking
-from calendar_agent.calendar.google import create as gcreate, update as gupdate
+from calendar_agent.calendar.google import create as gcreate, update as gupdate, delete as gdelete
+from calendar_agent.config import settings
+from calendar_agent.sync.airbnb_ical import ingest_ical
+from calendar_agent.sync.gmail_history import WATCH_LABELS
+from calendar_agent.sync.run_gmail import ingest
+
+LABELS = tuple(l for l in WATCH_LABELS if l.startswith("Airbnb/"))
 
 def create(event): return gcreate(event)
 def update(provider_id, event): return gupdate(provider_id, event)
+def delete(calendar_id, provider_id): return gdelete(calendar_id, provider_id)
+
+def ical_feeds():
+    """{space: exported listing iCal URL} (empty URLs are skipped)."""
+    return {"Disco": settings.airbnb_ical_disco_url, "Upstairs": settings.airbnb_ical_upstairs_url}
+
+def poll_ical():
+    """Import reservations from the listing feeds; a 304 from a feed costs nothing more."""
+    results = ingest_ical(ical_feeds(), create, update, delete, os.path.join(settings.state_dir, "airbnb_ical.json"))
+    for r in results:
+        print(f"[airbnb-ical] {r}")
+    return results
 
 def main():
-    return
+    ingest(LABELS, name="airbnb")
+    if any(ical_feeds().values()):
+        poll_ical()
@@ -1,9 +1,72 @@
+import os
+
 from calendar_agent.models.booking import Booking
-from calendar_agent.calendar.service import upsert_booking
-from calendar_agent.calendar.google import create as gcreate, update as gupdate
+from calendar_agent.calendar.service import cancel_by_source_id, upsert_booking
+from calendar_agent.calendar.google import create as gcreate, update as gupdate, delete as gdelete
+from calendar_agent.config import settings
+from calendar_agent.google_api import get_service, local_service
+from calendar_agent.parsing.emails import CANCEL, EmailParser, ParsedEmail
+from calendar_agent.store.seen import SeenStore
+from calendar_agent.sync.gmail_history import WATCH_LABELS, GmailSync
+
+GMAIL_SCOPES = ["https://www.googleapis.com/auth/gmail.readonly"]
 
 def create(event): return gcreate(event)
 def update(provider_id, event): return gupdate(provider_id, event)
+def delete(calendar_id, provider_id): return gdelete(calendar_id, provider_id)
+
+def gmail_service():
+    if settings.gmail_api_endpoint:
+        return local_service("gmail", "v1", settings.gmail_api_endpoint)
+    return get_service("gmail", "v1", scopes=GMAIL_SCOPES, token_path=settings.gmail_token_path,
+                       credentials_path=settings.google_credentials_path)
+
+def seen_store():
+    return SeenStore(os.path.join(settings.state_dir, "gmail_seen.sqlite3"),
+                     retention_days=settings.gmail_seen_retention_days,
+                     legacy_path=settings.gmail_state_path)
+
+def apply(p: ParsedEmail) -> str:
+    """Push one parsed email to the calendar; returns a one-line description."""
+    if p.action == CANCEL:
+        spaces = [p.booking.space] if p.booking else ["Disco", "Upstairs"]
+        n = sum(cancel_by_source_id(p.source, p.external_id, s, delete) for s in spaces)
+        return f"cancel {p.source} {p.external_id}: removed {n} event(s)"
+    if p.booking is None:
+        return f"skip {p.action} {p.source} {p.external_id}: no dates in email"
+    upsert_booking(p.booking, create, update)
+    b = p.booking
+    return f"{p.action} {p.source} {p.external_id}: {b.space} {b.start:%Y-%m-%d %H:%M} → {b.end:%Y-%m-%d %H:%M}"
+
+def ingest(labels=WATCH_LABELS, name="gmail"):
+    """Poll Gmail for new mail on `labels`, parse it and apply it to the calendars."""
+    seen = seen_store()
+    stuck = seen.pending()
+    if stuck:
+        print(f"[{name}] {len(stuck)} message(s) interrupted mid-handling last run, not retried: "
+              + ", ".join(stuck))
+    sync = GmailSync(gmail_service(), os.path.join(settings.state_dir, f"{name}_sync.json"),
+                     labels=labels, full_scan_days=settings.gmail_full_scan_days,
+                     full_scan_limit=settings.gmail_full_scan_limit)
+    parser = EmailParser(settings.timezone)
+
+    def handle(msg, msg_labels):
+        if not seen.claim(msg["id"]):
+            return
+        try:
+            parsed = parser.parse_message(msg, msg_labels)
+            print(f"[{name}] {msg['id']} " + (apply(parsed) if parsed else "not a booking email"))
+        except Exception:
+            seen.release(msg["id"])
+            raise
+        seen.done(msg["id"])
+
+    result = sync.poll(handle, unseen=seen.unseen)
+    print(f"[{name}] {result.mode}: {len(result.messages)} message(s), "
+          f"{result.api_calls} API call(s), historyId {result.history_id}")
+    for mid, err in result.failed.items():
+        print(f"[{name}] {mid} could not be fetched: {err}")
+    return result
 
 def main():
-    return
+    ingest()
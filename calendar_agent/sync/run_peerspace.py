@@ -1,9 +1,13 @@
 from calendar_agent.models.booking import Booking
 from calendar_agent.calendar.service import upsert_booking
 from calendar_agent.calendar.google import create as gcreate, update as gupdate
+from calendar_agent.sync.gmail_history import WATCH_LABELS
+from calendar_agent.sync.run_gmail import ingest
+
+LABELS = tuple(l for l in WATCH_LABELS if l.startswith("Peerspace/"))
 
 def create(event): return gcreate(event)
 def update(provider_id, event): return gupdate(provider_id, event)
 
 def main():
-    return
+    ingest(LABELS, name="peerspace")
@@ -1,8 +1,7 @@
-from playwright.sync_api import sync_playwright, TimeoutError
-from datetime import datetime
+from datetime import date, datetime, timedelta
 import sys, time, platform, re
+from scripts.browser_runtime import browser_session
 
-AUTH_PATH = "playwright/.auth/airbnb_state.json"
 BASE_MULTI = "https://www.airbnb.com/multicalendar/53003871"  # Disco listing id
 DISCO_NAME = "Design-Focused, Riverfront Loft Near Downtown"
 
@@ -15,6 +14,23 @@ def iso_to_label(iso_date:str)->str:
     day_fmt = "%-d" if platform.system() != "Windows" else "%#d"
     return d.strftime(f"%A, %B {day_fmt}, %Y")
 
+def group_by_month(dates):
+    """{month_param: sorted unique ISO dates in that month}"""
+    months = {}
+    for d in sorted(set(dates)):
+        months.setdefault(month_param(d), []).append(d)
+    return months
+
+def contiguous_runs(dates):
+    """Sorted ISO dates → [(first, last), ...] of consecutive-day runs."""
+    runs = []
+    for d in sorted(set(dates)):
+        if runs and date.fromisoformat(runs[-1][1]) + timedelta(days=1) == date.fromisoformat(d):
+            runs[-1] = (runs[-1][0], d)
+        else:
+            runs.append((d, d))
+    return runs
+
 def ensure_disco_selected(page):
     # Best-effort: if the listing chip/row is present, click it
     try:
@@ -64,11 +80,96 @@ def act_on_date(page, iso_date:str, make_available=False):
 
     print(("Unblocked" if make_available else "Blocked"), iso_date)
 
-def block_or_unblock(dates, make_available=False):
-    with sync_playwright() as p:
-        b = p.chromium.launch(headless=False)
-        ctx = b.new_context(storage_state=AUTH_PATH)
-        page = ctx.new_page()
+# ---------------- batch mode: one page load per month ----------------
+DAY_CELL = '[data-testid^="calendar-day-"]'
+SELECTED_CELL = DAY_CELL + '[aria-selected="true"]'
+WAIT_MS = 10_000
+BLOCK_BUTTONS = re.compile(r"^(Block nights|Mark as unavailable|Unavailable|Block)$", re.I)
+OPEN_BUTTONS = re.compile(r"^(Open nights|Mark as available|Available|Unblock)$", re.I)
+SAVE_BUTTON = re.compile(r"^Save$", re.I)
+
+def day_cell(page, iso_date:str):
+    cell = page.locator(f'[data-testid="calendar-day-{iso_date}"]')
+    if cell.count() == 0:
+        cell = page.get_by_label(iso_to_label(iso_date), exact=True)
+    return cell.first
+
+def load_month(page, base_url:str, month:str):
+    # the grid rendering is what we need, not every analytics request settling
+    page.goto(f"{base_url}?month={month}", wait_until="domcontentloaded", timeout=120_000)
+    page.locator(DAY_CELL).first.wait_for(state="visible", timeout=WAIT_MS * 3)
+    ensure_disco_selected(page)
+
+def act_on_range(page, first:str, last:str, make_available=False):
+    """Select first..last (click, then shift+click) and apply one block/open + save.
+
+    A click on a selected day toggles it off, so days still selected by an
+    attempt that timed out are cleared and the first day is only clicked when
+    it isn't selected already.
+    """
+    keep = f"calendar-day-{first}"
+    for testid in page.locator(SELECTED_CELL).evaluate_all("els => els.map(e => e.dataset.testid)"):
+        if testid != keep:
+            page.locator(f'[data-testid="{testid}"]').click()
+    start = day_cell(page, first)
+    if start.get_attribute("aria-selected") != "true":
+        start.scroll_into_view_if_needed()
+        start.click()
+    if last != first:
+        end = day_cell(page, last)
+        end.scroll_into_view_if_needed()
+        end.click(modifiers=["Shift"])
+
+    action = page.get_by_role("button", name=OPEN_BUTTONS if make_available else BLOCK_BUTTONS).first
+    action.wait_for(state="visible", timeout=WAIT_MS)
+    action.click()
+
+    save = page.get_by_role("button", name=SAVE_BUTTON).first
+    if save.is_visible():
+        save.click()
+        # the side panel closing is the UI's acknowledgement of the save
+        save.wait_for(state="hidden", timeout=WAIT_MS)
+
+def block_month(page, base_url:str, month:str, days, make_available=False):
+    """Load one month and act on each contiguous run of days, one day at a time if a range fails."""
+    from playwright.sync_api import TimeoutError
+    verb = "Unblocked" if make_available else "Blocked"
+    load_month(page, base_url, month)
+    for first, last in contiguous_runs(days):
+        label = first if first == last else f"{first}..{last}"
+        try:
+            act_on_range(page, first, last, make_available=make_available)
+            print(verb, label)
+        except TimeoutError:
+            if first == last:
+                print(f"Timeout on {first}")
+                continue
+            # range selection not offered: same page, one day at a time
+            print(f"Range {label} not accepted, falling back to single days")
+            d = date.fromisoformat(first)
+            while d <= date.fromisoformat(last):
+                try:
+                    act_on_range(page, d.isoformat(), d.isoformat(), make_available=make_available)
+                    print(verb, d.isoformat())
+                except TimeoutError:
+                    print(f"Timeout on {d.isoformat()}")
+                d += timedelta(days=1)
+
+def block_or_unblock_batch(dates, make_available=False, base_url=BASE_MULTI, headless=True):
+    t0 = time.perf_counter()
+    with browser_session(headless=headless) as s:
+        page = s.new_page()
+
+        for month, days in group_by_month(dates).items():
+            tm = time.perf_counter()
+            block_month(page, base_url, month, days, make_available=make_available)
+            print(f"  {month[:7]}: {len(days)} date(s) in {time.perf_counter() - tm:.1f}s")
+    print(f"Done in {time.perf_counter() - t0:.1f}s")
+
+def block_or_unblock(dates, make_available=False, headless=True):
+    from playwright.sync_api import TimeoutError
+    with browser_session(headless=headless) as s:
+        page = s.new_page()
 
         for d in dates:
             url = f"{BASE_MULTI}?month={month_param(d)}"
@@ -81,18 +182,32 @@ def block_or_unblock(dates, make_available=False):
                 print(f"Timeout on {d}")
             time.sleep(0.2)
 
-        ctx.storage_state(path=AUTH_PATH)
-        b.close()
-
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Usage:\n  Block:   python scripts/airbnb_block_dates.py 2025-12-27 2025-12-28\n  Unblock: python scripts/airbnb_block_dates.py --unblock 2025-12-27")
-        sys.exit(1)
-
+    usage = ("Usage:\n  Block:   PYTHONPATH=. python scripts/airbnb_block_dates.py 2025-12-27 2025-12-28\n"
+             "  Unblock: PYTHONPATH=. python scripts/airbnb_block_dates.py --unblock 2025-12-27\n"
+             "Options: --one-by-one (reload per date, old behaviour), --headed, --base-url URL")
     args = sys.argv[1:]
-    make_available = False
-    if args[0] == "--unblock":
-        make_available = True
-        args = args[1:]
+    make_available = one_by_one = False
+    headless = True
+    base_url = BASE_MULTI
+    dates = []
+    while args:
+        a = args.pop(0)
+        if a == "--unblock":
+            make_available = True
+        elif a == "--one-by-one":
+            one_by_one = True
+        elif a == "--headed":
+            headless = False
+        elif a == "--base-url" and args:
+            base_url = args.pop(0)
+        else:
+            dates.append(a)
+    if not dates:
+        print(usage)
+        sys.exit(1)
 
-    block_or_unblock(args, make_available=make_available)
+    if one_by_one:
+        block_or_unblock(dates, make_available=make_available, headless=headless)
+    else:
+        block_or_unblock_batch(dates, make_available=make_available, base_url=base_url, headless=headless)
@@ -1,16 +1,35 @@
-from playwright.sync_api import sync_playwright
-from pathlib import Path
-import re, json
+import asyncio, hashlib, json, os, re, sys
 from datetime import datetime
 from dateutil import parser as dtparse
+from scripts.browser_runtime import async_browser_session
 
-AUTH_PATH = "playwright/.auth/airbnb_state.json"
 INBOX_URL = "https://www.airbnb.com/hosting/inbox"
+STATE_DIR = os.environ.get("CALENDAR_AGENT_STATE_DIR", ".calendar_agent")
+CHECKPOINT_PATH = os.path.join(STATE_DIR, "airbnb_chat_checkpoint.json")
+WORKERS = 3          # parallel browser contexts
+WAIT_MS = 15_000
+FIRST_RUN = 10       # messages read from a thread not seen before
 
 # Regex for system updates, handles small wording variations:
 RE_CHECKIN  = re.compile(r"you updated .*check[\-\s]?in to ([\d: ]+[ap]m)\s+on\s+([A-Za-z]+\s+\d{1,2},\s+\d{4})", re.I)
 RE_CHECKOUT = re.compile(r"you updated .*check[\-\s]?out to ([\d: ]+[ap]m)\s+on\s+([A-Za-z]+\s+\d{1,2},\s+\d{4})", re.I)
 
+THREAD_ITEMS = '[data-testid="thread-item"], [data-testid*="inbox-thread"]'
+MESSAGES = '[data-testid="message-text"], [data-testid*="message"]'
+
+# One evaluation for the whole thread list: link and preview text per item.
+JS_THREADS = """(sel) => [...document.querySelectorAll(sel)].map((el, i) => {
+    const a = el.matches('a[href]') ? el : el.querySelector('a[href]');
+    return {index: i, href: a ? a.href : null, preview: (el.innerText || '').trim()};
+})"""
+
+# One evaluation per thread: header + text of the last 30 messages.
+JS_THREAD = """([msgSel]) => {
+    const h = document.querySelector('[data-testid="thread-header"]') || document.querySelector('h1, h2, h3');
+    const msgs = [...document.querySelectorAll(msgSel)].slice(-30);
+    return {header: h ? h.innerText.trim() : '', messages: msgs.map(m => (m.innerText || '').trim())};
+}"""
+
 def parse_update(msg_text):
     m = RE_CHECKIN.search(msg_text)
     if m:
@@ -22,70 +41,133 @@ def parse_update(msg_text):
         return {"type":"checkout_change","when_str":f"{d} {t}"}
     return None
 
-def main(max_threads=20):
+# ---------------- checkpoint: thread key -> last seen ----------------
+def _digest(text):
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:16]
+
+def load_checkpoint(path=CHECKPOINT_PATH):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_checkpoint(state, path=CHECKPOINT_PATH):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp, path)
+
+def thread_key(thread):
+    """Checkpoint key: the thread link, or the preview digest for items without one."""
+    return thread["href"] or f"preview:{_digest(thread['preview'])}"
+
+def new_messages(texts, last_seen):
+    """Messages after the last one seen (all of them if it scrolled out of view).
+
+    A thread with no checkpoint yet gives its last FIRST_RUN messages.
+    """
+    if last_seen is None:
+        return texts[-FIRST_RUN:]
+    digests = [_digest(t) for t in texts]
+    if last_seen in digests:
+        return texts[len(digests) - digests[::-1].index(last_seen):]
+    return texts
+
+def updates_from(thread_index, header, texts):
+    out = []
+    for text in texts:
+        upd = parse_update(text)
+        if not upd:
+            continue
+        # Try to parse datetime to ISO
+        try:
+            iso_when = dtparse.parse(upd["when_str"]).isoformat()
+        except Exception:
+            iso_when = upd["when_str"]
+        out.append({
+            "thread_index": thread_index,
+            "header": header,
+            "raw_text": text,
+            "update_type": upd["type"],
+            "new_time": iso_when
+        })
+    return out
+
+# ---------------- scanning ----------------
+async def read_thread(page, thread, inbox_url=INBOX_URL):
+    if thread["href"]:
+        await page.goto(thread["href"], wait_until="domcontentloaded", timeout=120_000)
+    else:
+        # no link to follow: open it from the inbox list
+        await page.goto(inbox_url, wait_until="domcontentloaded", timeout=120_000)
+        item = page.locator(THREAD_ITEMS).nth(thread["index"])
+        await item.wait_for(state="attached", timeout=WAIT_MS)
+        await item.click()
+    await page.locator(MESSAGES).first.wait_for(state="attached", timeout=WAIT_MS)
+    return await page.evaluate(JS_THREAD, [MESSAGES])
+
+async def scan(max_threads=20, workers=WORKERS, headless=True, inbox_url=INBOX_URL):
+    state = load_checkpoint()
     results = []
-    with sync_playwright() as p:
-        b = p.chromium.launch(headless=False)
-        ctx = b.new_context(storage_state=AUTH_PATH)
-        page = ctx.new_page()
-        page.goto(INBOX_URL, timeout=120_000)
-        page.wait_for_load_state("networkidle")
+    async with async_browser_session(headless=headless) as s:
+        page = await s.new_page()
+        await page.goto(inbox_url, wait_until="domcontentloaded", timeout=120_000)
 
         # Ensure we’re on Hosting inbox (not guest)
         try:
-            hostTab = page.get_by_role("tab", name=re.compile("Hosting", re.I))
-            if hostTab.count():
-                hostTab.first.click()
-                page.wait_for_load_state("networkidle")
-        except: pass
-
-        # Grab thread list items (robust-ish fallbacks)
-        # Prefer items with data-testid, else role=link in the sidebar list
-        items = page.locator('[data-testid="thread-item"]').or_(page.locator('[data-testid*="inbox-thread"]'))
-        if items.count() == 0:
-            items = page.get_by_role("link")  # fallback
-
-        take = min(items.count(), max_threads)
-        for i in range(take):
-            try:
-                thread = items.nth(i)
-                thread.scroll_into_view_if_needed()
-                thread.click()
-                page.wait_for_load_state("networkidle")
-
-                # Conversation header (guest / listing)
-                header = ""
+            host_tab = page.get_by_role("tab", name=re.compile("Hosting", re.I))
+            if await host_tab.count():
+                await host_tab.first.click()
+        except Exception:
+            pass
+        try:
+            await page.locator(THREAD_ITEMS).first.wait_for(state="attached", timeout=WAIT_MS)
+        except Exception:
+            print("[warn] no inbox threads found", file=sys.stderr)
+
+        threads = (await page.evaluate(JS_THREADS, THREAD_ITEMS))[:max_threads]
+        # a thread whose list preview is unchanged has no new messages
+        changed = [t for t in threads
+                   if state.get(thread_key(t), {}).get("preview") != _digest(t["preview"])]
+        print(f"[info] {len(changed)}/{len(threads)} thread(s) changed since last run", file=sys.stderr)
+
+        queue = asyncio.Queue()
+        for t in changed:
+            queue.put_nowait(t)
+
+        async def worker(n):
+            wctx = None if n == 0 else await s.new_context()
+            wpage = page if n == 0 else await wctx.new_page()
+            while not queue.empty():
+                t = queue.get_nowait()
+                key = thread_key(t)
                 try:
-                    header_el = page.locator('[data-testid="thread-header"]').or_(page.locator("h1, h2, h3")).first
-                    if header_el.count(): header = header_el.inner_text().strip()
-                except: pass
-
-                # Collect recent messages (system + host/guest)
-                msgs = page.locator('[data-testid="message-text"]').or_(page.locator('[data-testid*="message"]'))
-                count = min(msgs.count(), 30)
-                for j in range(max(0, count-10), count):  # last ~10 messages
-                    text = msgs.nth(j).inner_text().strip()
-                    upd = parse_update(text)
-                    if upd:
-                        # Try to parse datetime to ISO
-                        try:
-                            dt_local = dtparse.parse(upd["when_str"])
-                            iso_when = dt_local.isoformat()
-                        except:
-                            iso_when = upd["when_str"]
-                        results.append({
-                            "thread_index": i,
-                            "header": header,
-                            "raw_text": text,
-                            "update_type": upd["type"],
-                            "new_time": iso_when
-                        })
-            except Exception as e:
-                # continue to next thread
-                print(f"[warn] thread {i}: {e}")
-
-        b.close()
+                    data = await read_thread(wpage, t, inbox_url)
+                    seen = state.get(key, {}).get("last")
+                    results.extend(updates_from(t["index"], data["header"],
+                                                new_messages(data["messages"], seen)))
+                    state[key] = {"preview": _digest(t["preview"]),
+                                  "last": _digest(data["messages"][-1]) if data["messages"] else seen,
+                                  "checked_at": datetime.now().isoformat(timespec="seconds")}
+                except Exception as e:
+                    # continue to next thread
+                    print(f"[warn] thread {t['index']}: {e}", file=sys.stderr)
+            if n:
+                await wctx.close()
+
+        await asyncio.gather(*(worker(n) for n in range(max(1, min(workers, len(changed))))))
 
+    # preview keys go stale as soon as the preview changes
+    listed = {thread_key(t) for t in threads}
+    state = {k: v for k, v in state.items() if not k.startswith("preview:") or k in listed}
+    save_checkpoint(state)
+    results.sort(key=lambda r: r["thread_index"])
+    return results
+
+def main(max_threads=20):
+    results = asyncio.run(scan(max_threads=max_threads))
     # Print JSON lines (easy to pipe/parse)
     for r in results:
         print(json.dumps(r, ensure_ascii=False))
@@ -1,12 +1,9 @@
-from playwright.sync_api import sync_playwright
 from pathlib import Path
+from scripts.browser_runtime import AUTH_PATH, browser_session, share_login
 
-AUTH_PATH = "playwright/.auth/airbnb_state.json"
-
-with sync_playwright() as p:
-    browser = p.chromium.launch(headless=False)
-    context = browser.new_context(storage_state=AUTH_PATH if Path(AUTH_PATH).exists() else None)
-    page = context.new_page()
+# interactive: always a visible, private browser with every asset loaded
+with browser_session(headless=False, block_assets=False, auth=True, attach=False) as s:
+    page = s.new_page()
     page.goto("https://www.airbnb.com/login", timeout=120_000)
 
     if Path(AUTH_PATH).exists():
@@ -15,6 +12,8 @@ with sync_playwright() as p:
         print("Complete login in the opened browser window.")
         input("When you finish logging in, come back here and press Enter...")
 
-    context.storage_state(path=AUTH_PATH)
+    Path(AUTH_PATH).parent.mkdir(parents=True, exist_ok=True)
+    s.context.storage_state(path=AUTH_PATH)
     print(f"Saved login state to {AUTH_PATH}")
-    browser.close()
+
+share_login()  # hand the new cookies to a running browser daemon
@@ -1,11 +1,11 @@
-from playwright.sync_api import sync_playwright
-AUTH_PATH = "playwright/.auth/airbnb_state.json"
+import time
+from scripts.browser_runtime import browser_session
+
 LISTING_CAL_URL = "https://www.airbnb.com/hosting/listings/53003871/calendar"
 
-with sync_playwright() as p:
-    b = p.chromium.launch(headless=True)
-    ctx = b.new_context(storage_state=AUTH_PATH)
-    page = ctx.new_page()
+t0 = time.perf_counter()
+with browser_session() as s:
+    page = s.new_page()
     page.goto(LISTING_CAL_URL, timeout=120_000)
     print("Loaded:", page.url, "| Title:", page.title())
-    b.close()
+    print(f"({'warm daemon' if s.attached else 'cold launch'}, {time.perf_counter() - t0:.1f}s)")
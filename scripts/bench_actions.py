@@ -0,0 +1,189 @@
+"""
+Benchmark the calendar actions end to end against the local fake Calendar server.
+
+    PYTHONPATH=. python scripts/bench_actions.py                     # 100 … 50k events, cold
+    PYTHONPATH=. python scripts/bench_actions.py --sizes 1000 --mode warm --latency 0.05
+    PYTHONPATH=. python scripts/bench_actions.py --update            # rewrite the baselines
+
+Each run seeds a fresh scripts/fake_calendar.py with ~N agent-shaped events,
+then runs the action as the CLI would (`python -m actions.<name> ...`, so
+import time is included) against it and records wall time, HTTP round trips,
+API operations (batched ones counted individually) and the change in live
+events.
+
+Modes:
+  cold      fresh state dir: calendar ids and the event mirror start empty
+  warm      state dir primed first; the run does delta syncs only
+  nomirror  CALENDAR_AGENT_MIRROR=0 (every lookup goes to the API)
+
+Results are compared with tests/fixtures/bench_actions_baseline.json. More
+round trips / operations or a different event delta than the baseline fails
+the run; wall time is reported as a ratio and only fails with --strict-time
+(it depends on the machine). The rate limiter is opened up (CALENDAR_API_QPS)
+so quota pacing does not hide the code's own cost.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import timedelta
+
+sys.path.insert(0, os.path.dirname(__file__))
+from fake_calendar import FakeCalendar  # noqa: E402
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+BASELINE = os.path.join(ROOT, "tests", "fixtures", "bench_actions_baseline.json")
+SIZES = (100, 1000, 10_000, 50_000)
+CALENDARS = ("Disco Bookings", "Upstairs Bookings", "Block on Airbnb")
+PRIME = ("from tools.gcal_tool import get_cal_id, refresh_mirror\n"
+         f"for n in {CALENDARS!r}: refresh_mirror(get_cal_id(n))")
+
+
+# ---------------- scenarios ----------------
+# name -> fn(seeded FakeCalendar) -> argv after `python -m`; each targets the
+# middle of the seeded range so lookups have neighbours on both sides.
+def _mid(cal):
+    i = len(cal.seed_starts) // 2
+    return i, cal.seed_starts[i]
+
+
+def airbnb_to_disco(cal):
+    _, ci = _mid(cal)
+    co = ci + timedelta(days=2, hours=-5)
+    return ["actions.airbnb_to_disco", "BENCH-D", "Bench Guest", ci.isoformat(), co.isoformat()]
+
+
+def airbnb_to_upstairs(cal):
+    argv = airbnb_to_disco(cal)
+    return ["actions.airbnb_to_upstairs", "BENCH-U"] + argv[2:]
+
+
+def block_manual(cal):
+    _, ci = _mid(cal)
+    d = ci.date()
+    return ["actions.block_manual", "EVENT", d.isoformat(), (d + timedelta(days=1)).isoformat()]
+
+
+def cancel(cal):
+    i, _ = _mid(cal)
+    return ["actions.cancel", f"SEED-D{i}", "disco"]
+
+
+def cleanup_booking(cal):
+    i, ci = _mid(cal)
+    return ["actions.cleanup_booking", f"ps|SEED-P{i}|{ci.date()}"]
+
+
+def cancel_by_title(cal):
+    i, ci = _mid(cal)
+    d = ci.date().isoformat()
+    return ["actions.cancel_by_title", "Upstairs Bookings", f"Guest {i:05d}", d, d]
+
+
+SCENARIOS = {f.__name__: f for f in (airbnb_to_disco, airbnb_to_upstairs, block_manual,
+                                     cancel, cleanup_booking, cancel_by_title)}
+
+
+# ---------------- runner ----------------
+def _env(port, state_dir, mode):
+    env = dict(os.environ, PYTHONPATH=ROOT, CALENDAR_API_ENDPOINT=f"http://127.0.0.1:{port}/",
+               CALENDAR_AGENT_STATE_DIR=state_dir, CALENDAR_API_QPS="10000", CALENDAR_API_BURST="10000")
+    for k in ("GOOGLE_CALENDAR_DISCO_ID", "GOOGLE_CALENDAR_UPSTAIRS_ID", "GOOGLE_CALENDAR_BLOCK_ID"):
+        env[k] = ""  # names resolve through the fake's calendarList
+    if mode == "warm":
+        env["CALENDAR_MIRROR_MAX_AGE"] = "0"  # always delta-sync, as a later run would
+    if mode == "nomirror":
+        env["CALENDAR_AGENT_MIRROR"] = "0"
+    return env
+
+
+def run_one(name, size, mode="cold", latency=0.0):
+    cal = FakeCalendar()
+    cal.seed_bookings(size)
+    server = cal.serve(0)
+    try:
+        with tempfile.TemporaryDirectory() as state:
+            env = _env(server.server_address[1], state, mode)
+            if mode == "warm":
+                subprocess.run([sys.executable, "-c", PRIME], env=env, cwd=ROOT, check=True)
+            argv = SCENARIOS[name](cal)
+            cal.latency = latency
+            cal.reset_counters()
+            before = cal.live()
+            t0 = time.perf_counter()
+            p = subprocess.run([sys.executable, "-m", *argv], env=env, cwd=ROOT,
+                               capture_output=True, text=True)
+            seconds = time.perf_counter() - t0
+    finally:
+        server.shutdown()
+    if p.returncode:
+        raise RuntimeError(f"{' '.join(argv)} failed:\n{p.stdout}{p.stderr}")
+    return {"seconds": round(seconds, 3), "requests": cal.requests,
+            "calls": sum(cal.calls.values()) - cal.calls["batch"],
+            "delta": cal.live() - before}
+
+
+def compare(result, base, tolerance):
+    """(count problems, time problem) of one result against its baseline entry."""
+    if not base:
+        return ["no baseline"], None
+    errs = [f"{k} {result[k]} > {base[k]}" for k in ("requests", "calls") if result[k] > base[k]]
+    if result["delta"] != base["delta"]:
+        errs.append(f"delta {result['delta']} != {base['delta']}")
+    slow = None
+    if result["seconds"] > base["seconds"] * tolerance:
+        slow = f"{result['seconds'] / base['seconds']:.2f}x slower"
+    return errs, slow
+
+
+def load_baseline(path=BASELINE):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--sizes", default=",".join(map(str, SIZES)), help="comma-separated event counts")
+    ap.add_argument("--only", help="comma-separated scenarios (default: all)")
+    ap.add_argument("--mode", choices=("cold", "warm", "nomirror"), default="cold")
+    ap.add_argument("--latency", type=float, default=0.0, help="seconds added to every HTTP round trip")
+    ap.add_argument("--tolerance", type=float, default=1.5, help="allowed wall-time ratio to the baseline")
+    ap.add_argument("--strict-time", action="store_true", help="fail on wall-time regressions too")
+    ap.add_argument("--update", action="store_true", help="write these results as the new baseline")
+    ap.add_argument("--baseline", default=BASELINE)
+    args = ap.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",")]
+    names = args.only.split(",") if args.only else list(SCENARIOS)
+    baseline = load_baseline(args.baseline)
+    key = args.mode if not args.latency else f"{args.mode}+{args.latency:g}s"
+    base = baseline.get(key, {})
+    results, failed = {}, 0
+    print(f"{'scenario':<20} {'events':>7} {'seconds':>8} {'requests':>8} {'calls':>6} {'delta':>6}  vs baseline")
+    for name in names:
+        for size in sizes:
+            r = run_one(name, size, args.mode, args.latency)
+            results.setdefault(name, {})[str(size)] = r
+            errs, slow = compare(r, base.get(name, {}).get(str(size)), args.tolerance)
+            bad = [e for e in errs if e != "no baseline"] + ([slow] if slow and args.strict_time else [])
+            failed += bool(bad)
+            note = "; ".join(errs + ([slow] if slow else [])) or "ok"
+            print(f"{name:<20} {size:>7} {r['seconds']:>8.3f} {r['requests']:>8} {r['calls']:>6} "
+                  f"{r['delta']:>6}  {'FAIL ' if bad else ''}{note}")
+    if args.update:
+        baseline[key] = {**base, **{n: {**base.get(n, {}), **r} for n, r in results.items()}}
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"baseline written to {args.baseline} ({key})")
+    elif failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
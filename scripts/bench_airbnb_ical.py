@@ -0,0 +1,104 @@
+"""
+Time the Airbnb iCal importer on a generated feed.
+
+    PYTHONPATH=. python scripts/bench_airbnb_ical.py            # 20k reservations
+    PYTHONPATH=. python scripts/bench_airbnb_ical.py -n 100000
+
+A feed of -n reservations is parsed in-process to report the peak memory of
+the streaming parse. It is then served by calendar_agent.feed.serve and
+polled twice into scripts/fake_calendar.py, each time through
+calendar_agent.sync.run_airbnb.poll_ical() in a fresh process: the full
+import, and the 304 that follows it. The behaviour itself (304s, edits,
+vanished reservations, failing feeds) is covered by tests/test_airbnb_ical.py.
+"""
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from zoneinfo import ZoneInfo
+
+sys.path.insert(0, os.path.dirname(__file__))
+from fake_calendar import FakeCalendar  # noqa: E402
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+POLL = ("from calendar_agent.sync.run_airbnb import poll_ical\n"
+        "for r in poll_ical():\n    print(r.status, r)")
+
+
+def generated_feed(path, n):
+    with open(path, "w", newline="") as f:
+        f.write("BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:-//Airbnb Inc//Hosting Calendar 1.0//EN\r\n")
+        for i in range(n):
+            f.write("BEGIN:VEVENT\r\n"
+                    f"DTSTART;VALUE=DATE:{20270101 + i % 28}\r\nDTEND;VALUE=DATE:{20270102 + i % 28}\r\n"
+                    f"UID:gen{i}@airbnb.com\r\n"
+                    "DESCRIPTION:Reservation URL: https://www.airbnb.com/hosting/reservations/d\r\n"
+                    f" etails/HMGEN{i:07d}\\nPhone Number (Last 4 Digits): 0000\r\n"
+                    "SUMMARY:Reserved\r\nEND:VEVENT\r\n")
+        f.write("END:VCALENDAR\r\n")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("-n", type=int, default=20_000, help="reservations in the timed feed")
+    args = ap.parse_args()
+
+    cal = FakeCalendar()
+    cal_server = cal.serve(0)
+    state = tempfile.mkdtemp()
+    from calendar_agent.feed import serve
+
+    feed = os.path.join(state, "disco.ics")
+    generated_feed(feed, args.n)
+    feed_server = serve(feed, 0)
+    env = dict(os.environ, PYTHONPATH=ROOT, CALENDAR_AGENT_STATE_DIR=state,
+               CALENDAR_API_ENDPOINT=f"http://127.0.0.1:{cal_server.server_address[1]}/",
+               CALENDAR_API_QPS="10000", CALENDAR_API_BURST="10000",
+               GOOGLE_CALENDAR_DISCO_ID=cal.cal_id("Disco Bookings"),
+               GOOGLE_CALENDAR_UPSTAIRS_ID=cal.cal_id("Upstairs Bookings"),
+               AIRBNB_ICAL_DISCO_URL=f"http://127.0.0.1:{feed_server.server_address[1]}/disco.ics",
+               AIRBNB_ICAL_UPSTAIRS_URL="")
+
+    def poll():
+        """One run_airbnb.poll_ical() in a fresh process, as the CLI would run it."""
+        t0 = time.perf_counter()
+        p = subprocess.run([sys.executable, "-c", POLL], env=env, cwd=ROOT, capture_output=True, text=True)
+        seconds = time.perf_counter() - t0
+        if p.returncode:
+            raise RuntimeError(p.stdout + p.stderr)
+        out = [l for l in p.stdout.splitlines() if l and not l.startswith("[")]
+        status, summary = out[0].split(" ", 1)
+        return status, summary, seconds
+
+    size = os.path.getsize(feed)
+    from calendar_agent.sync.airbnb_ical import FeedResult, iter_bookings
+    zone = ZoneInfo("America/Detroit")
+
+    def parse():
+        with open(feed, "rb") as f:
+            return sum(1 for _ in iter_bookings(f, "Disco", zone, FeedResult("Disco")))
+
+    t0 = time.perf_counter()
+    parsed = parse()
+    parse_s = time.perf_counter() - t0
+    tracemalloc.start()  # a second pass: tracing slows the parse down several times
+    parse()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"{args.n} reservations ({size / 1e6:.1f} MB): parsed {parsed} in {parse_s:.2f}s, "
+          f"peak parse memory {peak / 1e6:.2f} MB")
+    _, summary, first = poll()
+    print(f"  first poll {first:.2f}s ({summary})")
+    status, summary, again = poll()
+    print(f"  next poll  {again:.2f}s ({status} {summary}; process start included)")
+    feed_server.shutdown()
+    cal_server.shutdown()
+    shutil.rmtree(state, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
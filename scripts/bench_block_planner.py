@@ -0,0 +1,65 @@
+"""
+Time the bulk block planner against the per-booking rules.
+
+    PYTHONPATH=. python scripts/bench_block_planner.py              # 10k-booking season
+    PYTHONPATH=. python scripts/bench_block_planner.py --seed 7 -n 50000
+
+A season of random Peerspace-shaped bookings is planned one booking at a time
+(block_dates_for_event + merge_block_label) and in one pass with
+plan_block_labels. Equivalence on boundary-heavy random bookings is checked by
+tests/test_rules.py, which uses reference_labels and season from here.
+"""
+import argparse
+import random
+import time as clock
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from tools.rules import block_dates_for_event, merge_block_label, plan_block_labels
+
+
+def reference_labels(bookings, kinds):
+    """{date: merged label} built one booking at a time, the way the actions used to."""
+    labels = {}
+    for (s, e), k in zip(bookings, kinds):
+        for d in block_dates_for_event(s, e):
+            labels[d] = merge_block_label(labels.get(d, ""), k)
+    return dict(sorted(labels.items()))
+
+
+def season(n, seed):
+    """n Peerspace-shaped bookings (2-10 h, mostly daytime) over one year."""
+    rnd = random.Random(seed)
+    tz = ZoneInfo("America/New_York")
+    first = datetime(2026, 1, 1, tzinfo=tz)
+    starts, ends, kinds = [], [], []
+    for _ in range(n):
+        s = first + timedelta(days=rnd.randrange(365), hours=rnd.randrange(7, 20))
+        starts.append(s)
+        ends.append(s + timedelta(hours=rnd.randrange(2, 11)))
+        kinds.append(rnd.choice(("EVENT", "PHOTOSHOOT")))
+    return starts, ends, kinds
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("-n", type=int, default=10_000, help="bookings in the timed season")
+    args = ap.parse_args()
+
+    starts, ends, kinds = season(args.n, args.seed)
+    t0 = clock.perf_counter()
+    want = reference_labels(list(zip(starts, ends)), kinds)
+    per_booking = clock.perf_counter() - t0
+    t0 = clock.perf_counter()
+    got = plan_block_labels(starts, ends, kinds)
+    bulk = clock.perf_counter() - t0
+    assert got == want
+    print(f"{args.n} bookings → {len(got)} block dates")
+    print(f"  per booking (block_dates_for_event + merge_block_label)  {per_booking:.3f}s")
+    print(f"  plan_block_labels                                      {bulk:.3f}s  "
+          f"({per_booking / bulk:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
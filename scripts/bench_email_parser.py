@@ -0,0 +1,92 @@
+"""
+Check the booking email parser against the fixture corpus, then measure throughput.
+
+    PYTHONPATH=. python scripts/bench_email_parser.py            # 20k messages
+    PYTHONPATH=. python scripts/bench_email_parser.py -n 100000 --gmail
+
+Each fixture in tests/fixtures/booking_emails.jsonl carries its expected
+parse ("expect": null for mail that must be ignored). Any mismatch fails
+the run before timing. --gmail wraps every fixture in a Gmail
+users.messages.get resource so base64/MIME decoding is timed as well.
+"""
+import argparse
+import base64
+import json
+import os
+import sys
+import time
+
+from calendar_agent.parsing.emails import EmailParser
+
+CORPUS = os.path.join(os.path.dirname(__file__), "..", "tests", "fixtures", "booking_emails.jsonl")
+
+
+def load(path=CORPUS):
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def as_gmail(fx):
+    data = base64.urlsafe_b64encode(fx["body"].encode()).decode().rstrip("=")
+    mime = "text/html" if fx.get("html") else "text/plain"
+    return {"id": fx["name"], "payload": {
+        "mimeType": "multipart/alternative",
+        "headers": [{"name": "Subject", "value": fx["subject"]}, {"name": "From", "value": fx["sender"]}],
+        "parts": [{"mimeType": mime, "body": {"data": data}}]}}
+
+
+def check(parser, fx):
+    """List of mismatches between parse result and fixture expectation."""
+    got = parser.parse_message(as_gmail(fx), fx["labels"])
+    want = fx["expect"]
+    if want is None:
+        return [] if got is None else [f"expected no parse, got {got.action}"]
+    if got is None:
+        return ["not parsed"]
+    errs = [f"{k}: {getattr(got, k)!r} != {want[k]!r}" for k in ("action", "external_id")
+            if getattr(got, k) != want[k]]
+    b = got.booking
+    if want.get("booking") is False:
+        return errs + ([f"unexpected booking {b}"] if b else [])
+    if b is None:
+        return errs + ["no booking"]
+    actual = {"space": b.space, "kind": b.kind, "guest": b.guest_name,
+              "start": b.start.isoformat(), "end": b.end.isoformat()}
+    return errs + [f"{k}: {actual[k]!r} != {want[k]!r}" for k in actual if actual[k] != want[k]]
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("-n", type=int, default=20_000, help="messages to parse")
+    ap.add_argument("--gmail", action="store_true", help="parse Gmail resources (includes decoding)")
+    args = ap.parse_args()
+
+    parser = EmailParser()
+    corpus = load()
+    failed = 0
+    for fx in corpus:
+        errs = check(parser, fx)
+        if errs:
+            failed += 1
+            print(f"FAIL {fx['name']}: " + "; ".join(errs))
+    print(f"corpus: {len(corpus) - failed}/{len(corpus)} fixtures ok")
+    if failed:
+        sys.exit(1)
+
+    items = [corpus[i % len(corpus)] for i in range(args.n)]
+    if args.gmail:
+        msgs = [(as_gmail(fx), fx["labels"]) for fx in items]
+        t0 = time.perf_counter()
+        parsed = [parser.parse_message(m, lbl) for m, lbl in msgs]
+    else:
+        rows = [(fx["subject"], fx["body"], fx["sender"], fx["labels"]) for fx in items]
+        t0 = time.perf_counter()
+        parsed = parser.parse_many(rows)
+    dt = time.perf_counter() - t0
+    hits = sum(1 for p in parsed if p is not None)
+    print(f"parsed {len(items)} messages ({hits} bookings) in {dt:.3f}s "
+          f"= {len(items) / dt:,.0f} msgs/sec")
+
+
+if __name__ == "__main__":
+    main()
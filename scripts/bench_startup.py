@@ -0,0 +1,84 @@
+"""
+Measure cold-start cost: how long a fresh interpreter takes to get through the
+CLI's --help, an action's usage error, the tools.gcal_tool import, and
+building a first Calendar client.
+
+    PYTHONPATH=. python scripts/bench_startup.py                  # this tree
+    PYTHONPATH=. python scripts/bench_startup.py --against HEAD~1 # side by side with a revision
+
+Every case runs in a new `python` process (median of -n runs). --against
+extracts the revision with `git archive` into a temp dir and runs the same
+cases there; cases that revision cannot run show "n/a".
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+CLIENT = ("from calendar_agent.google_api import local_service\n"
+          "local_service('calendar', 'v3', 'http://127.0.0.1:9/')")
+CLIENTS_20 = ("from calendar_agent.google_api import local_service\n"
+              "for _ in range(20): local_service('calendar', 'v3', 'http://127.0.0.1:9/')")
+
+# name -> (argv after `python`, exit codes that count as success)
+CASES = {
+    "python -c pass": (["-c", "pass"], (0,)),  # interpreter floor
+    "calendar-agent --help": (["-m", "calendar_agent.cli", "--help"], (0,)),
+    "action usage error": (["-m", "actions.airbnb_to_disco"], (1,)),
+    "import tools.gcal_tool": (["-c", "import tools.gcal_tool"], (0,)),
+    "import actions.reconcile": (["-c", "import actions.reconcile"], (0,)),
+    "first Calendar client": (["-c", CLIENT], (0,)),
+    "20 Calendar clients": (["-c", CLIENTS_20], (0,)),
+}
+
+
+def time_case(root, argv, ok, runs):
+    """Median wall seconds of `python <argv>` in root, or None if it does not run there."""
+    env = dict(os.environ, PYTHONPATH=root)
+    samples = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        p = subprocess.run([sys.executable, *argv], cwd=root, env=env, capture_output=True)
+        samples.append(time.perf_counter() - t0)
+        if p.returncode not in ok:
+            return None
+    return statistics.median(samples)
+
+
+def checkout(rev, into):
+    archive = subprocess.run(["git", "archive", rev], cwd=ROOT, capture_output=True, check=True).stdout
+    subprocess.run(["tar", "-x", "-C", into], input=archive, check=True)
+    return into
+
+
+def fmt(t):
+    return f"{t * 1000:8.0f}ms" if t is not None else "     n/a"
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("-n", type=int, default=7, help="runs per case (median is reported)")
+    ap.add_argument("--against", metavar="REV", help="also time this git revision")
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        roots = [("this tree", ROOT)]
+        if args.against:
+            roots.insert(0, (args.against, checkout(args.against, tmp)))
+        print(f"{'case':<26}" + "".join(f"{label:>12}" for label, _ in roots)
+              + ("     speedup" if args.against else ""))
+        for name, (argv, ok) in CASES.items():
+            times = [time_case(root, argv, ok, args.n) for _, root in roots]
+            line = f"{name:<26}" + "".join(f"{fmt(t):>12}" for t in times)
+            if args.against and None not in times:
+                line += f"{times[0] / times[1]:>11.2f}x"
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
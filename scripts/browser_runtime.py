@@ -0,0 +1,252 @@
+"""
+Shared Playwright runtime for the Airbnb scripts.
+
+Starting Chromium and loading playwright/.auth/airbnb_state.json is most of
+what each script used to spend before touching the page. This module keeps
+one warm headless browser around and hands out the authenticated context:
+
+    python scripts/browser_runtime.py serve     # daemon: headless Chromium on a CDP port
+    python scripts/browser_runtime.py bench     # cold launch vs warm attach timings
+
+The scripts import it as scripts.browser_runtime and run from the repository
+root with PYTHONPATH=. like the other scripts. They open a session; it
+attaches over CDP when the daemon is up (the shared default context already
+holds the Airbnb cookies) and otherwise launches a private headless browser,
+exactly like before:
+
+    with browser_session() as s:
+        page = s.new_page()
+    async with async_browser_session() as s:
+        page = await s.new_page()
+
+Images, fonts, media and analytics/tracking requests are aborted through
+request routing unless block_assets=False.
+"""
+import json, os, socket, sys, time
+from contextlib import asynccontextmanager, contextmanager
+from pathlib import Path
+from urllib.parse import urlparse
+
+AUTH_PATH = "playwright/.auth/airbnb_state.json"
+CDP_PORT = int(os.environ.get("AIRBNB_BROWSER_CDP_PORT", "9222"))
+CDP_URL = f"http://127.0.0.1:{CDP_PORT}"
+AUTH_ORIGIN = "https://www.airbnb.com"
+PROFILE_DIR = os.path.join(os.environ.get("CALENDAR_AGENT_STATE_DIR", ".calendar_agent"), "chromium-profile")
+
+BLOCKED_TYPES = {"image", "font", "media"}
+BLOCKED_HOSTS = (
+    "google-analytics.com", "googletagmanager.com", "doubleclick.net", "facebook.net",
+    "facebook.com/tr", "hotjar.com", "segment.io", "sentry.io", "datadoghq",
+    "branch.io", "bing.com", "tiktok.com", "pinimg.com", "amplitude.com",
+)
+ANALYTICS_PATHS = ("/tracking/", "/logging/", "/api/v2/client_logs", "/jitney")
+
+
+def should_block(resource_type, url):
+    if resource_type in BLOCKED_TYPES:
+        return True
+    u = urlparse(url)
+    target = u.netloc + u.path
+    return any(h in target for h in BLOCKED_HOSTS) or any(p in u.path for p in ANALYTICS_PATHS)
+
+
+def daemon_running(port=CDP_PORT):
+    try:
+        with socket.create_connection(("127.0.0.1", port), timeout=0.2):
+            return True
+    except OSError:
+        return False
+
+
+def _auth_file():
+    return AUTH_PATH if Path(AUTH_PATH).exists() else None
+
+
+def _saved_cookies():
+    path = _auth_file()
+    if not path:
+        return []
+    with open(path) as f:
+        return json.load(f).get("cookies", [])
+
+
+# ---------------- sync API ----------------
+class Session:
+    def __init__(self, browser, context, attached, block_assets=True):
+        self.browser = browser
+        self.context = context
+        self.attached = attached  # True: shared daemon browser, don't close it
+        self.block_assets = block_assets
+        self._pages = []
+
+    def new_page(self):
+        page = self.context.new_page()
+        self._pages.append(page)
+        return page
+
+
+def _sync_route(route):
+    req = route.request
+    if should_block(req.resource_type, req.url):
+        route.abort()
+    else:
+        route.continue_()
+
+
+@contextmanager
+def browser_session(headless=True, block_assets=True, auth=True, attach=True):
+    from playwright.sync_api import sync_playwright
+    with sync_playwright() as p:
+        if attach and daemon_running():
+            browser = p.chromium.connect_over_cdp(CDP_URL)
+            ctx = browser.contexts[0] if browser.contexts else browser.new_context()
+            if auth and not ctx.cookies(AUTH_ORIGIN):
+                ctx.add_cookies(_saved_cookies())
+            attached = True
+        else:
+            browser = p.chromium.launch(headless=headless)
+            ctx = browser.new_context(storage_state=_auth_file() if auth else None)
+            attached = False
+        if block_assets:
+            ctx.route("**/*", _sync_route)
+        s = Session(browser, ctx, attached, block_assets)
+        try:
+            yield s
+        finally:
+            if auth and _auth_file():
+                ctx.storage_state(path=AUTH_PATH)
+            if attached:
+                for page in s._pages:
+                    page.close()
+                if block_assets:
+                    ctx.unroute("**/*", _sync_route)
+            else:
+                browser.close()
+
+
+# ---------------- async API ----------------
+class AsyncSession(Session):
+    async def new_page(self):
+        page = await self.context.new_page()
+        self._pages.append(page)
+        return page
+
+    async def new_context(self):
+        """Extra isolated context carrying the same login (parallel workers)."""
+        ctx = await self.browser.new_context(storage_state=_auth_file())
+        if self.block_assets:
+            await ctx.route("**/*", _async_route)
+        return ctx
+
+
+async def _async_route(route):
+    req = route.request
+    if should_block(req.resource_type, req.url):
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+@asynccontextmanager
+async def async_browser_session(headless=True, block_assets=True, auth=True, attach=True):
+    from playwright.async_api import async_playwright
+    async with async_playwright() as p:
+        if attach and daemon_running():
+            browser = await p.chromium.connect_over_cdp(CDP_URL)
+            ctx = browser.contexts[0] if browser.contexts else await browser.new_context()
+            if auth and not await ctx.cookies(AUTH_ORIGIN):
+                await ctx.add_cookies(_saved_cookies())
+            attached = True
+        else:
+            browser = await p.chromium.launch(headless=headless)
+            ctx = await browser.new_context(storage_state=_auth_file() if auth else None)
+            attached = False
+        if block_assets:
+            await ctx.route("**/*", _async_route)
+        s = AsyncSession(browser, ctx, attached, block_assets)
+        try:
+            yield s
+        finally:
+            if auth and _auth_file():
+                await ctx.storage_state(path=AUTH_PATH)
+            if attached:
+                for page in s._pages:
+                    await page.close()
+                if block_assets:
+                    await ctx.unroute("**/*", _async_route)
+            else:
+                await browser.close()
+
+
+def share_login():
+    """Push freshly saved login cookies into the running daemon, if any."""
+    if not daemon_running():
+        return
+    from playwright.sync_api import sync_playwright
+    with sync_playwright() as p:
+        browser = p.chromium.connect_over_cdp(CDP_URL)
+        ctx = browser.contexts[0] if browser.contexts else browser.new_context()
+        ctx.add_cookies(_saved_cookies())
+
+
+# ---------------- daemon + timings ----------------
+def serve():
+    from playwright.sync_api import sync_playwright
+    if daemon_running():
+        print(f"browser daemon already listening on {CDP_URL}")
+        return
+    with sync_playwright() as p:
+        # a persistent profile's context is the browser's default context, which
+        # is what CDP clients get as contexts[0]; it also survives daemon restarts
+        ctx = p.chromium.launch_persistent_context(
+            PROFILE_DIR, headless=True, args=[f"--remote-debugging-port={CDP_PORT}"])
+        ctx.add_cookies(_saved_cookies())
+        print(f"headless Chromium on {CDP_URL} (Ctrl+C to stop)")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
+        ctx.close()
+
+
+def bench(rounds=3):
+    from playwright.sync_api import sync_playwright
+
+    def timed(fn):
+        t0 = time.perf_counter()
+        fn()
+        return time.perf_counter() - t0
+
+    with sync_playwright() as p:
+        def cold():
+            b = p.chromium.launch(headless=True)
+            b.new_context(storage_state=_auth_file()).new_page().goto("about:blank")
+            b.close()
+
+        def warm():
+            b = p.chromium.connect_over_cdp(CDP_URL)
+            ctx = b.contexts[0] if b.contexts else b.new_context()
+            page = ctx.new_page()
+            page.goto("about:blank")
+            page.close()
+
+        cold_t = [timed(cold) for _ in range(rounds)]
+        print(f"cold launch + context: best {min(cold_t):.2f}s, mean {sum(cold_t) / rounds:.2f}s")
+        if not daemon_running():
+            print("warm attach: daemon not running (start `python scripts/browser_runtime.py serve`)")
+            return
+        warm_t = [timed(warm) for _ in range(rounds)]
+        print(f"warm CDP attach + page: best {min(warm_t):.2f}s, mean {sum(warm_t) / rounds:.2f}s")
+        print(f"saving per script start: ~{min(cold_t) - min(warm_t):.2f}s")
+
+
+if __name__ == "__main__":
+    cmd = sys.argv[1] if len(sys.argv) > 1 else ""
+    if cmd == "serve":
+        serve()
+    elif cmd == "bench":
+        bench()
+    else:
+        print("Usage: python scripts/browser_runtime.py serve|bench")
+        sys.exit(1)
@@ -0,0 +1,362 @@
+"""
+Minimal local stand-in for the Google Calendar v3 API, enough for tools.gcal_tool
+and the actions.
+
+Implements calendarList.list, events list/get/insert/patch/delete and batch
+requests. events.list honours privateExtendedProperty (ANDed), timeMin/timeMax,
+q, orderBy=startTime, maxResults/pageToken paging, showDeleted and syncToken
+(deleted events come back as status "cancelled"; tokens older than
+`sync_floor` answer 410 like an expired real one). Every HTTP round trip can
+be slowed down by `latency` seconds.
+
+    PYTHONPATH=. python scripts/fake_calendar.py --port 8086 --seed 1000 --latency 0.05
+    CALENDAR_API_ENDPOINT=http://127.0.0.1:8086/ python -m actions.block_manual EVENT 2026-03-10
+
+From Python:
+
+    cal = FakeCalendar(); cal.seed_bookings(10_000)
+    server = cal.serve(0)   # background thread; server.server_address[1] is the port
+"""
+import argparse
+import json
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+from zoneinfo import ZoneInfo
+
+from calendar_agent.config import settings
+
+PREFIX = "/calendar/v3/"
+CALENDARS = ("Disco Bookings", "Upstairs Bookings", "Block on Airbnb")
+MAX_PAGE = 2500
+
+
+def _error(status, message, reason=""):
+    err = {"code": status, "message": message}
+    if reason:
+        err["errors"] = [{"reason": reason, "message": message}]
+    return status, {"error": err}
+
+
+class FakeCalendar:
+    def __init__(self, calendars=CALENDARS, latency=0.0, tz=None):
+        self.lock = threading.Lock()
+        self.tz = ZoneInfo(tz or settings.timezone)
+        self.latency = latency
+        self.calendars = {}    # id -> summary
+        self.events = {}       # cal id -> {event id: event}
+        self.meta = {}         # cal id -> {event id: [seq, start ts, end ts]}
+        self.index = {}        # cal id -> {(key, value): {event ids}}
+        self.seq = 0
+        self.sync_floor = 0    # syncToken below this → 410
+        self.requests = 0      # HTTP round trips
+        self.calls = Counter() # API operations, batched ones included
+        for name in calendars:
+            self.add_calendar(name)
+
+    # ---------------- calendars ----------------
+    def add_calendar(self, summary, cal_id=None):
+        cal_id = cal_id or f"{summary.lower().replace(' ', '_')}@group.calendar.google.com"
+        self.calendars[cal_id] = summary
+        self.events[cal_id], self.meta[cal_id], self.index[cal_id] = {}, {}, {}
+        return cal_id
+
+    def cal_id(self, summary):
+        return next(i for i, s in self.calendars.items() if s == summary)
+
+    def live(self, cal_id=None):
+        """Number of non-cancelled events (in one calendar, or all)."""
+        ids = [cal_id] if cal_id else list(self.events)
+        return sum(1 for c in ids for e in self.events[c].values() if e.get("status") != "cancelled")
+
+    def reset_counters(self):
+        self.requests = 0
+        self.calls = Counter()
+
+    def expire_sync_tokens(self):
+        self.sync_floor = self.seq + 1
+
+    # ---------------- storage ----------------
+    def _ts(self, when):
+        if "dateTime" in when:
+            return datetime.fromisoformat(when["dateTime"].replace("Z", "+00:00")).timestamp()
+        if "date" in when:
+            return datetime.fromisoformat(when["date"]).replace(tzinfo=self.tz).timestamp()
+        return 0.0
+
+    def _private(self, event):
+        return ((event.get("extendedProperties") or {}).get("private") or {}).items()
+
+    def _store(self, cal_id, event):
+        eid = event["id"]
+        old = self.events[cal_id].get(eid)
+        if old is not None:
+            for kv in self._private(old):
+                self.index[cal_id].get(kv, set()).discard(eid)
+        self.seq += 1
+        self.events[cal_id][eid] = event
+        self.meta[cal_id][eid] = [self.seq, self._ts(event.get("start", {})), self._ts(event.get("end", {}))]
+        if event.get("status") != "cancelled":
+            for kv in self._private(event):
+                self.index[cal_id].setdefault(kv, set()).add(eid)
+        return event
+
+    def _stamp(self, event):
+        now = datetime.utcnow().isoformat(timespec="milliseconds") + "Z"
+        event.setdefault("created", now)
+        event["updated"] = now
+        event["etag"] = f'"{self.seq + 1}"'
+        event.setdefault("status", "confirmed")
+        event["sequence"] = event.get("sequence", -1) + 1
+        return event
+
+    def seed(self, cal_id, events):
+        """Bulk-load events (no request counting, no latency)."""
+        with self.lock:
+            for e in events:
+                e = dict(e)
+                e.setdefault("id", uuid.uuid4().hex)
+                self._store(cal_id, self._stamp(e))
+
+    def seed_bookings(self, n, first="2026-01-01", days=730):
+        """
+        ~n events spread over `days`, shaped like the agent's own:
+        per unit an Airbnb Disco booking (reservation, check-in buffer, turnover),
+        an Upstairs reservation, and a Peerspace buffer on Disco + its all-day block.
+        Ids: SEED-D<i>, SEED-U<i>, SEED-P<i>; guests "Guest <i:05d>"; unit i checks
+        in at self.seed_starts[i].
+        """
+        from actions.airbnb_to_disco import build_events
+        from actions.airbnb_to_upstairs import build_event
+        units = max(1, -(-n // 6))
+        step = timedelta(days=days) / units
+        base = datetime.fromisoformat(first).replace(hour=16, tzinfo=self.tz)
+        disco, upstairs, block = [], [], []
+        self.seed_starts = [base + step * i for i in range(units)]
+
+        def keyed(body, key, value):  # as upsert_events stamps it
+            body["extendedProperties"]["private"][key] = value
+            return body
+
+        for i, ci in enumerate(self.seed_starts):
+            co = ci + timedelta(days=2, hours=-5)
+            guest = f"Guest {i:05d}"
+            disco.extend(keyed(*item) for item in build_events(f"SEED-D{i}", guest, ci.isoformat(), co.isoformat()))
+            upstairs.append(keyed(*build_event(f"SEED-U{i}", guest, ci.isoformat(), co.isoformat())))
+            bk = f"ps|SEED-P{i}|{ci.date()}"
+            disco.append({"summary": "EVENT", "location": "1-hr buffer",
+                          "start": {"dateTime": (ci - timedelta(hours=1)).isoformat()},
+                          "end": {"dateTime": (ci + timedelta(hours=6)).isoformat()},
+                          "extendedProperties": {"private": {"source": "agent", "type": "peerspace",
+                                                             "booking_key": bk}}})
+            block.append({"summary": "EVENT", "start": {"date": ci.date().isoformat()},
+                          "end": {"date": (ci.date() + timedelta(days=1)).isoformat()},
+                          "extendedProperties": {"private": {
+                              "source": "agent", "type": "block", "booking_key": bk,
+                              "ps_block_key": f"{bk}|{ci.date()}", "ps_block_key_parent": bk}}})
+        self.seed(self.cal_id("Disco Bookings"), disco)
+        self.seed(self.cal_id("Upstairs Bookings"), upstairs)
+        self.seed(self.cal_id("Block on Airbnb"), block)
+        return units
+
+    # ---------------- API ----------------
+    def handle(self, method, url, body=b""):
+        """-> (status, json body or None) for one API call."""
+        u = urlparse(url)
+        q = parse_qs(u.query)
+        path = u.path[len(PREFIX):] if u.path.startswith(PREFIX) else None
+        parts = [unquote(p) for p in path.split("/")] if path else []
+        data = json.loads(body) if body else {}
+        with self.lock:
+            if parts[:3] == ["users", "me", "calendarList"] and method == "GET":
+                self.calls["calendarList.list"] += 1
+                return 200, {"items": [{"id": i, "summary": s, "accessRole": "owner"}
+                                       for i, s in self.calendars.items()]}
+            if len(parts) >= 3 and parts[0] == "calendars" and parts[2] == "events":
+                cal_id = parts[1]
+                if cal_id not in self.events:
+                    return _error(404, "Not Found", "notFound")
+                if len(parts) == 3 and method == "GET":
+                    self.calls["events.list"] += 1
+                    return self._list(cal_id, q)
+                if len(parts) == 3 and method == "POST":
+                    self.calls["events.insert"] += 1
+                    return self._insert(cal_id, data)
+                if len(parts) == 4:
+                    op = {"GET": "get", "PATCH": "patch", "DELETE": "delete"}.get(method)
+                    if op:
+                        self.calls[f"events.{op}"] += 1
+                        return getattr(self, f"_{op}")(cal_id, parts[3], data)
+        return _error(404, f"no route {method} {u.path}")
+
+    def _list(self, cal_id, q):
+        one = {k: v[-1] for k, v in q.items()}
+        size = min(int(one.get("maxResults", 250)), MAX_PAGE)
+        start = int(one.get("pageToken", 0))
+        meta = self.meta[cal_id]
+        if "syncToken" in one:
+            token = int(one["syncToken"])
+            if token < self.sync_floor:
+                return _error(410, "Sync token is no longer valid, a full sync is required.", "fullSyncRequired")
+            ids = sorted((eid for eid, m in meta.items() if m[0] > token), key=lambda eid: meta[eid][0])
+        else:
+            props = [tuple(p.split("=", 1)) for p in q.get("privateExtendedProperty", [])]
+            if props:
+                sets = [self.index[cal_id].get(kv, set()) for kv in props]
+                ids = sorted(set.intersection(*sets), key=lambda eid: meta[eid][0])
+            else:
+                ids = list(self.events[cal_id])
+            if one.get("showDeleted") != "true" and not props:
+                ids = [eid for eid in ids if self.events[cal_id][eid].get("status") != "cancelled"]
+            if "timeMin" in one:
+                t = datetime.fromisoformat(one["timeMin"].replace("Z", "+00:00")).timestamp()
+                ids = [eid for eid in ids if meta[eid][2] > t]
+            if "timeMax" in one:
+                t = datetime.fromisoformat(one["timeMax"].replace("Z", "+00:00")).timestamp()
+                ids = [eid for eid in ids if meta[eid][1] < t]
+            if "q" in one:
+                needle = one["q"].lower()
+                ids = [eid for eid in ids if needle in json.dumps(self.events[cal_id][eid]).lower()]
+            if one.get("orderBy") == "startTime":
+                ids.sort(key=lambda eid: meta[eid][1])
+        page = ids[start:start + size]
+        out = {"kind": "calendar#events", "summary": self.calendars[cal_id],
+               "items": [self.events[cal_id][eid] for eid in page]}
+        if start + size < len(ids):
+            out["nextPageToken"] = str(start + size)
+        else:
+            out["nextSyncToken"] = str(self.seq)
+        return 200, out
+
+    def _insert(self, cal_id, body):
+        body = dict(body)
+        body.setdefault("id", uuid.uuid4().hex)
+        if body["id"] in self.events[cal_id]:
+            return _error(409, "The requested identifier already exists.", "duplicate")
+        return 200, self._store(cal_id, self._stamp(body))
+
+    def _get(self, cal_id, eid, _body):
+        e = self.events[cal_id].get(eid)
+        return (200, e) if e else _error(404, "Not Found", "notFound")
+
+    def _patch(self, cal_id, eid, body):
+        e = self.events[cal_id].get(eid)
+        if not e or e.get("status") == "cancelled":
+            return _error(404, "Not Found", "notFound")
+        e = json.loads(json.dumps(e))
+        for k, v in body.items():
+            if k == "extendedProperties" and isinstance(v, dict):
+                ext = e.setdefault("extendedProperties", {})
+                for scope, props in v.items():
+                    ext.setdefault(scope, {}).update(props or {})
+            else:
+                e[k] = v  # start/end and plain fields are replaced whole
+        return 200, self._store(cal_id, self._stamp(e))
+
+    def _delete(self, cal_id, eid, _body):
+        e = self.events[cal_id].get(eid)
+        if not e:
+            return _error(404, "Not Found", "notFound")
+        if e.get("status") == "cancelled":
+            return _error(410, "Resource has been deleted", "deleted")
+        self._store(cal_id, {"id": eid, "status": "cancelled", "start": e.get("start", {}),
+                             "end": e.get("end", {})})
+        return 204, None
+
+    # ---------------- HTTP ----------------
+    def serve(self, port=0):
+        cal = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True  # headers and body go out as separate writes
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status, body, ctype="application/json"):
+                data = body if isinstance(body, bytes) else (json.dumps(body).encode() if body is not None else b"")
+                self.send_response(status)
+                self.send_header("Content-Type", ctype)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _any(self, method):
+                raw = self.rfile.read(int(self.headers.get("Content-Length", 0) or 0))
+                with cal.lock:
+                    cal.requests += 1
+                if cal.latency:
+                    time.sleep(cal.latency)
+                if method == "POST" and urlparse(self.path).path.startswith("/batch"):
+                    with cal.lock:
+                        cal.calls["batch"] += 1
+                    boundary = self.headers["Content-Type"].split("boundary=", 1)[1].strip('"')
+                    return self._send(200, *_batch(cal, raw.decode(), boundary))
+                self._send(*cal.handle(method, self.path, raw))
+
+            def do_GET(self):
+                self._any("GET")
+
+            def do_POST(self):
+                self._any("POST")
+
+            def do_PATCH(self):
+                self._any("PATCH")
+
+            def do_PUT(self):
+                self._any("PUT")
+
+            def do_DELETE(self):
+                self._any("DELETE")
+
+        server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+
+def _batch(cal, raw, boundary):
+    """Answer a multipart/mixed batch request part by part."""
+    out, reply = [], "batch_fake_boundary"
+    for part in raw.replace("\r\n", "\n").split(f"--{boundary}")[1:]:
+        if part.startswith("--"):
+            break
+        head, _, inner = part.strip("\n").partition("\n\n")
+        cid = next((l.split(":", 1)[1].strip() for l in head.splitlines()
+                    if l.lower().startswith("content-id:")), "<0>")
+        request, _, body = inner.partition("\n\n")
+        method, url = request.splitlines()[0].split(" ")[:2]
+        status, data = cal.handle(method, url, body.strip().encode())
+        text = json.dumps(data) if data is not None else ""
+        out.append(f"--{reply}\r\nContent-Type: application/http\r\n"
+                   f"Content-ID: <response-{cid[1:-1]}>\r\n\r\n"
+                   f"HTTP/1.1 {status} X\r\nContent-Type: application/json\r\n"
+                   f"Content-Length: {len(text)}\r\n\r\n{text}\r\n")
+    body = "".join(out) + f"--{reply}--\r\n"
+    return body.encode(), f"multipart/mixed; boundary={reply}"
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--port", type=int, default=8086)
+    ap.add_argument("--seed", type=int, default=0, help="seed about N agent-shaped events (see seed_bookings)")
+    ap.add_argument("--latency", type=float, default=0.0, help="seconds added to every HTTP round trip")
+    args = ap.parse_args()
+    cal = FakeCalendar(latency=args.latency)
+    if args.seed:
+        cal.seed_bookings(args.seed)
+    server = cal.serve(args.port)
+    print(f"fake Calendar on http://127.0.0.1:{server.server_address[1]}/ ({cal.live()} events)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
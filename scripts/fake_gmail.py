@@ -0,0 +1,218 @@
+"""
+Minimal local stand-in for the Gmail v1 API, enough for calendar_agent.sync.
+
+Implements labels.list, getProfile, history.list (messageAdded only),
+messages.list (labelIds + maxResults paging), messages.get, and batch
+requests. History older than `history_floor` answers 404 like real Gmail
+does once a checkpoint expires, and `throttle(mid, 429, ...)` makes
+messages.get of one message answer those statuses first.
+
+    PYTHONPATH=. python scripts/fake_gmail.py --port 8085 --seed 20
+    GMAIL_API_ENDPOINT=http://127.0.0.1:8085/ python -m calendar_agent.cli gmail
+
+From Python:
+
+    box = FakeGmail(); box.deliver("Peerspace/Event Bookings", "Subject", "body")
+    server = box.serve(0)   # background thread; server.server_address[1] is the port
+"""
+import argparse
+import base64
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from calendar_agent.sync.gmail_history import WATCH_LABELS
+
+PREFIX = "/gmail/v1/users/me/"
+
+
+class FakeGmail:
+    def __init__(self, labels=WATCH_LABELS):
+        self.lock = threading.Lock()
+        self.labels = {f"Label_{i}": name for i, name in enumerate(labels, 1)}
+        self.labels["INBOX"] = "INBOX"
+        self.messages = {}      # id -> message resource
+        self.history = []       # (history id, message id)
+        self.history_id = 1000
+        self.history_floor = 0  # startHistoryId below this → 404
+        self.requests = 0
+        self.batches = 0
+        self.gets = {}          # message id -> messages.get calls
+        self.failures = {}      # message id -> statuses to answer before the message
+        self.deleted = {}       # message id -> message resource, still in history
+
+    # ---------------- mailbox ----------------
+    def label_id(self, name):
+        return next(i for i, n in self.labels.items() if n == name)
+
+    def deliver(self, label, subject, body="", sender="noreply@example.com"):
+        with self.lock:
+            self.history_id += 1
+            mid = f"{self.history_id:016x}"
+            self.messages[mid] = {
+                "id": mid, "threadId": mid, "historyId": str(self.history_id),
+                "labelIds": ["INBOX", self.label_id(label)],
+                "internalDate": str(int(time.time() * 1000) + self.history_id),
+                "snippet": body[:100],
+                "payload": {
+                    "mimeType": "text/plain",
+                    "headers": [{"name": "Subject", "value": subject}, {"name": "From", "value": sender}],
+                    "body": {"data": base64.urlsafe_b64encode(body.encode()).decode()},
+                },
+            }
+            self.history.append((self.history_id, mid))
+            return mid
+
+    def delete(self, mid):
+        """Remove a message after it was recorded in history (messages.get → 404)."""
+        with self.lock:
+            self.deleted[mid] = self.messages.pop(mid)
+
+    def throttle(self, mid, *statuses):
+        """The next len(statuses) messages.get of `mid` answer these statuses (429, 403, 5xx)."""
+        self.failures.setdefault(mid, []).extend(statuses)
+
+    def expire_history(self):
+        """Make every existing checkpoint too old (the next poll gets a 404)."""
+        self.history_floor = self.history_id + 1
+
+    # ---------------- API ----------------
+    def handle(self, method, url):
+        """-> (status, json body) for one API call."""
+        self.requests += 1
+        u = urlparse(url)
+        q = {k: v if len(v) > 1 else v[0] for k, v in parse_qs(u.query).items()}
+        path = u.path[len(PREFIX):] if u.path.startswith(PREFIX) else None
+        with self.lock:
+            if path == "labels":
+                return 200, {"labels": [{"id": i, "name": n} for i, n in self.labels.items()]}
+            if path == "profile":
+                return 200, {"emailAddress": "me@example.com", "historyId": str(self.history_id)}
+            if path == "history":
+                return self._history(q)
+            if path == "messages":
+                return self._list(q)
+            if path and path.startswith("messages/"):
+                mid = path.split("/", 1)[1]
+                self.gets[mid] = self.gets.get(mid, 0) + 1
+                if self.failures.get(mid):
+                    return _error(self.failures[mid].pop(0))
+                m = self.messages.get(mid)
+                return (200, m) if m else (404, {"error": {"code": 404, "message": "Not Found"}})
+        return 404, {"error": {"code": 404, "message": f"no route {method} {u.path}"}}
+
+    def _page(self, items, q):
+        size = int(q.get("maxResults", 100))
+        start = int(q.get("pageToken", 0))
+        nxt = start + size
+        return items[start:nxt], (str(nxt) if nxt < len(items) else None)
+
+    def _history(self, q):
+        start = int(q["startHistoryId"])
+        if start < self.history_floor:
+            return 404, {"error": {"code": 404, "message": "Requested entity was not found."}}
+        rows = [(h, mid) for h, mid in self.history if h > start]
+        page, nxt = self._page(rows, q)
+        out = {"historyId": str(self.history_id)}
+        if page:
+            out["history"] = [{"id": str(h), "messagesAdded": [{"message": {
+                "id": mid, "threadId": mid, "labelIds": (self.messages.get(mid) or self.deleted[mid])["labelIds"]}}]}
+                for h, mid in page]
+        if nxt:
+            out["nextPageToken"] = nxt
+        return 200, out
+
+    def _list(self, q):
+        want = q.get("labelIds")
+        want = [want] if isinstance(want, str) else (want or [])
+        rows = [m for m in sorted(self.messages.values(), key=lambda m: -int(m["internalDate"]))
+                if all(l in m["labelIds"] for l in want)]
+        page, nxt = self._page(rows, q)
+        out = {"messages": [{"id": m["id"], "threadId": m["threadId"]} for m in page],
+               "resultSizeEstimate": len(rows)}
+        if nxt:
+            out["nextPageToken"] = nxt
+        return 200, out
+
+    # ---------------- HTTP ----------------
+    def serve(self, port=0):
+        box = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True  # headers and body go out as separate writes
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status, body, ctype="application/json"):
+                data = body if isinstance(body, bytes) else json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", ctype)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                self._send(*box.handle("GET", self.path))
+
+            def do_POST(self):
+                raw = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                if urlparse(self.path).path != "/batch":
+                    return self._send(404, {"error": {"code": 404, "message": "no route"}})
+                box.batches += 1
+                boundary = self.headers["Content-Type"].split("boundary=", 1)[1].strip('"')
+                self._send(200, *_batch(box, raw.decode(), boundary))
+
+        server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+
+def _error(status):
+    reason = {429: "rateLimitExceeded", 403: "userRateLimitExceeded"}.get(status, "backendError")
+    return status, {"error": {"code": status, "message": reason,
+                              "errors": [{"reason": reason, "domain": "usageLimits"}]}}
+
+
+def _batch(box, raw, boundary):
+    """Answer a multipart/mixed batch request part by part."""
+    out, reply = [], "batch_fake_boundary"
+    for part in raw.replace("\r\n", "\n").split(f"--{boundary}")[1:]:
+        if part.startswith("--"):
+            break
+        head, _, inner = part.strip("\n").partition("\n\n")
+        cid = next((l.split(":", 1)[1].strip() for l in head.splitlines()
+                    if l.lower().startswith("content-id:")), "<0>")
+        method, url = inner.splitlines()[0].split(" ")[:2]
+        status, body = box.handle(method, url)
+        data = json.dumps(body)
+        out.append(f"--{reply}\r\nContent-Type: application/http\r\n"
+                   f"Content-ID: <response-{cid[1:-1]}>\r\n\r\n"
+                   f"HTTP/1.1 {status} X\r\nContent-Type: application/json\r\n"
+                   f"Content-Length: {len(data)}\r\n\r\n{data}\r\n")
+    body = "".join(out) + f"--{reply}--\r\n"
+    return body.encode(), f"multipart/mixed; boundary={reply}"
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--port", type=int, default=8085)
+    ap.add_argument("--seed", type=int, default=0, help="deliver N messages spread over the watched labels")
+    args = ap.parse_args()
+    box = FakeGmail()
+    for i in range(args.seed):
+        label = WATCH_LABELS[i % len(WATCH_LABELS)]
+        box.deliver(label, f"{label} #{i}", f"fake message {i}")
+    server = box.serve(args.port)
+    print(f"fake Gmail on http://127.0.0.1:{server.server_address[1]}/ ({len(box.messages)} messages)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
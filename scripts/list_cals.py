@@ -1,9 +1,5 @@
 # list_cals.py
-import os
-from googleapiclient.discovery import build
-from google_auth_oauthlib.flow import InstalledAppFlow
-from google.oauth2.credentials import Credentials
-from google.auth.transport.requests import Request
+from calendar_agent.google_api import get_service, format_http_stats
 
 # Use calendar-specific creds/token
 SCOPES = ["https://www.googleapis.com/auth/calendar.readonly"]
@@ -11,20 +7,17 @@ CREDS_PATH = "credentials_calendar.json"
 TOKEN_PATH = "token_calendar.json"
 
 def svc():
-    creds = None
-    if os.path.exists(TOKEN_PATH):
-        creds = Credentials.from_authorized_user_file(TOKEN_PATH, SCOPES)
-    if not creds or not creds.valid:
-        if creds and creds.expired and creds.refresh_token:
-            creds.refresh(Request())
-        else:
-            flow = InstalledAppFlow.from_client_secrets_file(CREDS_PATH, SCOPES)
-            creds = flow.run_local_server(port=0)
-        with open(TOKEN_PATH, "w") as f:
-            f.write(creds.to_json())
-    return build("calendar", "v3", credentials=creds, cache_discovery=False)
+    return get_service("calendar", "v3", scopes=SCOPES,
+                       token_path=TOKEN_PATH, credentials_path=CREDS_PATH)
 
 if __name__ == "__main__":
     s = svc()
-    for it in s.calendarList().list().execute().get("items", []):
-        print(it["summary"])
\ No newline at end of file
+    page = None
+    while True:
+        resp = s.calendarList().list(pageToken=page).execute()
+        for it in resp.get("items", []):
+            print(it["summary"])
+        page = resp.get("nextPageToken")
+        if not page:
+            break
+    print(format_http_stats())
\ No newline at end of file
@@ -2,59 +2,20 @@
 import sys
 from datetime import timedelta as TD
 from dateutil import parser as dtp
-from collections import Counter
 
+from calendar_agent.calendar.batch import raise_for_errors
 from tools.gcal_tool import (
-    get_cal_id, update_event_summary,
-    find_all_day_event_on_date, delete_events_by_private
+    get_cal_id, all_day_map, new_batch, delete_events_by_private
 )
-from tools.rules import block_dates_for_event
+from tools.rules import block_dates_for_event, remove_from_block_label
 
 CAL_DISCO = "Disco Bookings"
 CAL_BLOCK = "Block on Airbnb"
 
-def _normalize_tokens(summary: str):
-    s = (summary or "").upper().replace("×","X")
-    parts = [p.strip() for p in s.split("+") if p.strip()]
-    tokens = []
-    for p in parts:
-        bits = p.split()
-        if len(bits) >= 2 and bits[0].endswith("X"):
-            try:
-                n = int(bits[0].replace("X",""))
-                word = " ".join(bits[1:])
-                if word.endswith("S"): word = word[:-1]
-                tokens.extend([word] * n)
-            except Exception:
-                tokens.append(p.rstrip("S"))
-        else:
-            w = p
-            if w.endswith("S"): w = w[:-1]
-            tokens.append(w)
-    return tokens
-
-def _format_tokens(tokens):
-    c = Counter(tokens)
-    parts = []
-    for word in sorted(c):
-        if c[word] == 1:
-            parts.append(word)
-        else:
-            parts.append(f"{c[word]}X {word}S")
-    return " + ".join(parts)
-
-def _remove_one(tokens, kind):
-    k = kind.upper()
-    if k.endswith("S"): k = k[:-1]
-    try:
-        tokens.remove(k)
-    except ValueError:
-        pass
-    return tokens
-
 def run(booking_id: str, kind: str, start_iso: str, end_iso: str):
     start = dtp.isoparse(start_iso)
     end   = dtp.isoparse(end_iso)
+    block_id = get_cal_id(CAL_BLOCK)
 
     # 1) Delete Disco buffer(s) for this Peerspace booking
     booking_key = f"ps|{booking_id}|{start.date()}"
@@ -62,25 +23,31 @@ def run(booking_id: str, kind: str, start_iso: str, end_iso: str):
     print(f"[Disco] Buffers deleted: {deleted}")
 
     # 2) Revert Airbnb block titles for each affected date
-    for d in sorted(block_dates_for_event(start, end)):
-        ev = find_all_day_event_on_date(get_cal_id(CAL_BLOCK), d)
-        if not ev:
+    #    (one range fetch for all dates, one batch for all writes)
+    dates = sorted(block_dates_for_event(start, end))
+    day_map = all_day_map(block_id, dates[0], dates[-1]) if dates else {}
+    batch = new_batch()
+    notes = []
+    for d in dates:
+        evs = day_map.get(d)
+        if not evs:
             print(f"[Block] No block found to adjust on {d}")
             continue
+        ev = evs[0]
 
-        tokens = _normalize_tokens(ev.get("summary",""))
-        tokens = _remove_one(tokens, "PHOTOSHOOT" if kind.upper()=="PHOTOSHOOT" else "EVENT")
+        new_summary = remove_from_block_label(ev.get("summary",""),
+                                              "PHOTOSHOOT" if kind.upper()=="PHOTOSHOOT" else "EVENT")
 
-        if not tokens:
+        if not new_summary:
             # If nothing remains, delete the block entirely
-            from tools.gcal_tool import _svc
-            s=_svc()
-            s.events().delete(calendarId=get_cal_id(CAL_BLOCK), eventId=ev["id"]).execute()
-            print(f"[Block] Deleted empty block on {d}")
+            batch.delete(block_id, ev["id"])
+            notes.append(f"[Block] Deleted empty block on {d}")
         else:
-            new_summary = _format_tokens(tokens)
-            update_event_summary(get_cal_id(CAL_BLOCK), ev["id"], new_summary)
-            print(f"[Block] Updated {d}: {ev.get('summary')} → {new_summary}")
+            batch.patch(block_id, ev["id"], {"summary": new_summary})
+            notes.append(f"[Block] Updated {d}: {ev.get('summary')} → {new_summary}")
+    raise_for_errors(batch.execute())
+    for line in notes:
+        print(line)
 
 if __name__ == "__main__":
     if len(sys.argv) != 5:
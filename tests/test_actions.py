@@ -0,0 +1,53 @@
+"""The actions run as the CLI runs them, against scripts/fake_calendar.py, with their API call counts."""
+import subprocess
+import sys
+
+import pytest
+
+from scripts.bench_actions import PRIME, ROOT, SCENARIOS, _env
+from scripts.fake_calendar import FakeCalendar
+
+SIZE = 100
+
+# calendarList.list resolves the names, events.list is the mirror's first sync
+# (one per calendar read), and every write goes out in one batch
+EXPECTED = {
+    "airbnb_to_disco": ({"calendarList.list": 1, "events.list": 1, "batch": 1, "events.insert": 3}, 3),
+    "airbnb_to_upstairs": ({"calendarList.list": 1, "events.list": 1, "batch": 1, "events.insert": 1}, 1),
+    "block_manual": ({"calendarList.list": 1, "events.list": 1, "batch": 1, "events.insert": 2}, 2),
+    "cancel": ({"calendarList.list": 1, "events.list": 2, "batch": 1, "events.delete": 3}, -3),
+    "cleanup_booking": ({"calendarList.list": 1, "events.list": 2, "batch": 1, "events.delete": 2}, -2),
+    "cancel_by_title": ({"calendarList.list": 1, "events.list": 1, "batch": 1, "events.delete": 1}, -1),
+}
+
+
+@pytest.fixture
+def cal():
+    cal = FakeCalendar()
+    cal.seed_bookings(SIZE)
+    server = cal.serve(0)
+    cal.port = server.server_address[1]
+    yield cal
+    server.shutdown()
+
+
+def run(cal, argv, env):
+    cal.reset_counters()
+    before = cal.live()
+    p = subprocess.run([sys.executable, "-m", *argv], env=env, cwd=ROOT, capture_output=True, text=True)
+    assert p.returncode == 0, p.stdout + p.stderr
+    return dict(cal.calls), cal.live() - before
+
+
+@pytest.mark.parametrize("name", sorted(SCENARIOS))
+def test_action_calls(cal, tmp_path, name):
+    calls, delta = run(cal, SCENARIOS[name](cal), _env(cal.port, str(tmp_path), "cold"))
+    assert (calls, delta) == EXPECTED[name]
+
+
+def test_warm_run_only_delta_syncs(cal, tmp_path):
+    env = _env(cal.port, str(tmp_path), "warm")
+    subprocess.run([sys.executable, "-c", PRIME], env=env, cwd=ROOT, check=True)
+    calls, delta = run(cal, SCENARIOS["cancel"](cal), env)
+    # ids come from the state dir; both calendars read are delta-synced once
+    assert (calls, delta) == ({"events.list": 2, "batch": 1, "events.delete": 3}, -3)
@@ -0,0 +1,78 @@
+"""scripts/airbnb_block_dates.py: date grouping, and batch mode against tests/fixtures/airbnb_multicalendar.html."""
+from pathlib import Path
+
+import pytest
+
+from scripts import airbnb_block_dates as abd
+
+FIXTURE = Path(__file__).parent / "fixtures" / "airbnb_multicalendar.html"
+
+
+# ---------------- pure helpers ----------------
+def test_group_by_month_sorts_and_dedupes():
+    dates = ["2026-01-02", "2025-12-31", "2025-12-27", "2026-01-02", "2025-12-28"]
+    assert abd.group_by_month(dates) == {
+        "2025-12-01": ["2025-12-27", "2025-12-28", "2025-12-31"],
+        "2026-01-01": ["2026-01-02"],
+    }
+    assert list(abd.group_by_month(dates)) == ["2025-12-01", "2026-01-01"]
+    assert abd.group_by_month([]) == {}
+
+
+def test_contiguous_runs():
+    assert abd.contiguous_runs([]) == []
+    assert abd.contiguous_runs(["2025-12-27"]) == [("2025-12-27", "2025-12-27")]
+    assert abd.contiguous_runs(["2025-12-29", "2025-12-27", "2025-12-28", "2025-12-28", "2026-01-02"]) == [
+        ("2025-12-27", "2025-12-29"),
+        ("2026-01-02", "2026-01-02"),
+    ]
+
+
+def test_contiguous_runs_cross_month_and_leap_day():
+    assert abd.contiguous_runs(["2025-12-31", "2026-01-01"]) == [("2025-12-31", "2026-01-01")]
+    assert abd.contiguous_runs(["2028-02-28", "2028-02-29", "2028-03-01"]) == [("2028-02-28", "2028-03-01")]
+    assert abd.contiguous_runs(["2027-02-28", "2027-03-02"]) == [
+        ("2027-02-28", "2027-02-28"),
+        ("2027-03-02", "2027-03-02"),
+    ]
+
+
+# ---------------- batch mode in a browser ----------------
+@pytest.fixture
+def page():
+    pytest.importorskip("playwright.sync_api")
+    from scripts.browser_runtime import browser_session
+    with browser_session(block_assets=False, auth=False, attach=False) as s:
+        yield s.new_page()
+
+
+def actions(page):
+    return [(a["action"], a["first"], a["last"]) for a in page.evaluate("window.__actions")]
+
+
+def test_batch_blocks_one_range_per_run(page):
+    days = ["2025-12-27", "2025-12-28", "2025-12-29", "2025-12-31"]
+    abd.block_month(page, FIXTURE.as_uri(), "2025-12-01", days)
+    assert actions(page) == [
+        ("block", "2025-12-27", "2025-12-29"),
+        ("block", "2025-12-31", "2025-12-31"),
+    ]
+    assert page.locator('[data-blocked="true"]').count() == 4
+
+
+def test_batch_unblock(page):
+    abd.block_month(page, FIXTURE.as_uri(), "2025-12-01", ["2025-12-05", "2025-12-06"], make_available=True)
+    assert actions(page) == [("open", "2025-12-05", "2025-12-06")]
+
+
+def test_range_fallback_keeps_selected_days(page, monkeypatch):
+    # no range selection: the shift+click leaves both days selected and no
+    # Block button; re-clicking the first day would toggle it off again
+    monkeypatch.setattr(abd, "WAIT_MS", 1000)
+    page.add_init_script("window.__ranges = false")
+    abd.block_month(page, FIXTURE.as_uri(), "2025-12-01", ["2025-12-27", "2025-12-28", "2025-12-29"])
+    assert actions(page) == [
+        ("block", "2025-12-27", "2025-12-27"),
+        ("block", "2025-12-28", "2025-12-28"),
+        ("block", "2025-12-29", "2025-12-29"),
+    ]
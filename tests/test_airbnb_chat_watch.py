@@ -0,0 +1,30 @@
+"""scripts/airbnb_chat_watch.py: checkpoint keys, new-message detection and update parsing."""
+from scripts import airbnb_chat_watch as watch
+
+MESSAGES = [f"message {i}" for i in range(30)]
+
+
+def test_thread_key_falls_back_to_the_preview():
+    linked = {"index": 0, "href": "https://www.airbnb.com/hosting/inbox/thread/1", "preview": "Hi"}
+    assert watch.thread_key(linked) == linked["href"]
+    bare = {"index": 1, "href": None, "preview": "Hi"}
+    assert watch.thread_key(bare) == watch.thread_key(dict(bare, index=5)) != watch.thread_key(dict(bare, preview="Bye"))
+    assert watch.thread_key(bare).startswith("preview:")
+
+
+def test_new_messages():
+    assert watch.new_messages(MESSAGES, None) == MESSAGES[-watch.FIRST_RUN:]
+    assert watch.new_messages(MESSAGES, watch._digest("message 26")) == MESSAGES[27:]
+    assert watch.new_messages(MESSAGES, watch._digest("message 29")) == []
+    assert watch.new_messages(MESSAGES, watch._digest("scrolled out")) == MESSAGES
+
+
+def test_updates_from():
+    texts = ["Thanks!", "You updated the check-in to 5:00 pm on March 7, 2026",
+             "you updated Jane's checkout to 10:30 am on March 9, 2026"]
+    got = watch.updates_from(3, "Jane", texts)
+    assert [(u["update_type"], u["new_time"]) for u in got] == [
+        ("checkin_change", "2026-03-07T17:00:00"),
+        ("checkout_change", "2026-03-09T10:30:00"),
+    ]
+    assert {u["thread_index"] for u in got} == {3}
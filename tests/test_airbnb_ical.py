@@ -0,0 +1,185 @@
+"""calendar_agent/sync/airbnb_ical.py: tests/fixtures/airbnb_disco.ics served by calendar_agent.feed.serve."""
+import shutil
+import socket
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from calendar_agent.calendar import mapping
+from calendar_agent.calendar.service import upsert_bookings
+from calendar_agent.feed import serve
+from calendar_agent.models.booking import Booking
+from calendar_agent.store.repo import BookingRepo
+from calendar_agent.sync.airbnb_ical import FeedState, ingest_feed, ingest_ical, vevent_booking
+
+FIXTURE = Path(__file__).parent / "fixtures" / "airbnb_disco.ics"
+TZ = "America/Detroit"
+CODES = ["HMQ4TZ8K2X", "HMB7WN3R5P", "HMX2KD9V7L"]  # check-in 03-02, 03-07, 03-14
+
+
+class Calendar:
+    """create / update / delete callbacks that record what reached the calendar."""
+
+    def __init__(self):
+        self.created, self.updated, self.deleted = [], [], []
+
+    def create(self, event):
+        self.created.append(event.source_external_id)
+        return f"evt{len(self.created)}"
+
+    def update(self, provider_id, event):
+        self.updated.append(event.source_external_id)
+
+    def delete(self, calendar_id, provider_id):
+        self.deleted.append(provider_id)
+
+    def writes(self):
+        return len(self.created) + len(self.updated) + len(self.deleted)
+
+
+@pytest.fixture(autouse=True)
+def calendars(monkeypatch):
+    monkeypatch.setattr(mapping.settings, "google_calendar_disco_id", "disco@cal")
+    monkeypatch.setattr(mapping.settings, "google_calendar_upstairs_id", "upstairs@cal")
+
+
+@pytest.fixture
+def feed(tmp_path):
+    path = tmp_path / "disco.ics"
+    shutil.copy(FIXTURE, path)
+    server = serve(str(path), 0)
+    yield SimpleNamespace(path=path, url=f"http://127.0.0.1:{server.server_address[1]}/disco.ics")
+    server.shutdown()
+
+
+@pytest.fixture
+def repo(tmp_path):
+    return BookingRepo(str(tmp_path / "bookings.sqlite3"))
+
+
+def poll(feed, tmp_path, cal, repo):
+    state = FeedState(str(tmp_path / "airbnb_ical.json"))
+    return ingest_feed("Disco", feed.url, state, cal.create, cal.update, cal.delete, repo=repo, tz=TZ)
+
+
+def edit(feed, old, new):
+    feed.path.write_bytes(feed.path.read_bytes().replace(old.encode(), new.encode()))
+
+
+def without(feed, code):
+    """Drop the VEVENT holding `code` from the feed."""
+    events = feed.path.read_bytes().split(b"BEGIN:VEVENT")
+    feed.path.write_bytes(b"BEGIN:VEVENT".join(e for e in events if code.encode() not in e.replace(b"\r\n ", b"")))
+
+
+# ---------------- conditional GET ----------------
+def test_first_poll_then_304(feed, tmp_path, repo):
+    cal = Calendar()
+    r = poll(feed, tmp_path, cal, repo)
+    assert (r.status, r.events, r.bookings, r.skipped, r.error) == (200, 5, 3, 2, "")
+    assert cal.created == CODES
+
+    again = Calendar()
+    r = poll(feed, tmp_path, again, repo)
+    assert (r.status, r.events, r.bookings) == (304, 0, 0)
+    assert again.writes() == 0
+
+
+def test_edited_feed_patches_and_inserts(feed, tmp_path, repo):
+    poll(feed, tmp_path, Calendar(), repo)
+    edit(feed, "DTEND;VALUE=DATE:20260320", "DTEND;VALUE=DATE:20260321")
+    edit(feed, "END:VCALENDAR", "BEGIN:VEVENT\r\nDTSTART;VALUE=DATE:20260402\r\nDTEND;VALUE=DATE:20260404\r\n"
+                                "UID:new@airbnb.com\r\nDESCRIPTION:Reservation URL: https://www.airbnb.com/"
+                                "hosting/reservations/details/HMNEW12345\r\nSUMMARY:Reserved\r\nEND:VEVENT\r\n"
+                                "END:VCALENDAR")
+    cal = Calendar()
+    r = poll(feed, tmp_path, cal, repo)
+    assert r.status == 200
+    assert (cal.created, cal.updated, cal.deleted) == (["HMNEW12345"], ["HMX2KD9V7L"], [])
+
+
+def test_lost_validators_write_nothing(feed, tmp_path, repo):
+    poll(feed, tmp_path, Calendar(), repo)
+    (tmp_path / "airbnb_ical.json").unlink()
+    cal = Calendar()
+    assert poll(feed, tmp_path, cal, repo).status == 200
+    assert cal.writes() == 0
+
+
+# ---------------- vanished reservations ----------------
+def test_vanished_reservation_is_cancelled(feed, tmp_path, repo):
+    poll(feed, tmp_path, Calendar(), repo)
+    without(feed, "HMB7WN3R5P")
+    cal = Calendar()
+    r = poll(feed, tmp_path, cal, repo)
+    assert (r.cancelled, cal.deleted) == (1, ["evt2"])
+    assert repo.find_by_source_id("airbnb", "HMB7WN3R5P") == []
+
+
+def test_reservation_before_the_window_ages_out(feed, tmp_path, repo):
+    poll(feed, tmp_path, Calendar(), repo)
+    without(feed, "HMQ4TZ8K2X")  # the earliest stay: the feed now starts at 03-07
+    cal = Calendar()
+    assert poll(feed, tmp_path, cal, repo).cancelled == 0
+    assert cal.deleted == []
+    assert len(repo.find_by_source_id("airbnb", "HMQ4TZ8K2X")) == 1
+
+
+def test_email_reservation_is_not_cancelled(feed, tmp_path, repo):
+    tz = ZoneInfo(TZ)
+    email = Booking(source="airbnb", external_id="HMEMAIL001", space="Disco", kind="lodging",
+                    start=datetime(2026, 3, 10, 16, tzinfo=tz), end=datetime(2026, 3, 11, 11, tzinfo=tz))
+    upsert_bookings([email], Calendar().create, Calendar().update, repo=repo)
+    cal = Calendar()
+    assert poll(feed, tmp_path, cal, repo).cancelled == 0
+    assert cal.deleted == []
+
+
+def test_empty_feed_cancels_nothing(feed, tmp_path, repo):
+    poll(feed, tmp_path, Calendar(), repo)
+    for code in CODES:
+        without(feed, code)
+    without(feed, "Not available")
+    cal = Calendar()
+    r = poll(feed, tmp_path, cal, repo)
+    assert (r.status, r.events, r.cancelled) == (200, 0, 0)
+
+
+# ---------------- errors and skipped events ----------------
+def test_dead_feed_does_not_stop_the_others(feed, tmp_path, repo):
+    dead = socket.socket()
+    dead.bind(("127.0.0.1", 0))  # bound, never listening: connections are refused
+    try:
+        cal = Calendar()
+        feeds = {"Disco": feed.url, "Upstairs": f"http://127.0.0.1:{dead.getsockname()[1]}/upstairs.ics"}
+        disco, upstairs = ingest_ical(feeds, cal.create, cal.update, cal.delete,
+                                      str(tmp_path / "airbnb_ical.json"), repo=repo, tz=TZ)
+    finally:
+        dead.close()
+    assert (disco.status, disco.bookings, disco.error) == (200, 3, "")
+    assert upstairs.error and upstairs.bookings == 0
+    assert str(upstairs).startswith("Upstairs: failed")
+    assert list(FeedState(str(tmp_path / "airbnb_ical.json")).feeds) == [feed.url]
+
+
+def test_http_error_is_reported(feed, tmp_path, repo):
+    cal = Calendar()
+    feed.path.unlink()  # the feed server answers 404
+    r = poll(feed, tmp_path, cal, repo)
+    assert (r.status, r.error) == (404, "HTTP 404")
+    assert cal.writes() == 0
+
+
+def test_skips_blocked_and_codeless_events():
+    tz = ZoneInfo(TZ)
+    dates = {"DTSTART": ({"VALUE": "DATE"}, "20260311"), "DTEND": ({"VALUE": "DATE"}, "20260312")}
+    assert vevent_booking({**dates, "SUMMARY": ({}, "Airbnb (Not available)")}, "Disco", tz) is None
+    assert vevent_booking({**dates, "SUMMARY": ({}, "Reserved"), "UID": ({}, "x@airbnb.com")}, "Disco", tz) is None
+    b = vevent_booking({**dates, "SUMMARY": ({}, "Reserved"),
+                        "DESCRIPTION": ({}, "https://www.airbnb.com/hosting/reservations/details/HMABC12345")},
+                       "Disco", tz)
+    assert (b.external_id, b.start, b.end) == ("HMABC12345", datetime(2026, 3, 11, 16, tzinfo=tz),
+                                               datetime(2026, 3, 12, 11, tzinfo=tz))
@@ -0,0 +1,53 @@
+"""tools/gcal_tool.py write helpers against scripts/fake_calendar.py."""
+import threading
+from collections import Counter
+
+import pytest
+
+from calendar_agent import config
+from calendar_agent.store.hashing import CONTENT_HASH_KEY, body_hash
+from scripts.fake_calendar import FakeCalendar
+from tools import gcal_tool
+
+BLOCK = "Block on Airbnb"
+
+
+@pytest.fixture
+def cal(monkeypatch, tmp_path):
+    cal = FakeCalendar()
+    server = cal.serve(0)
+    monkeypatch.setattr(config.settings, "calendar_api_endpoint", f"http://127.0.0.1:{server.server_address[1]}/")
+    monkeypatch.setattr(config.settings, "event_mirror", False)
+    monkeypatch.setattr(config.settings, "state_dir", str(tmp_path))
+    monkeypatch.setattr(gcal_tool, "WRITE_STATS", Counter())
+    yield cal
+    server.shutdown()
+
+
+def test_upsert_all_day_blocks_stamps_content_hash(cal):
+    cal_id = cal.cal_id(BLOCK)
+    cal.seed(cal_id, [{"summary": "EVENT", "start": {"date": "2026-03-10"}, "end": {"date": "2026-03-11"},
+                       "extendedProperties": {"private": {"ps_block_key": "A|2026-03-10"}}}])
+    gcal_tool.upsert_all_day_blocks(cal_id, {
+        "2026-03-10": ("PHOTOSHOOT", {"ps_block_key": "B|2026-03-10"}),
+        "2026-03-11": ("PHOTOSHOOT", {"ps_block_key": "B|2026-03-11"}),
+    }, merge=True)
+    assert dict(gcal_tool.WRITE_STATS) == {"inserted": 1, "patched": 1, "skipped": 0}
+
+    events = sorted(cal.events[cal_id].values(), key=lambda e: e["start"]["date"])
+    assert [e["summary"] for e in events] == ["EVENT + PHOTOSHOOT", "PHOTOSHOOT"]
+    for e in events:
+        assert e["extendedProperties"]["private"][CONTENT_HASH_KEY] == body_hash(e)
+
+
+def test_write_stats_from_worker_threads(cal):
+    def count():
+        for _ in range(20_000):
+            gcal_tool._count_writes(inserted=1, skipped=2)
+
+    threads = [threading.Thread(target=count) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert gcal_tool.write_summary() == "writes: 160000 inserted, 0 patched, 320000 skipped (unchanged)"
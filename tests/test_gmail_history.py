@@ -0,0 +1,91 @@
+"""calendar_agent/sync/gmail_history.py against scripts/fake_gmail.py."""
+import pytest
+
+from calendar_agent.google_api import local_service
+from calendar_agent.sync import gmail_history
+from calendar_agent.sync.gmail_history import GmailSync
+from scripts.fake_gmail import FakeGmail
+
+BOOKINGS = "Peerspace/Event Bookings"
+
+
+@pytest.fixture
+def box():
+    box = FakeGmail()
+    server = box.serve(0)
+    box.url = f"http://127.0.0.1:{server.server_address[1]}/"
+    yield box
+    server.shutdown()
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(gmail_history, "backoff_delay", lambda attempt, hint=None: 0.0)
+
+
+def poll(box, tmp_path):
+    sync = GmailSync(local_service("gmail", "v1", box.url), str(tmp_path / "sync.json"))
+    handled = []
+    result = sync.poll(lambda msg, labels: handled.append((msg["id"], labels)))
+    return result, handled
+
+
+def test_first_poll_scans_then_history_delta(box, tmp_path):
+    old = [box.deliver(BOOKINGS, f"booking {i}") for i in range(3)]
+    result, handled = poll(box, tmp_path)
+    assert result.mode == "full_scan"
+    assert [m for m, _ in handled] == old
+
+    new = box.deliver(BOOKINGS, "booking 3")
+    box.deliver("INBOX", "not watched")
+    box.gets.clear()
+    result, handled = poll(box, tmp_path)
+    assert result.mode == "history"
+    assert handled == [(new, [BOOKINGS])]
+    assert box.gets == {new: 1}
+
+    result, handled = poll(box, tmp_path)
+    assert (result.mode, handled, result.api_calls) == ("history", [], 1)
+
+
+def test_expired_history_falls_back_to_full_scan(box, tmp_path):
+    box.deliver(BOOKINGS, "booking")
+    poll(box, tmp_path)
+    box.expire_history()
+    new = box.deliver(BOOKINGS, "after expiry")
+    result, handled = poll(box, tmp_path)
+    assert result.mode == "full_scan"
+    assert new in [m for m, _ in handled]
+
+
+def test_message_deleted_before_fetch_is_skipped(box, tmp_path):
+    poll(box, tmp_path)
+    gone = box.deliver(BOOKINGS, "deleted")
+    kept = box.deliver(BOOKINGS, "kept")
+    box.delete(gone)
+    result, handled = poll(box, tmp_path)
+    assert [m for m, _ in handled] == [kept]
+    assert (result.missing, result.failed) == (1, {})
+
+
+def test_throttled_fetch_is_retried(box, tmp_path):
+    poll(box, tmp_path)
+    mids = [box.deliver(BOOKINGS, f"booking {i}") for i in range(3)]
+    box.throttle(mids[1], 429, 403, 503)
+    result, handled = poll(box, tmp_path)
+    assert [m for m, _ in handled] == mids
+    assert box.gets[mids[1]] == 4 and box.gets[mids[0]] == 1
+    assert result.failed == {}
+
+
+def test_persistent_failure_is_reported_and_retried_next_poll(box, tmp_path):
+    poll(box, tmp_path)
+    ok, stuck = box.deliver(BOOKINGS, "ok"), box.deliver(BOOKINGS, "stuck")
+    box.throttle(stuck, *[429] * (gmail_history.MAX_RETRIES + 1))
+    result, handled = poll(box, tmp_path)
+    assert [m for m, _ in handled] == [ok]
+    assert list(result.failed) == [stuck] and result.missing == 0
+
+    result, handled = poll(box, tmp_path)
+    assert [m for m, _ in handled] == [stuck]
+    assert result.failed == {}
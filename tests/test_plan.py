@@ -0,0 +1,31 @@
+"""calendar_agent/calendar/plan.py: Plan.optimize."""
+from calendar_agent.calendar.plan import Plan
+
+
+def buffer(event_id, booking_key):
+    return {"id": event_id, "summary": "EVENT", "location": "1-hr buffer",
+            "start": {"dateTime": "2026-03-01T09:00:00-05:00"},
+            "end": {"dateTime": "2026-03-01T16:00:00-05:00"},
+            "extendedProperties": {"private": {"booking_key": booking_key}}}
+
+
+def test_delete_and_reinsert_of_one_key_becomes_one_patch():
+    plan = Plan()
+    old = buffer("e1", "ps|A|2026-03-01")
+    plan.delete("cal", old)
+    new = dict(buffer("", "ps|A|2026-03-01"), location="2-hr buffer")
+    del new["id"]
+    plan.insert("cal", new, key=("booking_key", "ps|A|2026-03-01"))
+    assert plan.optimize() == 1
+    (op,) = plan.writes
+    assert (op.kind, op.event_id, op.body["location"]) == ("patch", "e1", "2-hr buffer")
+
+
+def test_same_title_and_start_of_another_booking_is_not_merged():
+    plan = Plan()
+    plan.delete("cal", buffer("e1", "ps|A|2026-03-01"))
+    new = buffer("", "ps|B|2026-03-01")
+    del new["id"]
+    plan.insert("cal", new, key=("booking_key", "ps|B|2026-03-01"))
+    assert plan.optimize() == 0
+    assert sorted(op.kind for op in plan.writes) == ["delete", "insert"]
@@ -0,0 +1,13 @@
+"""Importing the agent's modules must not build the settings (or read .env)."""
+import subprocess
+import sys
+from pathlib import Path
+
+MODULES = ("tools.gcal_tool", "calendar_agent.ratelimit", "calendar_agent.profiling")
+
+
+def test_imports_leave_settings_unbuilt():
+    code = (f"import {', '.join(MODULES)}\n"
+            "from calendar_agent import config\n"
+            "assert config._settings is None")
+    subprocess.run([sys.executable, "-c", code], cwd=Path(__file__).parents[1], check=True)
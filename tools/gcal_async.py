@@ -0,0 +1,100 @@
+# tools/gcal_async.py
+"""
+asyncio front-end to tools.gcal_tool.
+
+AsyncCalendar exposes the same helpers as gcal_tool as coroutines. Each call
+runs on a worker thread (with its own Calendar client and keep-alive pool,
+see calendar_agent/google_api.py), and a semaphore caps how many requests
+are in flight at once, so independent per-calendar / per-key work can
+overlap instead of queueing behind each other:
+
+    async with AsyncCalendar() as cal:
+        disco, block = await cal.gather(cal.get_cal_id("Disco Bookings"),
+                                        cal.get_cal_id("Block on Airbnb"))
+
+`run(coro)` is the sync wrapper the CLIs use.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from tools import gcal_tool
+
+DEFAULT_CONCURRENCY = 8
+
+# gcal_tool helpers mirrored as coroutines on AsyncCalendar
+HELPERS = (
+    "get_cal_id",
+    "find_event_by_private",
+    "find_events_by_private_keys",
+    "upsert_event",
+    "upsert_events",
+    "delete_event",
+    "delete_event_by_private",
+    "delete_all_events_by_private",
+    "delete_events_by_private",
+    "delete_events_by_private_keys",
+    "delete_events_by_private_prefix",
+    "update_event_summary",
+    "find_all_day_event_on_date",
+    "get_event_by_date",
+    "all_day_map",
+    "find_same_day_event_by_summary_location",
+    "patch_event_times",
+    "upsert_or_modify_buffer",
+    "upsert_or_attach_all_day",
+    "upsert_all_day_blocks",
+    "refresh_mirror",
+    "plan_upsert_events",
+    "plan_delete_by_private_keys",
+    "plan_delete_matching",
+    "apply_plan",
+    "events_between",
+    "plan_reconcile",
+)
+
+
+class AsyncCalendar:
+    def __init__(self, concurrency: int = DEFAULT_CONCURRENCY):
+        self.concurrency = concurrency
+        self._sem = asyncio.Semaphore(concurrency)
+        self._pool = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="gcal")
+
+    async def _call(self, fn, *args, **kwargs):
+        async with self._sem:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._pool, partial(fn, *args, **kwargs))
+
+    async def gather(self, *coros):
+        """asyncio.gather that re-raises the first failure."""
+        return await asyncio.gather(*coros)
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=True)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.close()
+
+
+def _mirror_helper(name: str):
+    fn = getattr(gcal_tool, name)
+
+    async def method(self, *args, **kwargs):
+        return await self._call(fn, *args, **kwargs)
+
+    method.__name__ = name
+    method.__qualname__ = f"AsyncCalendar.{name}"
+    method.__doc__ = fn.__doc__
+    return method
+
+
+for _name in HELPERS:
+    setattr(AsyncCalendar, _name, _mirror_helper(_name))
+
+
+def run(coro):
+    """Run a coroutine to completion from sync code (the existing CLIs)."""
+    return asyncio.run(coro)
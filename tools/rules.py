@@ -1,5 +1,6 @@
 # tools/rules.py
-from datetime import datetime, timedelta, time
+from collections import Counter
+from datetime import date, datetime, timedelta, time
 
 # --- Airbnb rules ---
 AIRBNB_CHECKIN  = time(16, 0)   # 4 PM
@@ -54,4 +55,111 @@ def one_hour_buffer_event(title, start_dt, end_dt):
         "location": "1-hr buffer",
         "start": {"dateTime": (start_dt - timedelta(hours=1)).isoformat()},
         "end": {"dateTime": (end_dt + timedelta(hours=1)).isoformat()},
-    }
\ No newline at end of file
+    }
+
+# --- Block labels on "Block on Airbnb" ---
+# Several bookings on one date share a single all-day block whose title lists them:
+# "EVENT", "EVENT + PHOTOSHOOT", "2X EVENTS + PHOTOSHOOT", ...
+
+def parse_block_label(summary):
+    """Split a block title into one token per booking: '2X EVENTS + SHOOT' -> ['EVENT', 'EVENT', 'SHOOT']."""
+    s = (summary or "").upper().replace("×","X")
+    parts = [p.strip() for p in s.split("+") if p.strip()]
+    tokens = []
+    for p in parts:
+        bits = p.split()
+        if len(bits) >= 2 and bits[0].endswith("X"):
+            try:
+                n = int(bits[0].replace("X",""))
+                word = " ".join(bits[1:])
+                if word.endswith("S"): word = word[:-1]
+                tokens.extend([word] * n)
+            except Exception:
+                tokens.append(p.rstrip("S"))
+        else:
+            w = p
+            if w.endswith("S"): w = w[:-1]
+            tokens.append(w)
+    return tokens
+
+
+def format_block_label(tokens):
+    """Inverse of parse_block_label (tokens sorted, repeats collapsed to '2X WORDS')."""
+    c = Counter(tokens)
+    parts = []
+    for word in sorted(c):
+        if c[word] == 1:
+            parts.append(word)
+        else:
+            parts.append(f"{c[word]}X {word}S")
+    return " + ".join(parts)
+
+
+def _token(kind):
+    k = kind.upper()
+    if k.endswith("S"): k = k[:-1]
+    return k
+
+
+def merge_block_label(summary, kind):
+    """Add one `kind` to an existing block title."""
+    return format_block_label(parse_block_label(summary) + [_token(kind)])
+
+
+def remove_from_block_label(summary, kind):
+    """Remove one `kind` from a block title; '' when nothing remains."""
+    tokens = parse_block_label(summary)
+    try:
+        tokens.remove(_token(kind))
+    except ValueError:
+        pass
+    return format_block_label(tokens)
+
+
+# --- Bulk block planning ---
+# block_dates_for_event walks a booking day by day. Its result is always one
+# contiguous run of dates, so the run's two ends can be computed directly:
+#   - every day from the first to the day before the last (a later day starts
+#     at midnight, so the previous day is blocked; the day itself runs to
+#     23:59:59, past check-in);
+#   - the day before the first, if the booking starts before check-in;
+#   - the last day, if the booking ends after check-in minus the buffer.
+# Times are compared on the wall clock, as block_dates_for_event does when both
+# ends share a tzinfo; bookings whose ends carry different tzinfos are
+# compared in UTC there, so they fall back to the per-day walk.
+
+def block_days(start_dt, end_dt):
+    """The date ordinals block_dates_for_event(start_dt, end_dt) returns, as a range when possible."""
+    if start_dt.tzinfo is not end_dt.tzinfo:
+        return sorted(date.fromisoformat(d).toordinal() for d in block_dates_for_event(start_dt, end_dt))
+    first = start_dt.date()
+    last = (end_dt - timedelta(seconds=1)).date()
+    if last < first:
+        return range(0)
+    lo = first.toordinal() - (start_dt.time() < AIRBNB_CHECKIN)
+    seg_end = min(end_dt, datetime.combine(last, time(23, 59, 59), tzinfo=end_dt.tzinfo))
+    cutoff = datetime.combine(last, AIRBNB_CHECKIN, tzinfo=end_dt.tzinfo)
+    hi = last.toordinal() - (seg_end + timedelta(hours=POST_EVENT_BUFFER_HOURS) <= cutoff)
+    return range(lo, hi + 1)
+
+
+def plan_blocks(starts, ends):
+    """{date: [booking index, ...]} for parallel lists of booking starts and ends."""
+    per_day = {}
+    for i, (s, e) in enumerate(zip(starts, ends)):
+        for day in block_days(s, e):
+            per_day.setdefault(day, []).append(i)
+    return {date.fromordinal(day).isoformat(): ix for day, ix in sorted(per_day.items())}
+
+
+def plan_block_labels(starts, ends, kinds):
+    """{date: merged block title} for a whole season of bookings at once."""
+    tokens = [_token(k) for k in kinds]
+    labels = {}
+    out = {}
+    for d, ix in plan_blocks(starts, ends).items():
+        key = tuple(sorted(tokens[i] for i in ix))
+        if key not in labels:
+            labels[key] = format_block_label(key)
+        out[d] = labels[key]
+    return out